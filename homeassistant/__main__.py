@@ -290,7 +290,7 @@ def setup_and_run_hass(config_dir: str,
         print('Config directory:', config_dir)
         hass = bootstrap.from_config_file(
             config_file, verbose=args.verbose, skip_pip=args.skip_pip,
-            log_rotate_days=args.log_rotate_days)
+            log_rotate_days=args.log_rotate_days, config_cache=True)
 
     if hass is None:
         return None
@@ -4,11 +4,15 @@ import logging
 import logging.handlers
 import os
 import sys
+import threading
 from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from timeit import default_timer as timer
 
 from types import ModuleType
 from typing import Any, Optional, Dict
 
+import async_timeout
 import voluptuous as vol
 from voluptuous.humanize import humanize_error
 
@@ -16,7 +20,9 @@ import homeassistant.components as core_components
 from homeassistant.components import persistent_notification
 import homeassistant.config as conf_util
 import homeassistant.core as core
-from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_START,
+    EVENT_HOMEASSISTANT_STARTED)
 import homeassistant.loader as loader
 import homeassistant.util.package as pkg_util
 from homeassistant.util.async import (
@@ -27,22 +33,60 @@ from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import (
     event_decorators, service, config_per_platform, extract_domain_configs)
+from homeassistant.helpers import startup_timing
 from homeassistant.helpers.signal import async_register_signal_handling
 
 _LOGGER = logging.getLogger(__name__)
 
 ATTR_COMPONENT = 'component'
 
+DATA_SETUP = 'setup_tasks'
+DATA_SETUP_CHAINS = 'setup_chains'
+DATA_SETUP_WAITS = 'setup_waits'
+DATA_SETUP_SLOTS = 'setup_slots'
+DATA_REQUIREMENTS = 'requirements_satisfied'
+DATA_DEFERRED_SETUP = 'deferred_setup_tasks'
+
+# Requirements known to be satisfied, relative to the config dir
+REQUIREMENTS_CACHE = '.requirements_cache'
+
+# Seconds a component setup may take, components can override it
+# with a SETUP_TIMEOUT module attribute. A synchronous setup that times out
+# cannot be interrupted, it keeps running in its executor thread although
+# the component is reported as failed and will not be marked as loaded.
+SETUP_TIMEOUT = 300
+
+# Synchronous component setups doing work at the same time. A setup that
+# waits for a nested setup_component call gives up its slot meanwhile.
+MAX_COMPONENT_SETUPS = core.EXECUTOR_POOL_SIZE // 2
+
+# Seconds a batch of setups is waited for during a deferred startup before
+# the remaining setups are left to finish in the background
+DEFERRED_SETUP_WAIT = 10
+
+# Components that are set up before all others
+FIRST_INIT_COMPONENTS = ('recorder', 'mqtt', 'mqtt_eventstream', 'logger',
+                         'introduction')
+
 ERROR_LOG_FILENAME = 'home-assistant.log'
 _PERSISTENT_ERRORS = {}
 HA_COMPONENT_URL = '[{}](https://home-assistant.io/components/{}/)'
 
+# Domains being set up by the current executor thread
+_SETUP_CHAIN = threading.local()
+_REQUIREMENTS_LOCK = threading.Lock()
+
 
 def setup_component(hass: core.HomeAssistant, domain: str,
                     config: Optional[Dict]=None) -> bool:
     """Setup a component and all its dependencies."""
-    return run_coroutine_threadsafe(
-        async_setup_component(hass, domain, config), loop=hass.loop).result()
+    chain = getattr(_SETUP_CHAIN, 'chain', ())
+    coro = _async_setup_component_in_chain(hass, domain, config, chain)
+
+    if chain:
+        coro = _async_setup_slots(hass).async_wait(chain[-1], coro)
+
+    return run_coroutine_threadsafe(coro, loop=hass.loop).result()
 
 
 @asyncio.coroutine
@@ -50,33 +94,263 @@ def async_setup_component(hass: core.HomeAssistant, domain: str,
                           config: Optional[Dict]=None) -> bool:
     """Setup a component and all its dependencies.
 
+    Concurrent calls for the same domain share one setup.
+
+    This method is a coroutine.
+    """
+    return (yield from _async_setup_component_in_chain(
+        hass, domain, config, _async_current_chain(hass)))
+
+
+@core.callback
+def _async_current_chain(hass: core.HomeAssistant):
+    """Return the domains whose setup led to the current task."""
+    setup_chains = hass.data.get(DATA_SETUP_CHAINS)
+    task = asyncio.Task.current_task(loop=hass.loop)
+
+    if setup_chains is None or task not in setup_chains:
+        return ()
+
+    return setup_chains[task]
+
+
+@asyncio.coroutine
+def _async_setup_component_in_chain(hass: core.HomeAssistant, domain: str,
+                                    config: Optional[Dict], chain) -> bool:
+    """Setup a component requested during the setup of chain.
+
     This method is a coroutine.
     """
     if domain in hass.config.components:
         _LOGGER.debug('Component %s already set up.', domain)
         return True
 
+    # Waiting for a setup that is waiting for us would never finish
+    if domain in chain or _async_waits_for(hass, domain, chain):
+        _LOGGER.error('Attempt made to setup %s during setup of %s',
+                      domain, domain)
+        _async_persistent_notification(hass, domain, True)
+        return False
+
+    setup_tasks = hass.data.get(DATA_SETUP)
+    if setup_tasks is None:
+        setup_tasks = hass.data[DATA_SETUP] = {}
+
+    if domain in setup_tasks:
+        return (yield from _async_wait_setup(
+            hass, setup_tasks[domain], domain, chain))
+
     if not loader.PREPARED:
         yield from hass.loop.run_in_executor(None, loader.prepare, hass)
 
     if config is None:
         config = {}
 
-    components = loader.load_order_component(domain)
+    # Only components missing from the component index are imported here
+    load_order = loader.load_order_component(domain)
 
     # OrderedSet is empty if component or dependencies could not be resolved
-    if not components:
+    if not load_order:
         _async_persistent_notification(hass, domain, True)
         return False
 
-    for component in components:
-        res = yield from _async_setup_component(hass, component, config)
-        if not res:
-            _LOGGER.error('Component %s failed to setup', component)
-            _async_persistent_notification(hass, component, True)
-            return False
+    setup_chains = hass.data.get(DATA_SETUP_CHAINS)
+    if setup_chains is None:
+        setup_chains = hass.data[DATA_SETUP_CHAINS] = {}
 
-    return True
+    task = setup_tasks[domain] = hass.loop.create_task(
+        _async_setup_component(hass, domain, config))
+    setup_chains[task] = chain + (domain,)
+
+    def setup_done(task):
+        """Forget about the finished setup."""
+        setup_tasks.pop(domain, None)
+        setup_chains.pop(task, None)
+
+    task.add_done_callback(setup_done)
+
+    return (yield from _async_wait_setup(hass, task, domain, chain))
+
+
+@core.callback
+def _async_waits_for(hass: core.HomeAssistant, domain: str, chain) -> bool:
+    """Return if the setup of domain waits, maybe indirectly, for chain."""
+    setup_waits = hass.data.get(DATA_SETUP_WAITS)
+    if not setup_waits or not chain:
+        return False
+
+    seen = set()
+    pending = [domain]
+
+    while pending:
+        waiter = pending.pop()
+        for waiting_for in setup_waits.get(waiter, ()):
+            if waiting_for in chain:
+                return True
+            if waiting_for not in seen:
+                seen.add(waiting_for)
+                pending.append(waiting_for)
+
+    return False
+
+
+@asyncio.coroutine
+def _async_wait_setup(hass: core.HomeAssistant, task, domain: str, chain):
+    """Wait for the setup task of domain on behalf of chain.
+
+    This method is a coroutine.
+    """
+    if not chain:
+        return (yield from asyncio.shield(task, loop=hass.loop))
+
+    setup_waits = hass.data.get(DATA_SETUP_WAITS)
+    if setup_waits is None:
+        setup_waits = hass.data[DATA_SETUP_WAITS] = {}
+
+    waiting_for = setup_waits.setdefault(chain[-1], [])
+    waiting_for.append(domain)
+
+    try:
+        return (yield from asyncio.shield(task, loop=hass.loop))
+    finally:
+        waiting_for.remove(domain)
+        if not waiting_for:
+            setup_waits.pop(chain[-1], None)
+
+
+class _SetupSlots(object):
+    """Limit the synchronous component setups doing work at the same time."""
+
+    def __init__(self, hass):
+        """Initialize the setup slots."""
+        self._semaphore = asyncio.Semaphore(
+            MAX_COMPONENT_SETUPS, loop=hass.loop)
+        # Domains whose setup runs and the ones of those holding a slot
+        self._running = set()
+        self._holding = set()
+
+    @asyncio.coroutine
+    def async_acquire(self, domain):
+        """Wait for a slot for the setup of domain.
+
+        This method is a coroutine.
+        """
+        yield from self._semaphore.acquire()
+        self._running.add(domain)
+        self._holding.add(domain)
+
+    @core.callback
+    def async_release(self, domain):
+        """Release the slot of domain once its setup returned."""
+        self._running.discard(domain)
+        if domain in self._holding:
+            self._holding.remove(domain)
+            self._semaphore.release()
+
+    @asyncio.coroutine
+    def async_wait(self, domain, coro):
+        """Wait for coro without holding the slot of domain.
+
+        This method is a coroutine.
+        """
+        if domain not in self._holding:
+            return (yield from coro)
+
+        self._holding.remove(domain)
+        self._semaphore.release()
+
+        try:
+            return (yield from coro)
+        finally:
+            yield from self._semaphore.acquire()
+            if domain in self._running and domain not in self._holding:
+                self._holding.add(domain)
+            else:
+                self._semaphore.release()
+
+
+@core.callback
+def _async_setup_slots(hass: core.HomeAssistant) -> _SetupSlots:
+    """Return the slots of synchronous component setups."""
+    slots = hass.data.get(DATA_SETUP_SLOTS)
+    if slots is None:
+        slots = hass.data[DATA_SETUP_SLOTS] = _SetupSlots(hass)
+    return slots
+
+
+class _SetupExecutor(Executor):
+    """Run every synchronous component setup in a thread of its own.
+
+    Setups blocked on a nested setup_component call do not hold the
+    executor threads the nested setup needs to import and prepare.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        """Start fn in a new thread and return a future of its result."""
+        future = Future()
+
+        def run():
+            """Run fn and store its result."""
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+
+        threading.Thread(target=run, name='ComponentSetup',
+                         daemon=True).start()
+        return future
+
+
+_SETUP_EXECUTOR = _SetupExecutor()
+
+
+def _setup_in_chain(chain, setup, *args):
+    """Call a setup method in an executor thread as part of chain."""
+    _SETUP_CHAIN.chain = chain
+    try:
+        return setup(*args)
+    finally:
+        _SETUP_CHAIN.chain = ()
+
+
+@asyncio.coroutine
+def _async_setup_components(hass: core.HomeAssistant, domains,
+                            config) -> None:
+    """Setup components concurrently, each after its dependencies.
+
+    This method is a coroutine.
+    """
+    tasks = [async_setup_component(hass, domain, config)
+             for domain in domains]
+
+    if tasks:
+        yield from async_wait_setup_tasks(hass, tasks)
+
+
+@asyncio.coroutine
+def async_wait_setup_tasks(hass: core.HomeAssistant, tasks) -> None:
+    """Wait for setup tasks to finish.
+
+    During a deferred startup the tasks still running after
+    DEFERRED_SETUP_WAIT seconds are left to finish in the background.
+
+    This method is a coroutine.
+    """
+    deferred = hass.data.get(DATA_DEFERRED_SETUP)
+
+    if deferred is None:
+        yield from asyncio.wait(tasks, loop=hass.loop)
+        return
+
+    tasks = [asyncio.ensure_future(task, loop=hass.loop) for task in tasks]
+    _, pending = yield from asyncio.wait(
+        tasks, loop=hass.loop, timeout=DEFERRED_SETUP_WAIT)
+
+    for task in pending:
+        deferred.add(task)
+        task.add_done_callback(deferred.discard)
 
 
 def _handle_requirements(hass: core.HomeAssistant, component,
@@ -88,16 +362,96 @@ def _handle_requirements(hass: core.HomeAssistant, component,
     if hass.config.skip_pip or not hasattr(component, 'REQUIREMENTS'):
         return True
 
+    satisfied = _requirements_satisfied(hass)
+
     for req in component.REQUIREMENTS:
+        if req in satisfied:
+            continue
+
         if not pkg_util.install_package(req, target=hass.config.path('deps')):
             _LOGGER.error('Not initializing %s because could not install '
                           'dependency %s', name, req)
             _async_persistent_notification(hass, name)
             return False
 
+        _mark_requirements_satisfied(hass, [req])
+
     return True
 
 
+def _install_all_requirements(hass: core.HomeAssistant, config: Dict,
+                              domains) -> None:
+    """Install the requirements of the components and platforms at once.
+
+    Requirements that fail to install together are retried per component
+    by _handle_requirements.
+    This method needs to run in an executor.
+    """
+    requirements = OrderedDict()
+
+    for domain in domains:
+        manifest = loader.get_manifest(domain)
+        if manifest is None:
+            continue
+
+        requirements.update(
+            (req, None) for req in manifest['requirements'])
+
+        for p_name, _ in config_per_platform(config, domain):
+            if p_name not in manifest['platforms']:
+                continue
+
+            platform = loader.get_manifest(
+                PLATFORM_FORMAT.format(domain, p_name))
+            if platform is not None:
+                requirements.update(
+                    (req, None) for req in platform['requirements'])
+
+    satisfied = _requirements_satisfied(hass)
+    missing = [req for req in requirements if req not in satisfied]
+
+    if not missing:
+        return
+
+    if pkg_util.install_packages(missing, target=hass.config.path('deps')):
+        _mark_requirements_satisfied(hass, missing)
+    else:
+        _LOGGER.warning('Unable to install all requirements at once, '
+                        'installing them per component')
+
+
+def _requirements_satisfied(hass: core.HomeAssistant):
+    """Return the requirements known to be satisfied.
+
+    This method needs to run in an executor.
+    """
+    with _REQUIREMENTS_LOCK:
+        satisfied = hass.data.get(DATA_REQUIREMENTS)
+
+        if satisfied is None:
+            satisfied = hass.data[DATA_REQUIREMENTS] = \
+                pkg_util.load_requirements_cache(
+                    hass.config.path(REQUIREMENTS_CACHE),
+                    hass.config.path('deps'))
+
+        return satisfied
+
+
+def _mark_requirements_satisfied(hass: core.HomeAssistant,
+                                 requirements) -> None:
+    """Remember that requirements are satisfied, also for the next start.
+
+    This method needs to run in an executor.
+    """
+    satisfied = _requirements_satisfied(hass)
+
+    with _REQUIREMENTS_LOCK:
+        satisfied.update(requirements)
+        pkg_util.save_requirements_cache(
+            hass.config.path(REQUIREMENTS_CACHE), hass.config.path('deps'),
+            satisfied)
+
+
 @asyncio.coroutine
 def _async_setup_component(hass: core.HomeAssistant,
                            domain: str, config) -> bool:
@@ -113,15 +467,25 @@ def _async_setup_component(hass: core.HomeAssistant,
     if setup_lock is None:
         setup_lock = hass.data['setup_lock'] = asyncio.Lock(loop=hass.loop)
 
-    setup_progress = hass.data.get('setup_progress')
-    if setup_progress is None:
-        setup_progress = hass.data['setup_progress'] = []
-
-    if domain in setup_progress:
-        _LOGGER.error('Attempt made to setup %s during setup of %s',
-                      domain, domain)
-        _async_persistent_notification(hass, domain, True)
-        return False
+    start = timer()
+    component = yield from loader.async_get_component(hass, domain)
+    startup_timing.async_record(
+        hass, startup_timing.PHASE_IMPORT, domain,
+        timer() - start)
+
+    # Dependencies are set up concurrently, each only once
+    dependencies = getattr(component, 'DEPENDENCIES', [])
+    if dependencies:
+        chain = _async_current_chain(hass)
+        results = yield from asyncio.gather(*[
+            _async_setup_component_in_chain(hass, dep, config, chain)
+            for dep in dependencies], loop=hass.loop)
+
+        for dep, res in zip(dependencies, results):
+            if not res:
+                _LOGGER.error('Component %s failed to setup', dep)
+                _async_persistent_notification(hass, domain, True)
+                return False
 
     try:
         # Used to indicate to discovery that a setup is ongoing and allow it
@@ -131,7 +495,6 @@ def _async_setup_component(hass: core.HomeAssistant,
             yield from setup_lock.acquire()
             did_lock = True
 
-        setup_progress.append(domain)
         config = yield from async_prepare_setup_component(hass, config, domain)
 
         if config is None:
@@ -143,18 +506,40 @@ def _async_setup_component(hass: core.HomeAssistant,
             return False
 
         async_comp = hasattr(component, 'async_setup')
+        timeout = getattr(component, 'SETUP_TIMEOUT', SETUP_TIMEOUT)
+
+        if not async_comp:
+            slots = _async_setup_slots(hass)
+            yield from slots.async_acquire(domain)
 
         try:
             _LOGGER.info("Setting up %s", domain)
-            if async_comp:
-                result = yield from component.async_setup(hass, config)
-            else:
-                result = yield from hass.loop.run_in_executor(
-                    None, component.setup, hass, config)
+            with async_timeout.timeout(timeout, loop=hass.loop):
+                if async_comp:
+                    start = timer()
+                    result = yield from component.async_setup(hass, config)
+                    startup_timing.async_record(
+                        hass, startup_timing.PHASE_SETUP, domain,
+                        timer() - start)
+                else:
+                    result = yield from startup_timing.async_run_timed_job(
+                        hass, startup_timing.PHASE_SETUP, domain,
+                        _setup_in_chain, _async_current_chain(hass),
+                        component.setup, hass, config,
+                        executor=_SETUP_EXECUTOR)
+        except asyncio.TimeoutError:
+            # A synchronous setup keeps running in its executor thread
+            _LOGGER.error('Setup of %s did not finish within %d seconds',
+                          domain, timeout)
+            _async_persistent_notification(hass, domain, True)
+            return False
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception('Error during setup of component %s', domain)
             _async_persistent_notification(hass, domain, True)
             return False
+        finally:
+            if not async_comp:
+                slots.async_release(domain)
 
         if result is False:
             _LOGGER.error('component %s failed to initialize', domain)
@@ -175,7 +560,6 @@ def _async_setup_component(hass: core.HomeAssistant,
 
         return True
     finally:
-        setup_progress.remove(domain)
         if did_lock:
             setup_lock.release()
 
@@ -196,7 +580,7 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
     This method is a coroutine.
     """
     # pylint: disable=too-many-return-statements
-    component = loader.get_component(domain)
+    component = yield from loader.async_get_component(hass, domain)
     missing_deps = [dep for dep in getattr(component, 'DEPENDENCIES', [])
                     if dep not in hass.config.components]
 
@@ -255,8 +639,9 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
                   if key not in filter_keys}
         config[domain] = platforms
 
-    res = yield from hass.loop.run_in_executor(
-        None, _handle_requirements, hass, component, domain)
+    res = yield from startup_timing.async_run_timed_job(
+        hass, startup_timing.PHASE_REQUIREMENTS, domain,
+        _handle_requirements, hass, component, domain)
     if not res:
         return None
 
@@ -285,7 +670,12 @@ def async_prepare_setup_platform(hass: core.HomeAssistant, config, domain: str,
 
     platform_path = PLATFORM_FORMAT.format(domain, platform_name)
 
-    platform = loader.get_platform(domain, platform_name)
+    start = timer()
+    platform = yield from loader.async_get_platform(
+        hass, domain, platform_name)
+    startup_timing.async_record(
+        hass, startup_timing.PHASE_IMPORT, platform_path,
+        timer() - start)
 
     # Not found
     if platform is None:
@@ -312,8 +702,9 @@ def async_prepare_setup_platform(hass: core.HomeAssistant, config, domain: str,
             _async_persistent_notification(hass, platform_path, True)
             return None
 
-    res = yield from hass.loop.run_in_executor(
-        None, _handle_requirements, hass, platform, platform_path)
+    res = yield from startup_timing.async_run_timed_job(
+        hass, startup_timing.PHASE_REQUIREMENTS, platform_path,
+        _handle_requirements, hass, platform, platform_path)
     if not res:
         return None
 
@@ -393,6 +784,9 @@ def async_from_config_dict(config: Dict[str, Any],
     if enable_log:
         async_enable_logging(hass, verbose, log_rotate_days)
 
+    if hass.config.deferred_startup:
+        hass.data[DATA_DEFERRED_SETUP] = set()
+
     hass.config.skip_pip = skip_pip
     if skip_pip:
         _LOGGER.warning('Skipping pip installation of required modules. '
@@ -435,17 +829,57 @@ def async_from_config_dict(config: Dict[str, Any],
 
     # Setup the components
     dependency_blacklist = loader.DEPENDENCY_BLACKLIST - set(components)
+    load_order = loader.load_order_components(components)
 
-    for domain in loader.load_order_components(components):
+    for domain in load_order:
         if domain in dependency_blacklist:
             raise HomeAssistantError(
                 '{} is not allowed to be a dependency'.format(domain))
 
-        yield from _async_setup_component(hass, domain, config)
+    if not hass.config.skip_pip:
+        yield from startup_timing.async_run_timed_job(
+            hass, startup_timing.PHASE_REQUIREMENTS, 'all',
+            _install_all_requirements, hass, config, load_order)
+
+    # Components that do not depend on group are set up before the
+    # group component as they usually set up the states groups contain.
+    first_init = [domain for domain in load_order
+                  if domain in FIRST_INIT_COMPONENTS]
+    grouped = [domain for domain in load_order
+               if 'group' in loader.load_order_component(domain)]
+    stages = (first_init,
+              [domain for domain in load_order
+               if domain not in first_init and domain not in grouped],
+              [domain for domain in grouped if domain not in first_init])
+
+    for stage in stages:
+        yield from _async_setup_components(hass, stage, config)
+
+    @asyncio.coroutine
+    def async_finish_startup(event):
+        """Fire the started event once all deferred setups are done."""
+        deferred = hass.data.get(DATA_DEFERRED_SETUP)
+
+        while deferred:
+            yield from asyncio.wait(list(deferred), loop=hass.loop)
+
+        hass.data.pop(DATA_DEFERRED_SETUP, None)
+        startup_timing.async_finish(hass)
+        startup_timing.async_log_report(hass)
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START,
+                               async_finish_startup)
 
     setup_lock.release()
 
-    yield from hass.async_stop_track_tasks()
+    if DATA_DEFERRED_SETUP in hass.data:
+        # Jobs the setups added keep being tracked until they are done
+        yield from asyncio.wait(
+            [hass.async_stop_track_tasks()], loop=hass.loop,
+            timeout=DEFERRED_SETUP_WAIT)
+    else:
+        yield from hass.async_stop_track_tasks()
 
     async_register_signal_handling(hass)
     return hass
@@ -455,7 +889,8 @@ def from_config_file(config_path: str,
                      hass: Optional[core.HomeAssistant]=None,
                      verbose: bool=False,
                      skip_pip: bool=True,
-                     log_rotate_days: Any=None):
+                     log_rotate_days: Any=None,
+                     config_cache: bool=False):
     """Read the configuration file and try to start all the functionality.
 
     Will add functionality to 'hass' parameter if given,
@@ -468,7 +903,8 @@ def from_config_file(config_path: str,
     def _async_init_from_config_file(future):
         try:
             re_hass = yield from async_from_config_file(
-                config_path, hass, verbose, skip_pip, log_rotate_days)
+                config_path, hass, verbose, skip_pip, log_rotate_days,
+                config_cache)
             future.set_result(re_hass)
         # pylint: disable=broad-except
         except Exception as exc:
@@ -487,10 +923,12 @@ def async_from_config_file(config_path: str,
                            hass: core.HomeAssistant,
                            verbose: bool=False,
                            skip_pip: bool=True,
-                           log_rotate_days: Any=None):
+                           log_rotate_days: Any=None,
+                           config_cache: bool=False):
     """Read the configuration file and try to start all the functionality.
 
     Will add functionality to 'hass' parameter.
+    The parsed configuration is cached between restarts if config_cache.
     This method is a coroutine.
     """
     # Set config dir to directory holding config file
@@ -502,8 +940,9 @@ def async_from_config_file(config_path: str,
     async_enable_logging(hass, verbose, log_rotate_days)
 
     try:
-        config_dict = yield from hass.loop.run_in_executor(
-            None, conf_util.load_yaml_config_file, config_path)
+        config_dict = yield from startup_timing.async_run_timed_job(
+            hass, startup_timing.PHASE_CONFIG, config_path,
+            conf_util.load_yaml_config_file, config_path, config_cache)
     except HomeAssistantError:
         return None
     finally:
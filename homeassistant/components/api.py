@@ -5,27 +5,32 @@ For more details about the RESTful API, please refer to the documentation at
 https://home-assistant.io/developers/api/
 """
 import asyncio
+import hashlib
 import json
 import logging
+import zlib
 
-from aiohttp import web
+from aiohttp import hdrs, web
 import async_timeout
 
 import homeassistant.core as ha
 import homeassistant.remote as rem
 from homeassistant.bootstrap import ERROR_LOG_FILENAME
 from homeassistant.const import (
-    EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED,
-    HTTP_BAD_REQUEST, HTTP_CREATED, HTTP_NOT_FOUND,
-    HTTP_UNPROCESSABLE_ENTITY, MATCH_ALL, URL_API, URL_API_COMPONENTS,
-    URL_API_CONFIG, URL_API_DISCOVERY_INFO, URL_API_ERROR_LOG,
-    URL_API_EVENT_FORWARD, URL_API_EVENTS, URL_API_SERVICES,
-    URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE,
-    __version__)
+    CONTENT_TYPE_JSON, EVENT_HOMEASSISTANT_STOP, EVENT_SERVICE_REGISTERED,
+    EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, HTTP_BAD_REQUEST, HTTP_CREATED,
+    HTTP_NOT_FOUND, HTTP_UNPROCESSABLE_ENTITY, MATCH_ALL, URL_API,
+    URL_API_BATCH_EVENTS, URL_API_BATCH_SERVICES, URL_API_BATCH_STATES,
+    URL_API_COMPONENTS, URL_API_CONFIG, URL_API_DISCOVERY_INFO,
+    URL_API_ERROR_LOG, URL_API_EVENT_FORWARD, URL_API_EVENTS,
+    URL_API_SERVICES, URL_API_STARTUP_TIMINGS, URL_API_STATES,
+    URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE, __version__)
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.state import AsyncTrackStates
-from homeassistant.helpers import template
+from homeassistant.helpers import startup_timing, template
+import homeassistant.helpers.json as json_helper
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.http.const import KEY_COMPRESSION_LEVEL
 
 DOMAIN = 'api'
 DEPENDENCIES = ['http']
@@ -38,24 +43,87 @@ _LOGGER = logging.getLogger(__name__)
 
 def setup(hass, config):
     """Register the API with the HTTP interface."""
+    states_snapshot = JSONSnapshot(hass.states.async_all)
+    services_snapshot = JSONSnapshot(lambda: async_services_json(hass))
+
+    hass.bus.listen(EVENT_STATE_CHANGED, states_snapshot.async_invalidate)
+    hass.bus.listen(EVENT_SERVICE_REGISTERED,
+                    services_snapshot.async_invalidate)
+
     hass.http.register_view(APIStatusView)
     hass.http.register_view(APIEventStream)
     hass.http.register_view(APIConfigView)
     hass.http.register_view(APIDiscoveryView)
-    hass.http.register_view(APIStatesView)
+    hass.http.register_view(APIStatesView(states_snapshot))
     hass.http.register_view(APIEntityStateView)
     hass.http.register_view(APIEventListenersView)
     hass.http.register_view(APIEventView)
-    hass.http.register_view(APIServicesView)
+    hass.http.register_view(APIServicesView(services_snapshot))
     hass.http.register_view(APIDomainServicesView)
     hass.http.register_view(APIEventForwardingView)
     hass.http.register_view(APIComponentsView)
+    hass.http.register_view(APIStartupTimingsView)
     hass.http.register_view(APIErrorLogView)
     hass.http.register_view(APITemplateView)
+    hass.http.register_view(APIBatchStatesView)
+    hass.http.register_view(APIBatchServicesView)
+    hass.http.register_view(APIBatchEventsView)
 
     return True
 
 
+class JSONSnapshot(object):
+    """Cache the encoded JSON of a value until it is invalidated.
+
+    The body is encoded the same way as HomeAssistantView.json and is
+    rebuilt on the first request after an invalidation. The ETag is derived
+    from the body so clients can revalidate with If-None-Match.
+    """
+
+    def __init__(self, generate):
+        """Initialize the snapshot."""
+        self._generate = generate
+        self._body = None
+        self._etag = None
+
+    @ha.callback
+    def async_invalidate(self, event=None):
+        """Discard the cached body.
+
+        This method must be run in the event loop.
+        """
+        self._body = None
+
+    @ha.callback
+    def async_get(self):
+        """Return the encoded body and its ETag.
+
+        This method must be run in the event loop.
+        """
+        if self._body is None:
+            self._body = json_helper.dumps(
+                self._generate(), sort_keys=True).encode('UTF-8')
+            self._etag = '"{}"'.format(
+                hashlib.sha1(self._body).hexdigest())
+
+        return self._body, self._etag
+
+    @ha.callback
+    def async_response(self, request):
+        """Return the snapshot or 304 if the client has the current one.
+
+        This method must be run in the event loop.
+        """
+        body, etag = self.async_get()
+        headers = {hdrs.ETAG: etag}
+
+        if etag_matches(request.headers.get(hdrs.IF_NONE_MATCH), etag):
+            return web.Response(status=304, headers=headers)
+
+        return web.Response(body=body, content_type=CONTENT_TYPE_JSON,
+                            headers=headers)
+
+
 class APIStatusView(HomeAssistantView):
     """View to handle Status requests."""
 
@@ -100,12 +168,20 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=rem.JSONEncoder)
+                data = json_helper.dumps(event)
 
             yield from to_write.put(data)
 
         response = web.StreamResponse()
         response.content_type = 'text/event-stream'
+
+        compressor = None
+        level = request.app.get(KEY_COMPRESSION_LEVEL)
+        accept_encoding = request.headers.get(hdrs.ACCEPT_ENCODING, '')
+        if level and accepts_encoding(accept_encoding, 'gzip'):
+            compressor = stream_compressor(level)
+            response.headers[hdrs.CONTENT_ENCODING] = 'gzip'
+
         yield from response.prepare(request)
 
         unsub_stream = hass.bus.async_listen(MATCH_ALL, forward_events)
@@ -128,7 +204,10 @@ class APIEventStream(HomeAssistantView):
                     msg = "data: {}\n\n".format(payload)
                     _LOGGER.debug('STREAM %s WRITING %s', id(stop_obj),
                                   msg.strip())
-                    response.write(msg.encode("UTF-8"))
+                    data = msg.encode("UTF-8")
+                    if compressor is not None:
+                        data = compress_chunk(compressor, data)
+                    response.write(data)
                     yield from response.drain()
                 except asyncio.TimeoutError:
                     yield from to_write.put(STREAM_PING_PAYLOAD)
@@ -179,10 +258,14 @@ class APIStatesView(HomeAssistantView):
     url = URL_API_STATES
     name = "api:states"
 
+    def __init__(self, snapshot):
+        """Initialize the states view."""
+        self.snapshot = snapshot
+
     @ha.callback
     def get(self, request):
         """Get current states."""
-        return self.json(request.app['hass'].states.async_all())
+        return self.snapshot.async_response(request)
 
 
 class APIEntityStateView(HomeAssistantView):
@@ -268,17 +351,7 @@ class APIEventView(HomeAssistantView):
             return self.json_message('Event data should be a JSON object',
                                      HTTP_BAD_REQUEST)
 
-        # Special case handling for event STATE_CHANGED
-        # We will try to convert state dicts back to State objects
-        if event_type == ha.EVENT_STATE_CHANGED and event_data:
-            for key in ('old_state', 'new_state'):
-                state = ha.State.from_dict(event_data.get(key))
-
-                if state:
-                    event_data[key] = state
-
-        request.app['hass'].bus.async_fire(event_type, event_data,
-                                           ha.EventOrigin.remote)
+        async_fire_remote_event(request.app['hass'], event_type, event_data)
 
         return self.json_message("Event {} fired.".format(event_type))
 
@@ -289,10 +362,14 @@ class APIServicesView(HomeAssistantView):
     url = URL_API_SERVICES
     name = "api:services"
 
+    def __init__(self, snapshot):
+        """Initialize the services view."""
+        self.snapshot = snapshot
+
     @ha.callback
     def get(self, request):
         """Get registered services."""
-        return self.json(async_services_json(request.app['hass']))
+        return self.snapshot.async_response(request)
 
 
 class APIDomainServicesView(HomeAssistantView):
@@ -400,6 +477,19 @@ class APIComponentsView(HomeAssistantView):
         return self.json(request.app['hass'].config.components)
 
 
+class APIStartupTimingsView(HomeAssistantView):
+    """View to handle startup timing requests."""
+
+    url = URL_API_STARTUP_TIMINGS
+    name = "api:startup-timings"
+
+    @ha.callback
+    def get(self, request):
+        """Get how long the phases of the startup took, slowest first."""
+        return self.json(
+            startup_timing.async_get_report(request.app['hass']))
+
+
 class APIErrorLogView(HomeAssistantView):
     """View to handle ErrorLog requests."""
 
@@ -432,6 +522,215 @@ class APITemplateView(HomeAssistantView):
                                      HTTP_BAD_REQUEST)
 
 
+def etag_matches(if_none_match, etag):
+    """Return if an If-None-Match header value matches etag."""
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate in ('*', etag):
+            return True
+
+    return False
+
+
+def accepts_encoding(accept_encoding, encoding):
+    """Return if an Accept-Encoding header allows a content encoding.
+
+    Encodings with a q-value of 0 are refused, '*' stands for every
+    encoding that is not listed.
+    """
+    wildcard = False
+
+    for item in accept_encoding.split(','):
+        token, _, params = item.partition(';')
+        token = token.strip().lower()
+        quality = 1.0
+
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if token == encoding:
+            return quality > 0
+        elif token == '*':
+            wildcard = quality > 0
+
+    return wildcard
+
+
+def stream_compressor(level):
+    """Return a gzip compressor for a streaming response."""
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress_chunk(compressor, data):
+    """Compress data and flush it so the client can decode it right away.
+
+    A sync flush keeps the compression window (and thus the dictionary of
+    repeating keys and entity ids) while emitting every event immediately.
+    """
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class APIBatchStatesView(HomeAssistantView):
+    """View to fetch the states of many entities at once."""
+
+    url = URL_API_BATCH_STATES
+    name = "api:batch-states"
+
+    @asyncio.coroutine
+    def post(self, request):
+        """Return the states for a list of entity ids.
+
+        The result has one item per requested entity id, null if the entity
+        does not exist or the entity id is not a string.
+        """
+        hass = request.app['hass']
+        try:
+            data = yield from request.json()
+        except ValueError:
+            return self.json_message('Invalid JSON specified',
+                                     HTTP_BAD_REQUEST)
+
+        entity_ids = data.get('entity_id') if isinstance(data, dict) else None
+
+        if not isinstance(entity_ids, list):
+            return self.json_message('No list of entity ids specified',
+                                     HTTP_BAD_REQUEST)
+
+        return self.json([hass.states.get(entity_id)
+                          if isinstance(entity_id, str) else None
+                          for entity_id in entity_ids])
+
+
+class APIBatchServicesView(HomeAssistantView):
+    """View to call many services in one request."""
+
+    url = URL_API_BATCH_SERVICES
+    name = "api:batch-services"
+
+    @asyncio.coroutine
+    def post(self, request):
+        """Call a list of services in order.
+
+        Returns a result per call with the states changed by that call.
+        """
+        hass = request.app['hass']
+        try:
+            calls = yield from request.json()
+        except ValueError:
+            return self.json_message('Invalid JSON specified',
+                                     HTTP_BAD_REQUEST)
+
+        if not isinstance(calls, list):
+            return self.json_message('Service calls should be a JSON list',
+                                     HTTP_BAD_REQUEST)
+
+        results = []
+
+        for call in calls:
+            if not isinstance(call, dict) or 'domain' not in call or \
+                    'service' not in call:
+                results.append(batch_error('Domain and service are required'))
+                continue
+
+            if not isinstance(call['domain'], str) or \
+                    not isinstance(call['service'], str):
+                results.append(
+                    batch_error('Domain and service should be strings'))
+                continue
+
+            service_data = call.get('service_data')
+
+            if service_data is not None and not isinstance(service_data, dict):
+                results.append(
+                    batch_error('Service data should be a JSON object'))
+                continue
+
+            if not hass.services.has_service(call['domain'], call['service']):
+                results.append(batch_error('Service {}.{} not found'.format(
+                    call['domain'], call['service'])))
+                continue
+
+            with AsyncTrackStates(hass) as changed_states:
+                executed = yield from hass.services.async_call(
+                    call['domain'], call['service'], service_data, True)
+
+            results.append({'success': executed,
+                            'changed_states': changed_states})
+
+        return self.json(results)
+
+
+class APIBatchEventsView(HomeAssistantView):
+    """View to fire many events in one request."""
+
+    url = URL_API_BATCH_EVENTS
+    name = "api:batch-events"
+
+    @asyncio.coroutine
+    def post(self, request):
+        """Fire a list of events in order."""
+        hass = request.app['hass']
+        try:
+            events = yield from request.json()
+        except ValueError:
+            return self.json_message('Invalid JSON specified',
+                                     HTTP_BAD_REQUEST)
+
+        if not isinstance(events, list):
+            return self.json_message('Events should be a JSON list',
+                                     HTTP_BAD_REQUEST)
+
+        results = []
+
+        for event in events:
+            if not isinstance(event, dict) or \
+                    not isinstance(event.get('event_type'), str):
+                results.append(batch_error('No event type specified'))
+                continue
+
+            event_data = event.get('event_data')
+
+            if event_data is not None and not isinstance(event_data, dict):
+                results.append(
+                    batch_error('Event data should be a JSON object'))
+                continue
+
+            async_fire_remote_event(hass, event['event_type'], event_data)
+            results.append({'success': True})
+
+        return self.json(results)
+
+
+def batch_error(message):
+    """Return the result of a failed item in a batch request."""
+    return {'success': False, 'message': message}
+
+
+@ha.callback
+def async_fire_remote_event(hass, event_type, event_data):
+    """Fire an event received through the API."""
+    # Special case handling for event STATE_CHANGED
+    # We will try to convert state dicts back to State objects
+    if event_type == ha.EVENT_STATE_CHANGED and event_data:
+        for key in ('old_state', 'new_state'):
+            state = ha.State.from_dict(event_data.get(key))
+
+            if state:
+                event_data[key] = state
+
+    hass.bus.async_fire(event_type, event_data, ha.EventOrigin.remote)
+
+
 def async_services_json(hass):
     """Generate services data to JSONify."""
     return [{"domain": key, "services": value}
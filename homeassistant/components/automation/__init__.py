@@ -8,15 +8,19 @@ import asyncio
 from functools import partial
 import logging
 import os
+from timeit import default_timer as timer
 
 import voluptuous as vol
 
-from homeassistant.bootstrap import async_prepare_setup_platform
+from homeassistant.bootstrap import (
+    ATTR_COMPONENT, async_prepare_setup_platform)
 from homeassistant import config as conf_util
 from homeassistant.const import (
-    ATTR_ENTITY_ID, CONF_PLATFORM, STATE_ON, SERVICE_TURN_ON, SERVICE_TURN_OFF,
-    SERVICE_TOGGLE)
+    ATTR_ENTITY_ID, CONF_PLATFORM, EVENT_COMPONENT_LOADED, EVENT_STATE_CHANGED,
+    MATCH_ALL, STATE_ON, SERVICE_TURN_ON, SERVICE_TURN_OFF, SERVICE_TOGGLE)
+from homeassistant.core import callback
 from homeassistant.components import logbook
+from homeassistant.components.http import HomeAssistantView
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import extract_domain_configs, script, condition
 from homeassistant.helpers.entity import ToggleEntity
@@ -50,10 +54,18 @@ DEFAULT_HIDE_ENTITY = False
 DEFAULT_INITIAL_STATE = True
 
 ATTR_LAST_TRIGGERED = 'last_triggered'
+ATTR_TRIGGER_COUNT = 'trigger_count'
+ATTR_CONDITION_PASS_COUNT = 'condition_pass_count'
+ATTR_LAST_ACTION_DURATION = 'last_action_duration'
+ATTR_TOTAL_ACTION_DURATION = 'total_action_duration'
 ATTR_VARIABLES = 'variables'
 SERVICE_TRIGGER = 'trigger'
 SERVICE_RELOAD = 'reload'
 
+DATA_TRIGGER_INDEX = 'automation_trigger_index'
+
+URL_API_AUTOMATION_STATISTICS = '/api/automation/statistics'
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -219,9 +231,160 @@ def async_setup(hass, config):
             DOMAIN, service, turn_onoff_service_handler,
             descriptions.get(service), schema=SERVICE_SCHEMA)
 
+    if 'http' in hass.config.components:
+        hass.http.register_view(AutomationStatisticsView(component))
+    else:
+        @callback
+        def component_loaded(event):
+            """Register the statistics view once http is loaded."""
+            if event.data.get(ATTR_COMPONENT) == 'http':
+                hass.http.register_view(AutomationStatisticsView(component))
+
+        hass.bus.async_listen(EVENT_COMPONENT_LOADED, component_loaded)
+
     return True
 
 
+@callback
+def async_get_trigger_index(hass):
+    """Return the trigger index of a hass instance.
+
+    This method must be run in the event loop.
+    """
+    index = hass.data.get(DATA_TRIGGER_INDEX)
+
+    if index is None:
+        index = hass.data[DATA_TRIGGER_INDEX] = TriggerIndex(hass)
+
+    return index
+
+
+class TriggerIndex(object):
+    """Pass state changes and MQTT messages to the triggers they match.
+
+    Triggers are indexed by entity id and topic, so a state change only
+    runs the triggers of its entity. Events are already dispatched by type
+    by the event bus.
+    """
+
+    def __init__(self, hass):
+        """Initialize the trigger index."""
+        self.hass = hass
+        # Entity id to a list of (listener, from_state, to_state)
+        self._entities = {}
+        # Topic to a list of [remove subscription, listeners]
+        self._topics = {}
+        self._remove_state_listener = None
+
+    @callback
+    def async_listen_state(self, entity_ids, listener, from_state=MATCH_ALL,
+                           to_state=MATCH_ALL):
+        """Call listener on state changes of entity_ids.
+
+        The listener is called with the entity id, old state and new state
+        if the states match from_state and to_state.
+
+        Returns a function that can be called to remove the listener.
+        """
+        if isinstance(entity_ids, str):
+            entity_ids = (entity_ids,)
+
+        entity_ids = [entity_id.lower() for entity_id in entity_ids]
+        entry = (listener, from_state, to_state)
+
+        for entity_id in entity_ids:
+            self._entities.setdefault(entity_id, []).append(entry)
+
+        if self._remove_state_listener is None:
+            self._remove_state_listener = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed)
+
+        @callback
+        def async_remove():
+            """Remove the listener."""
+            for entity_id in entity_ids:
+                entries = self._entities[entity_id]
+                entries.remove(entry)
+                if not entries:
+                    del self._entities[entity_id]
+
+            if not self._entities:
+                self._remove_state_listener()
+                self._remove_state_listener = None
+
+        return async_remove
+
+    @callback
+    def _async_state_changed(self, event):
+        """Run the listeners of the entity that changed."""
+        entity_id = event.data.get('entity_id')
+        entries = self._entities.get(entity_id)
+
+        if entries is None:
+            return
+
+        old_state = event.data.get('old_state')
+        new_state = event.data.get('new_state')
+        old_value = None if old_state is None else old_state.state
+        new_value = None if new_state is None else new_state.state
+
+        for listener, from_state, to_state in tuple(entries):
+            if from_state is not MATCH_ALL and from_state != old_value or \
+                    to_state is not MATCH_ALL and to_state != new_value:
+                continue
+
+            self.hass.async_run_job(listener, entity_id, old_state, new_state)
+
+    @asyncio.coroutine
+    def async_listen_topic(self, topic, listener):
+        """Call listener with topic, payload and qos of MQTT messages.
+
+        Every topic is subscribed to once, however many triggers use it.
+        Listeners joining while the topic is subscribed to wait for that
+        subscription and get its error if it fails.
+
+        Returns a function that can be called to remove the listener.
+        """
+        from homeassistant.components import mqtt
+
+        entry = self._topics.get(topic)
+
+        if entry is None:
+            listeners = []
+
+            @callback
+            def topic_listener(msg_topic, payload, qos):
+                """Run the listeners of the topic."""
+                for topic_listener in tuple(listeners):
+                    self.hass.async_run_job(
+                        topic_listener, msg_topic, payload, qos)
+
+            subscribe = self.hass.loop.create_task(
+                mqtt.async_subscribe(self.hass, topic, topic_listener))
+            entry = self._topics[topic] = [subscribe, listeners]
+
+        entry[1].append(listener)
+
+        try:
+            yield from asyncio.shield(entry[0], loop=self.hass.loop)
+        except HomeAssistantError:
+            entry[1].remove(listener)
+            if self._topics.get(topic) is entry:
+                del self._topics[topic]
+            raise
+
+        @callback
+        def async_remove():
+            """Remove the listener."""
+            entry[1].remove(listener)
+
+            if not entry[1] and self._topics.get(topic) is entry:
+                del self._topics[topic]
+                entry[0].result()()
+
+        return async_remove
+
+
 class AutomationEntity(ToggleEntity):
     """Entity to show status of entity."""
 
@@ -236,6 +399,10 @@ class AutomationEntity(ToggleEntity):
         self._enabled = False
         self._last_triggered = None
         self._hidden = hidden
+        self._trigger_count = 0
+        self._condition_pass_count = 0
+        self._last_action_duration = None
+        self._total_action_duration = 0.0
 
     @property
     def name(self):
@@ -249,9 +416,18 @@ class AutomationEntity(ToggleEntity):
 
     @property
     def state_attributes(self):
-        """Return the entity state attributes."""
+        """Return the entity state attributes.
+
+        The state is only written after the action ran, so triggers whose
+        conditions fail are not visible in the state until then. The
+        statistics API always returns the current counts.
+        """
         return {
-            ATTR_LAST_TRIGGERED: self._last_triggered
+            ATTR_LAST_TRIGGERED: self._last_triggered,
+            ATTR_TRIGGER_COUNT: self._trigger_count,
+            ATTR_CONDITION_PASS_COUNT: self._condition_pass_count,
+            ATTR_LAST_ACTION_DURATION: self._last_action_duration,
+            ATTR_TOTAL_ACTION_DURATION: self._total_action_duration,
         }
 
     @property
@@ -288,12 +464,25 @@ class AutomationEntity(ToggleEntity):
     def async_trigger(self, variables, skip_condition=False):
         """Trigger automation.
 
+        The state attributes are only written after the action ran. Writing
+        them when the conditions fail would fire a state change for every
+        trigger that is filtered out.
+
         This method is a coroutine.
         """
-        if skip_condition or self._cond_func(variables):
-            yield from self._async_action(self.entity_id, variables)
-            self._last_triggered = utcnow()
-            yield from self.async_update_ha_state()
+        self._trigger_count += 1
+
+        if not skip_condition:
+            if not self._cond_func(variables):
+                return
+            self._condition_pass_count += 1
+
+        start = timer()
+        yield from self._async_action(self.entity_id, variables)
+        self._last_action_duration = timer() - start
+        self._total_action_duration += self._last_action_duration
+        self._last_triggered = utcnow()
+        yield from self.async_update_ha_state()
 
     @asyncio.coroutine
     def async_remove(self):
@@ -382,17 +571,18 @@ def _async_process_if(hass, config, p_config):
     """Process if checks."""
     if_configs = p_config.get(CONF_CONDITION)
 
-    checks = []
-    for if_config in if_configs:
-        try:
-            checks.append(condition.async_from_config(if_config, False))
-        except HomeAssistantError as ex:
-            _LOGGER.warning('Invalid condition: %s', ex)
-            return None
+    try:
+        check = condition.async_and_from_config({
+            CONF_CONDITION: CONDITION_TYPE_AND,
+            'conditions': if_configs,
+        }, False)
+    except HomeAssistantError as ex:
+        _LOGGER.warning('Invalid condition: %s', ex)
+        return None
 
     def if_action(variables=None):
         """AND all conditions."""
-        return all(check(hass, variables) for check in checks)
+        return check(hass, variables)
 
     return if_action
 
@@ -430,3 +620,22 @@ def _async_process_trigger(hass, config, trigger_configs, name, action):
             remove()
 
     return remove_triggers
+
+
+class AutomationStatisticsView(HomeAssistantView):
+    """View to return the trigger and action statistics of automations."""
+
+    url = URL_API_AUTOMATION_STATISTICS
+    name = 'api:automation:statistics'
+
+    def __init__(self, component):
+        """Initialize the statistics view."""
+        self.component = component
+
+    @callback
+    def get(self, request):
+        """Return the statistics per automation."""
+        return self.json({
+            entity.entity_id: entity.state_attributes
+            for entity in self.component.entities.values()
+        })
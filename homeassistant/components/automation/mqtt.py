@@ -10,6 +10,7 @@ import json
 import voluptuous as vol
 
 from homeassistant.core import callback
+from homeassistant.components.automation import async_get_trigger_index
 import homeassistant.components.mqtt as mqtt
 from homeassistant.const import (CONF_PLATFORM, CONF_PAYLOAD)
 import homeassistant.helpers.config_validation as cv
@@ -51,6 +52,6 @@ def async_trigger(hass, config, action):
                 'trigger': data
             })
 
-    remove = yield from mqtt.async_subscribe(
-        hass, topic, mqtt_automation_listener)
+    remove = yield from async_get_trigger_index(hass).async_listen_topic(
+        topic, mqtt_automation_listener)
     return remove
@@ -13,7 +13,7 @@ from homeassistant.core import callback
 from homeassistant.const import (
     CONF_VALUE_TEMPLATE, CONF_PLATFORM, CONF_ENTITY_ID,
     CONF_BELOW, CONF_ABOVE)
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.components.automation import async_get_trigger_index
 from homeassistant.helpers import condition, config_validation as cv
 
 TRIGGER_SCHEMA = vol.All(vol.Schema({
@@ -68,4 +68,5 @@ def async_trigger(hass, config, action):
 
         hass.async_run_job(action, variables)
 
-    return async_track_state_change(hass, entity_id, state_automation_listener)
+    return async_get_trigger_index(hass).async_listen_state(
+        entity_id, state_automation_listener)
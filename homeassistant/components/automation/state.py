@@ -10,8 +10,8 @@ import voluptuous as vol
 from homeassistant.core import callback
 import homeassistant.util.dt as dt_util
 from homeassistant.const import MATCH_ALL, CONF_PLATFORM
-from homeassistant.helpers.event import (
-    async_track_state_change, async_track_point_in_utc_time)
+from homeassistant.components.automation import async_get_trigger_index
+from homeassistant.helpers.event import async_track_point_in_utc_time
 import homeassistant.helpers.config_validation as cv
 
 CONF_ENTITY_ID = "entity_id"
@@ -42,6 +42,7 @@ def async_trigger(hass, config, action):
     from_state = config.get(CONF_FROM, MATCH_ALL)
     to_state = config.get(CONF_TO) or config.get(CONF_STATE) or MATCH_ALL
     time_delta = config.get(CONF_FOR)
+    index = async_get_trigger_index(hass)
     async_remove_state_for_cancel = None
     async_remove_state_for_listener = None
 
@@ -93,11 +94,11 @@ def async_trigger(hass, config, action):
         async_remove_state_for_listener = async_track_point_in_utc_time(
             hass, state_for_listener, dt_util.utcnow() + time_delta)
 
-        async_remove_state_for_cancel = async_track_state_change(
-            hass, entity, state_for_cancel_listener)
+        async_remove_state_for_cancel = index.async_listen_state(
+            entity, state_for_cancel_listener)
 
-    unsub = async_track_state_change(
-        hass, entity_id, state_automation_listener, from_state, to_state)
+    unsub = index.async_listen_state(
+        entity_id, state_automation_listener, from_state, to_state)
 
     @callback
     def async_remove():
@@ -5,7 +5,6 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/http/
 """
 import asyncio
-import json
 import logging
 import ssl
 from ipaddress import ip_network
@@ -17,6 +16,7 @@ from aiohttp import web
 from aiohttp.web_exceptions import HTTPUnauthorized, HTTPMovedPermanently
 
 import homeassistant.helpers.config_validation as cv
+import homeassistant.helpers.json as json_helper
 import homeassistant.remote as rem
 import homeassistant.util as hass_util
 from homeassistant.components import persistent_notification
@@ -31,7 +31,7 @@ from .ban import ban_middleware, process_wrong_login
 from .const import (
     KEY_USE_X_FORWARDED_FOR, KEY_TRUSTED_NETWORKS,
     KEY_BANS_ENABLED, KEY_LOGIN_THRESHOLD,
-    KEY_DEVELOPMENT, KEY_AUTHENTICATED)
+    KEY_DEVELOPMENT, KEY_AUTHENTICATED, KEY_COMPRESSION_LEVEL)
 from .static import FILE_SENDER, CACHING_FILE_SENDER, staticresource_middleware
 from .util import get_real_ip
 
@@ -50,6 +50,7 @@ CONF_USE_X_FORWARDED_FOR = 'use_x_forwarded_for'
 CONF_TRUSTED_NETWORKS = 'trusted_networks'
 CONF_LOGIN_ATTEMPTS_THRESHOLD = 'login_attempts_threshold'
 CONF_IP_BAN_ENABLED = 'ip_ban_enabled'
+CONF_COMPRESSION_LEVEL = 'compression_level'
 
 NOTIFICATION_ID_LOGIN = 'http-login'
 
@@ -79,6 +80,7 @@ _LOGGER = logging.getLogger(__name__)
 DEFAULT_SERVER_HOST = '0.0.0.0'
 DEFAULT_DEVELOPMENT = '0'
 DEFAULT_LOGIN_ATTEMPT_THRESHOLD = -1
+DEFAULT_COMPRESSION_LEVEL = 0
 
 HTTP_SCHEMA = vol.Schema({
     vol.Optional(CONF_API_PASSWORD, default=None): cv.string,
@@ -96,7 +98,9 @@ HTTP_SCHEMA = vol.Schema({
         vol.All(cv.ensure_list, [ip_network]),
     vol.Optional(CONF_LOGIN_ATTEMPTS_THRESHOLD,
                  default=DEFAULT_LOGIN_ATTEMPT_THRESHOLD): cv.positive_int,
-    vol.Optional(CONF_IP_BAN_ENABLED, default=True): cv.boolean
+    vol.Optional(CONF_IP_BAN_ENABLED, default=True): cv.boolean,
+    vol.Optional(CONF_COMPRESSION_LEVEL, default=DEFAULT_COMPRESSION_LEVEL):
+        vol.All(vol.Coerce(int), vol.Range(min=0, max=9)),
 })
 
 CONFIG_SCHEMA = vol.Schema({
@@ -123,6 +127,7 @@ def async_setup(hass, config):
     trusted_networks = conf[CONF_TRUSTED_NETWORKS]
     is_ban_enabled = conf[CONF_IP_BAN_ENABLED]
     login_threshold = conf[CONF_LOGIN_ATTEMPTS_THRESHOLD]
+    compression_level = conf[CONF_COMPRESSION_LEVEL]
 
     if api_password is not None:
         logging.getLogger('aiohttp.access').addFilter(
@@ -140,7 +145,8 @@ def async_setup(hass, config):
         use_x_forwarded_for=use_x_forwarded_for,
         trusted_networks=trusted_networks,
         login_threshold=login_threshold,
-        is_ban_enabled=is_ban_enabled
+        is_ban_enabled=is_ban_enabled,
+        compression_level=compression_level
     )
 
     @asyncio.coroutine
@@ -181,7 +187,7 @@ class HomeAssistantWSGI(object):
     def __init__(self, hass, development, api_password, ssl_certificate,
                  ssl_key, server_host, server_port, cors_origins,
                  use_x_forwarded_for, trusted_networks,
-                 login_threshold, is_ban_enabled):
+                 login_threshold, is_ban_enabled, compression_level=0):
         """Initialize the WSGI Home Assistant server."""
         import aiohttp_cors
 
@@ -197,6 +203,7 @@ class HomeAssistantWSGI(object):
         self.app[KEY_BANS_ENABLED] = is_ban_enabled
         self.app[KEY_LOGIN_THRESHOLD] = login_threshold
         self.app[KEY_DEVELOPMENT] = development
+        self.app[KEY_COMPRESSION_LEVEL] = compression_level
 
         self.hass = hass
         self.development = development
@@ -354,8 +361,7 @@ class HomeAssistantView(object):
     # pylint: disable=no-self-use
     def json(self, result, status_code=200):
         """Return a JSON response."""
-        msg = json.dumps(
-            result, sort_keys=True, cls=rem.JSONEncoder).encode('UTF-8')
+        msg = json_helper.dumps(result, sort_keys=True).encode('UTF-8')
         return web.Response(
             body=msg, content_type=CONTENT_TYPE_JSON, status=status_code)
 
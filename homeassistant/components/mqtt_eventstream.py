@@ -16,7 +16,7 @@ from homeassistant.const import (
     EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
 from homeassistant.core import EventOrigin, State
 import homeassistant.helpers.config_validation as cv
-from homeassistant.remote import JSONEncoder
+import homeassistant.helpers.json as json_helper
 from .mqtt import EVENT_MQTT_MESSAGE_RECEIVED
 
 DOMAIN = "mqtt_eventstream"
@@ -80,7 +80,7 @@ def setup(hass, config):
             return
 
         event_info = {'event_type': event.event_type, 'event_data': event.data}
-        msg = json.dumps(event_info, cls=JSONEncoder)
+        msg = json_helper.dumps(event_info)
         mqtt.publish(hass, pub_topic, msg)
 
     # Only listen for local events if you are going to publish them.
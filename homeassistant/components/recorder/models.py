@@ -10,7 +10,7 @@ from sqlalchemy.ext.declarative import declarative_base
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import Event, EventOrigin, State, split_entity_id
-from homeassistant.remote import JSONEncoder
+import homeassistant.helpers.json as json_helper
 
 # SQLAlchemy Schema
 # pylint: disable=invalid-name
@@ -36,7 +36,7 @@ class Events(Base):  # type: ignore
     def from_event(event):
         """Create an event database object from a native event."""
         return Events(event_type=event.event_type,
-                      event_data=json.dumps(event.data, cls=JSONEncoder),
+                      event_data=json_helper.dumps(event.data),
                       origin=str(event.origin),
                       time_fired=event.time_fired)
 
@@ -92,8 +92,7 @@ class States(Base):   # type: ignore
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes),
-                                            cls=JSONEncoder)
+            dbstate.attributes = json_helper.dumps(dict(state.attributes))
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -1,8 +1,8 @@
 """Websocket based API for Home Assistant."""
 import asyncio
-from functools import partial
-import json
+from collections import deque
 import logging
+import uuid
 
 from aiohttp import web
 import voluptuous as vol
@@ -10,20 +10,23 @@ from voluptuous.humanize import humanize_error
 
 from homeassistant.const import (
     MATCH_ALL, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
-    __version__)
+    EVENT_STATE_CHANGED, URL_API_WEBSOCKET, __version__)
 from homeassistant.components import frontend
-from homeassistant.core import callback
-from homeassistant.remote import JSONEncoder
+from homeassistant.core import callback, split_entity_id
 from homeassistant.helpers import config_validation as cv
+import homeassistant.helpers.json as json_helper
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.http.auth import validate_password
 from homeassistant.components.http.const import KEY_AUTHENTICATED
 
 DOMAIN = 'websocket_api'
 
-URL = "/api/websocket"
+URL = URL_API_WEBSOCKET
 DEPENDENCIES = 'http',
 
+DATA_STATE_JOURNAL = 'websocket_api_state_journal'
+DEFAULT_JOURNAL_SIZE = 10000
+
 ERR_ID_REUSE = 1
 ERR_INVALID_FORMAT = 2
 ERR_NOT_FOUND = 3
@@ -41,12 +44,14 @@ TYPE_GET_STATES = 'get_states'
 TYPE_PING = 'ping'
 TYPE_PONG = 'pong'
 TYPE_RESULT = 'result'
+TYPE_STATE_DIFF = 'state_diff'
 TYPE_SUBSCRIBE_EVENTS = 'subscribe_events'
+TYPE_SUBSCRIBE_STATES = 'subscribe_states'
 TYPE_UNSUBSCRIBE_EVENTS = 'unsubscribe_events'
 
 _LOGGER = logging.getLogger(__name__)
 
-JSON_DUMP = partial(json.dumps, cls=JSONEncoder)
+JSON_DUMP = json_helper.dumps
 
 AUTH_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('type'): TYPE_AUTH,
@@ -59,6 +64,17 @@ SUBSCRIBE_EVENTS_MESSAGE_SCHEMA = vol.Schema({
     vol.Optional('event_type', default=MATCH_ALL): str,
 })
 
+SUBSCRIBE_STATES_MESSAGE_SCHEMA = vol.Schema({
+    vol.Required('id'): cv.positive_int,
+    vol.Required('type'): TYPE_SUBSCRIBE_STATES,
+    vol.Optional('entity_id'): cv.entity_ids,
+    vol.Optional('domain'): vol.All(cv.ensure_list_csv, [cv.string]),
+    vol.Optional('since'): vol.Schema({
+        vol.Required('epoch'): vol.Any(str, None),
+        vol.Required('version'): cv.positive_int,
+    }),
+})
+
 UNSUBSCRIBE_EVENTS_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('id'): cv.positive_int,
     vol.Required('type'): TYPE_UNSUBSCRIBE_EVENTS,
@@ -102,6 +118,7 @@ BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('id'): cv.positive_int,
     vol.Required('type'): vol.Any(TYPE_CALL_SERVICE,
                                   TYPE_SUBSCRIBE_EVENTS,
+                                  TYPE_SUBSCRIBE_STATES,
                                   TYPE_UNSUBSCRIBE_EVENTS,
                                   TYPE_GET_STATES,
                                   TYPE_GET_SERVICES,
@@ -144,6 +161,56 @@ def event_message(iden, event):
     }
 
 
+def state_diff_message(iden, entity_id, old_state, new_state, version=None):
+    """Return a message describing only what changed about an entity.
+
+    New entities are sent in full, removed entities are flagged with
+    ``removed`` and for updates only the state (if changed), the changed
+    attribute keys and the names of removed attribute keys are included.
+    """
+    message = {
+        'id': iden,
+        'type': TYPE_STATE_DIFF,
+        'entity_id': entity_id,
+    }
+
+    if version is not None:
+        message['version'] = version
+
+    if new_state is None:
+        message['removed'] = True
+        return message
+
+    message['last_updated'] = new_state.last_updated
+
+    if old_state is None:
+        message['state'] = new_state.state
+        message['attributes'] = dict(new_state.attributes)
+        message['last_changed'] = new_state.last_changed
+        return message
+
+    if old_state.state != new_state.state or \
+            old_state.last_changed != new_state.last_changed:
+        message['state'] = new_state.state
+        message['last_changed'] = new_state.last_changed
+
+    old_attr = old_state.attributes
+    changed_attr = {key: value for key, value
+                    in new_state.attributes.items()
+                    if key not in old_attr or old_attr[key] != value}
+
+    if changed_attr:
+        message['attributes'] = changed_attr
+
+    removed_attr = [key for key in old_attr
+                    if key not in new_state.attributes]
+
+    if removed_attr:
+        message['attributes_removed'] = removed_attr
+
+    return message
+
+
 def error_message(iden, code, message):
     """Return an error result message."""
     return {
@@ -178,10 +245,46 @@ def result_message(iden, result=None):
 @asyncio.coroutine
 def async_setup(hass, config):
     """Initialize the websocket API."""
+    hass.data[DATA_STATE_JOURNAL] = StateJournal(hass)
     hass.http.register_view(WebsocketAPIView)
     return True
 
 
+class StateJournal(object):
+    """Number state changes so subscribers can catch up after a reconnect.
+
+    The epoch changes on every start of Home Assistant, the version is
+    increased on every state change. The last size changes are kept.
+    """
+
+    def __init__(self, hass, size=DEFAULT_JOURNAL_SIZE):
+        """Initialize the journal."""
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self._changes = deque(maxlen=size)
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    @callback
+    def _async_state_changed(self, event):
+        """Record a state change."""
+        self.version += 1
+        self._changes.append((self.version, event.data['entity_id']))
+
+    @callback
+    def async_changed_since(self, epoch, version):
+        """Return entity ids changed after version.
+
+        Returns None if the changes are no longer known.
+        """
+        if epoch != self.epoch or version > self.version or \
+                version < self.version - len(self._changes):
+            return None
+
+        return set(entity_id for change_version, entity_id
+                   in self._changes if change_version > version)
+
+
 class WebsocketAPIView(HomeAssistantView):
     """View to serve a websockets endpoint."""
 
@@ -359,6 +462,75 @@ class ActiveConnection:
 
         self.send_message(result_message(msg['id']))
 
+    def handle_subscribe_states(self, msg):
+        """Handle subscribe states command.
+
+        Replies with a snapshot of the matching states and then forwards
+        compact diffs for every change to a matching entity.
+
+        If the message contains the epoch and version of a previous
+        subscription, only the entities that changed since are sent.
+        """
+        msg = SUBSCRIBE_STATES_MESSAGE_SCHEMA(msg)
+        journal = self.hass.data[DATA_STATE_JOURNAL]
+        entity_ids = set(msg.get('entity_id', []))
+        domains = set(domain.lower() for domain in msg.get('domain', []))
+        match_all = not entity_ids and not domains
+
+        def matches(entity_id):
+            """Return if entity_id is covered by this subscription."""
+            return (match_all or entity_id in entity_ids or
+                    split_entity_id(entity_id)[0] in domains)
+
+        @callback
+        def forward_state_diff(event):
+            """Helper to forward state diffs to websocket."""
+            entity_id = event.data['entity_id']
+
+            if not matches(entity_id):
+                return
+
+            try:
+                self.send_message(state_diff_message(
+                    msg['id'], entity_id, event.data['old_state'],
+                    event.data['new_state'], journal.version))
+            except RuntimeError:
+                # Socket has been closed.
+                pass
+
+        self.event_listeners[msg['id']] = self.hass.bus.async_listen(
+            EVENT_STATE_CHANGED, forward_state_diff)
+
+        if 'since' not in msg:
+            self.send_message(result_message(
+                msg['id'], [state for state in self.hass.states.async_all()
+                            if matches(state.entity_id)]))
+            return
+
+        changed = journal.async_changed_since(
+            msg['since']['epoch'], msg['since']['version'])
+
+        if changed is None:
+            states = [state for state in self.hass.states.async_all()
+                      if matches(state.entity_id)]
+            removed = []
+        else:
+            changed = [entity_id for entity_id in changed
+                       if matches(entity_id)]
+            states = [self.hass.states.get(entity_id) for entity_id
+                      in changed]
+            removed = [entity_id for entity_id, state
+                       in zip(changed, states) if state is None]
+            states = [state for state in states if state is not None]
+
+        self.send_message(result_message(msg['id'], {
+            'epoch': journal.epoch,
+            'version': journal.version,
+            'full': changed is None,
+            'states': states,
+            'removed': removed,
+        }))
+
     def handle_unsubscribe_events(self, msg):
         """Handle unsubscribe events command."""
         msg = UNSUBSCRIBE_EVENTS_MESSAGE_SCHEMA(msg)
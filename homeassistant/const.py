@@ -79,6 +79,7 @@ CONF_COVERS = 'covers'
 CONF_CUSTOMIZE = 'customize'
 CONF_CUSTOMIZE_DOMAIN = 'customize_domain'
 CONF_CUSTOMIZE_GLOB = 'customize_glob'
+CONF_DEFERRED_STARTUP = 'deferred_startup'
 CONF_DEVICE = 'device'
 CONF_DEVICE_CLASS = 'device_class'
 CONF_DEVICES = 'devices'
@@ -157,6 +158,7 @@ CONF_ZONE = 'zone'
 
 # #### EVENTS ####
 EVENT_HOMEASSISTANT_START = 'homeassistant_start'
+EVENT_HOMEASSISTANT_STARTED = 'homeassistant_started'
 EVENT_HOMEASSISTANT_STOP = 'homeassistant_stop'
 EVENT_HOMEASSISTANT_CLOSE = 'homeassistant_close'
 EVENT_STATE_CHANGED = 'state_changed'
@@ -359,6 +361,11 @@ URL_API_COMPONENTS = '/api/components'
 URL_API_ERROR_LOG = '/api/error_log'
 URL_API_LOG_OUT = '/api/log_out'
 URL_API_TEMPLATE = '/api/template'
+URL_API_BATCH_STATES = '/api/batch/states'
+URL_API_BATCH_SERVICES = '/api/batch/services'
+URL_API_BATCH_EVENTS = '/api/batch/events'
+URL_API_WEBSOCKET = '/api/websocket'
+URL_API_STARTUP_TIMINGS = '/api/startup_timings'
 
 HTTP_OK = 200
 HTTP_CREATED = 201
@@ -8,6 +8,7 @@ of entities and react to changes.
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import enum
+import heapq
 import logging
 import os
 import re
@@ -125,6 +126,7 @@ class HomeAssistant(object):
         self.bus = EventBus(self)
         self.services = ServiceRegistry(self)
         self.states = StateMachine(self.bus, self.loop)
+        self.scheduler = Scheduler(self)
         self.config = Config()  # type: Config
         # This is a dictionary that any component can store any data on.
         self.data = {}
@@ -612,6 +614,10 @@ class StateMachine(object):
     def __init__(self, bus, loop):
         """Initialize state machine."""
         self._states = {}
+        # Entity ids per domain and their sorted tuples, which are cached
+        # until the entity ids of the domain change
+        self._domains = {}
+        self._sorted = {}
         self._bus = bus
         self._loop = loop
 
@@ -631,22 +637,27 @@ class StateMachine(object):
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
-
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+        return list(self._sorted_entity_ids(domain_filter.lower()))
 
     def all(self):
         """Create a list of all states."""
         return run_callback_threadsafe(self._loop, self.async_all).result()
 
     @callback
-    def async_all(self):
+    def async_all(self, domain_filter=None):
         """Create a list of all states.
 
+        With a domain_filter the states of that domain are returned,
+        sorted by entity id.
+
         This method must be run in the event loop.
         """
-        return list(self._states.values())
+        if domain_filter is None:
+            return list(self._states.values())
+
+        states = self._states
+        return [states[entity_id] for entity_id
+                in self._sorted_entity_ids(domain_filter.lower())]
 
     def get(self, entity_id):
         """Retrieve state of entity_id or None if not found.
@@ -688,7 +699,7 @@ class StateMachine(object):
         This method must be run in the event loop.
         """
         entity_id = entity_id.lower()
-        old_state = self._states.pop(entity_id, None)
+        old_state = self._discard_state(entity_id)
 
         if old_state is None:
             return False
@@ -739,13 +750,55 @@ class StateMachine(object):
 
         last_changed = old_state.last_changed if same_state else None
         state = State(entity_id, new_state, attributes, last_changed)
-        self._states[entity_id] = state
+        self._store_state(entity_id, state)
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
             'new_state': state,
         })
 
+    def _sorted_entity_ids(self, domain):
+        """Return the sorted entity ids of a domain."""
+        entity_ids = self._sorted.get(domain)
+
+        if entity_ids is None:
+            entity_ids = self._sorted[domain] = tuple(
+                sorted(self._domains.get(domain, ())))
+
+        return entity_ids
+
+    def _store_state(self, entity_id, state):
+        """Store the state of an entity and index a new entity id."""
+        if entity_id not in self._states:
+            domain = entity_id.partition('.')[0]
+            self._domains.setdefault(domain, set()).add(entity_id)
+            self._sorted.pop(domain, None)
+
+        self._states[entity_id] = state
+
+    def _discard_state(self, entity_id):
+        """Remove the state of an entity and return it if it existed."""
+        old_state = self._states.pop(entity_id, None)
+
+        if old_state is not None:
+            domain = entity_id.partition('.')[0]
+            entity_ids = self._domains[domain]
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self._domains[domain]
+            self._sorted.pop(domain, None)
+
+        return old_state
+
+    def _reset_states(self, states):
+        """Replace all states and rebuild the index."""
+        self._states = {}
+        self._domains = {}
+        self._sorted = {}
+
+        for state in states:
+            self._store_state(state.entity_id, state)
+
 
 class Service(object):
     """Represents a callable service."""
@@ -1009,6 +1062,189 @@ class ServiceRegistry(object):
             self._hass.async_add_job(execute_service)
 
 
+class Scheduler(object):
+    """Run jobs at points in UTC time from a single priority queue.
+
+    While the timer of Home Assistant runs, the loop is woken up with
+    loop.call_at at the earliest deadline only. Otherwise time changed
+    events, like the ones fired in tests, run the jobs that are due.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self._hass = hass
+        # Heap of [point_in_time, sequence, target], target is None once
+        # the job is cancelled
+        self._queue = []
+        self._sequence = 0
+        self._active = 0
+        self._running = False
+        self._handle = None
+        self._unsub_time_changed = None
+        # Latest time seen, to notice the clock being set back
+        self._latest = None
+        self._set_back_listeners = []
+
+    @property
+    def jobs(self) -> int:
+        """Return the number of scheduled jobs."""
+        return self._active
+
+    @callback
+    def async_schedule(self, point_in_time, target: Callable[..., None]):
+        """Run target with the current time once point_in_time has passed.
+
+        Returns a function that cancels the job.
+
+        This method must be run in the event loop.
+        """
+        entry = [point_in_time, self._sequence, target]
+        self._sequence += 1
+        self._active += 1
+        heapq.heappush(self._queue, entry)
+
+        if self._unsub_time_changed is None:
+            self._unsub_time_changed = self._hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed)
+
+        if self._queue[0] is entry:
+            self._async_arm()
+
+        @callback
+        def async_cancel():
+            """Cancel the job if it did not run yet."""
+            if entry[2] is None:
+                return
+
+            entry[2] = None
+            self._active -= 1
+            self._async_cleanup()
+
+        return async_cancel
+
+    @callback
+    def async_listen_time_set_back(self, target: Callable[..., None]):
+        """Call target with the time whenever the clock is set back.
+
+        Jobs scheduled from a computed point in time can use this to
+        compute their point in time again.
+
+        Returns a function that removes the listener.
+
+        This method must be run in the event loop.
+        """
+        utc_now = dt_util.utcnow()
+        if self._latest is None or self._latest < utc_now:
+            self._latest = utc_now
+
+        self._set_back_listeners.append(target)
+
+        @callback
+        def async_remove():
+            """Remove the listener."""
+            self._set_back_listeners.remove(target)
+
+        return async_remove
+
+    @callback
+    def async_run_due(self, now) -> None:
+        """Run the jobs scheduled at or before now.
+
+        Jobs scheduled while running these wait for the next call.
+
+        This method must be run in the event loop.
+        """
+        if self._latest is not None and now < self._latest:
+            for target in list(self._set_back_listeners):
+                target(now)
+
+        self._latest = now
+        queue = self._queue
+        due = []
+
+        while queue and queue[0][0] <= now:
+            entry = heapq.heappop(queue)
+            if entry[2] is not None:
+                due.append(entry[2])
+                entry[2] = None
+
+        self._active -= len(due)
+
+        for target in due:
+            try:
+                self._hass.async_run_job(target, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running scheduled job %s", target)
+
+        self._async_cleanup()
+        self._async_arm()
+
+    @callback
+    def async_start(self) -> None:
+        """Wake up the loop at the deadlines of the jobs.
+
+        This method must be run in the event loop.
+        """
+        self._running = True
+        self._async_arm()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop waking up the loop at the deadlines of the jobs.
+
+        This method must be run in the event loop.
+        """
+        self._running = False
+        self._async_arm()
+
+    @callback
+    def _async_arm(self) -> None:
+        """Schedule a wake up at the earliest deadline."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if not self._running or not self._queue:
+            return
+
+        delay = (self._queue[0][0] - dt_util.utcnow()).total_seconds()
+        self._handle = self._hass.loop.call_at(
+            self._hass.loop.time() + max(delay, 0), self._async_wake_up)
+
+    @callback
+    def _async_wake_up(self) -> None:
+        """Run the jobs that are due."""
+        self._handle = None
+        self.async_run_due(dt_util.utcnow())
+
+    @callback
+    def _async_time_changed(self, event) -> None:
+        """Run the jobs that are due at the time of the event.
+
+        While running, the loop timer follows the monotonic clock. Jobs are
+        only run here if the wall clock jumped past the earliest deadline.
+        """
+        now = event.data[ATTR_NOW]
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=dt_util.UTC)
+
+        if self._running and (not self._queue or self._queue[0][0] > now):
+            return
+
+        self.async_run_due(now)
+
+    @callback
+    def _async_cleanup(self) -> None:
+        """Drop the queue and stop listening once no job is left."""
+        if self._active or self._unsub_time_changed is None:
+            return
+
+        self._queue.clear()
+        self._unsub_time_changed()
+        self._unsub_time_changed = None
+        self._async_arm()
+
+
 class Config(object):
     """Configuration settings for Home Assistant."""
 
@@ -1024,6 +1260,9 @@ class Config(object):
         # If True, pip install is skipped for requirements on startup
         self.skip_pip = False  # type: bool
 
+        # If True, slow setups finish in the background after startup
+        self.deferred_startup = False  # type: bool
+
         # List of loaded components
         self.components = set()
 
@@ -1096,11 +1335,13 @@ def _async_create_timer(hass):
         """Create an async timer."""
         _LOGGER.info("Timer:starting")
         hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_timer)
+        hass.scheduler.async_start()
         fire_time_event(monotonic())
 
     @callback
     def stop_timer(event):
         """Stop the timer."""
+        hass.scheduler.async_stop()
         if handle is not None:
             handle.cancel()
 
@@ -3,6 +3,7 @@ from datetime import timedelta
 import functools as ft
 import logging
 import sys
+import threading
 
 from homeassistant.helpers.typing import ConfigType
 
@@ -25,6 +26,20 @@ ASYNC_FROM_CONFIG_FORMAT = 'async_{}_from_config'
 
 _LOGGER = logging.getLogger(__name__)
 
+# Relative cost of testing a condition, the and and or conditions test
+# their conditions cheapest first
+CONDITION_COSTS = {
+    'state': 1,
+    'time': 1,
+    'numeric_state': 2,
+    'sun': 3,
+    'zone': 4,
+    'template': 5,
+}
+
+# The states looked up by the and or or condition running in this thread
+_EVALUATION = threading.local()
+
 # PyLint does not like the use of _threaded_factory
 # pylint: disable=invalid-name
 
@@ -70,21 +85,84 @@ def async_from_config(config: ConfigType, config_validation: bool=True):
 from_config = _threaded_factory(async_from_config)
 
 
+def cost(config: ConfigType) -> int:
+    """Return the relative cost of testing a condition configuration."""
+    condition_type = config.get(CONF_CONDITION)
+
+    if condition_type in ('and', 'or'):
+        return sum(cost(entry) for entry in config['conditions'])
+
+    result = CONDITION_COSTS.get(condition_type, CONDITION_COSTS['template'])
+
+    if condition_type != 'template' and \
+            config.get(CONF_VALUE_TEMPLATE) is not None:
+        result += CONDITION_COSTS['template']
+
+    return result
+
+
+def _async_compile(configs, condition_type):
+    """Turn the conditions of an and or or condition into methods.
+
+    Nested conditions of the same type are tested as part of this one and
+    the conditions are ordered cheapest first.
+    """
+    flat = []
+
+    def flatten(entries):
+        """Add entries, expanding nested conditions of condition_type."""
+        for entry in entries:
+            if entry.get(CONF_CONDITION) == condition_type:
+                flatten(entry['conditions'])
+            else:
+                flat.append(entry)
+
+    flatten(configs)
+    return [async_from_config(entry, False)
+            for entry in sorted(flat, key=cost)]
+
+
+def _evaluation(check):
+    """Share the state lookups of all conditions tested by check."""
+    @ft.wraps(check)
+    def evaluate(hass, variables=None):
+        """Test check with a state lookup cache."""
+        if getattr(_EVALUATION, 'states', None) is not None:
+            return check(hass, variables)
+
+        _EVALUATION.states = {}
+        try:
+            return check(hass, variables)
+        finally:
+            _EVALUATION.states = None
+
+    return evaluate
+
+
+def _get_state(hass, entity_id):
+    """Return the state of entity_id, once per evaluation."""
+    states = getattr(_EVALUATION, 'states', None)
+
+    if states is None:
+        return hass.states.get(entity_id)
+
+    try:
+        return states[entity_id]
+    except KeyError:
+        state = states[entity_id] = hass.states.get(entity_id)
+        return state
+
+
 def async_and_from_config(config: ConfigType, config_validation: bool=True):
     """Create multi condition matcher using 'AND'."""
     if config_validation:
         config = cv.AND_CONDITION_SCHEMA(config)
-    checks = None
+    checks = _async_compile(config['conditions'], 'and')
 
+    @_evaluation
     def if_and_condition(hass: HomeAssistant,
                          variables=None) -> bool:
         """Test and condition."""
-        nonlocal checks
-
-        if checks is None:
-            checks = [async_from_config(entry, False) for entry
-                      in config['conditions']]
-
         try:
             for check in checks:
                 if not check(hass, variables):
@@ -105,17 +183,12 @@ def async_or_from_config(config: ConfigType, config_validation: bool=True):
     """Create multi condition matcher using 'OR'."""
     if config_validation:
         config = cv.OR_CONDITION_SCHEMA(config)
-    checks = None
+    checks = _async_compile(config['conditions'], 'or')
 
+    @_evaluation
     def if_or_condition(hass: HomeAssistant,
                         variables=None) -> bool:
         """Test and condition."""
-        nonlocal checks
-
-        if checks is None:
-            checks = [async_from_config(entry, False) for entry
-                      in config['conditions']]
-
         try:
             for check in checks:
                 if check(hass, variables):
@@ -144,7 +217,7 @@ def async_numeric_state(hass: HomeAssistant, entity, below=None, above=None,
                         value_template=None, variables=None):
     """Test a numeric state condition."""
     if isinstance(entity, str):
-        entity = hass.states.get(entity)
+        entity = _get_state(hass, entity)
 
     if entity is None:
         return False
@@ -204,7 +277,7 @@ def state(hass, entity, req_state, for_period=None):
     Async friendly.
     """
     if isinstance(entity, str):
-        entity = hass.states.get(entity)
+        entity = _get_state(hass, entity)
 
     if entity is None:
         return False
@@ -363,13 +436,13 @@ def zone(hass, zone_ent, entity):
     Async friendly.
     """
     if isinstance(zone_ent, str):
-        zone_ent = hass.states.get(zone_ent)
+        zone_ent = _get_state(hass, zone_ent)
 
     if zone_ent is None:
         return False
 
     if isinstance(entity, str):
-        entity = hass.states.get(entity)
+        entity = _get_state(hass, entity)
 
     if entity is None:
         return False
@@ -24,7 +24,8 @@ from homeassistant.helpers import template as template_helper
 
 # pylint: disable=invalid-name
 
-TIME_PERIOD_ERROR = "offset {} should be format 'HH:MM' or 'HH:MM:SS'"
+TIME_PERIOD_ERROR = "offset {} should be format 'HH:MM', 'HH:MM:SS' or " \
+                    "'HH:MM:SS.F'"
 
 # Home Assistant types
 byte = vol.All(vol.Coerce(int), vol.Range(min=0, max=255))
@@ -137,8 +138,8 @@ time_period_dict = vol.All(
         'days': vol.Coerce(int),
         'hours': vol.Coerce(int),
         'minutes': vol.Coerce(int),
-        'seconds': vol.Coerce(int),
-        'milliseconds': vol.Coerce(int),
+        'seconds': vol.Coerce(float),
+        'milliseconds': vol.Coerce(float),
     }),
     has_at_least_one_key('days', 'hours', 'minutes',
                          'seconds', 'milliseconds'),
@@ -159,20 +160,17 @@ def time_period_str(value: str) -> timedelta:
     elif value.startswith('+'):
         value = value[1:]
 
-    try:
-        parsed = [int(x) for x in value.split(':')]
-    except ValueError:
-        raise vol.Invalid(TIME_PERIOD_ERROR.format(value))
+    parsed = value.split(':')
 
-    if len(parsed) == 2:
-        hour, minute = parsed
-        second = 0
-    elif len(parsed) == 3:
-        hour, minute, second = parsed
-    else:
+    if len(parsed) not in (2, 3):
         raise vol.Invalid(TIME_PERIOD_ERROR.format(value))
 
-    offset = timedelta(hours=hour, minutes=minute, seconds=second)
+    try:
+        # Only the seconds may have a fraction
+        offset = timedelta(hours=int(parsed[0]), minutes=int(parsed[1]),
+                           seconds=float(parsed[2]) if parsed[2:] else 0)
+    except (ValueError, OverflowError):
+        raise vol.Invalid(TIME_PERIOD_ERROR.format(value))
 
     if negative_offset:
         offset *= -1
@@ -183,8 +181,8 @@ def time_period_str(value: str) -> timedelta:
 def time_period_seconds(value: Union[int, str]) -> timedelta:
     """Validate and transform seconds to a time offset."""
     try:
-        return timedelta(seconds=int(value))
-    except (ValueError, TypeError):
+        return timedelta(seconds=float(value))
+    except (ValueError, TypeError, OverflowError):
         raise vol.Invalid('Expected seconds, got {}'.format(value))
 
 
@@ -1,17 +1,24 @@
 """Helpers for components that manage entities."""
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+import threading
+from timeit import default_timer as timer
+
+import async_timeout
 
 from homeassistant import config as conf_util
 from homeassistant.bootstrap import (
-    async_prepare_setup_platform, async_prepare_setup_component)
+    async_prepare_setup_platform, async_prepare_setup_component,
+    async_wait_setup_tasks)
 from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_SCAN_INTERVAL, CONF_ENTITY_NAMESPACE,
     DEVICE_DEFAULT_NAME)
-from homeassistant.core import callback, valid_entity_id
+from homeassistant.core import EXECUTOR_POOL_SIZE, callback, valid_entity_id
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import get_component
-from homeassistant.helpers import config_per_platform, discovery
+from homeassistant.helpers import (
+    config_per_platform, discovery, startup_timing)
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.service import extract_entity_ids
@@ -20,6 +27,26 @@ from homeassistant.util.async import (
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=15)
 
+DATA_SETUP_SEMAPHORE = 'entity_platform_setup_semaphore'
+
+# Synchronous platform setups running at the same time, leaving executor
+# threads for the updates and state writes those setups wait for
+MAX_PLATFORM_SETUPS = EXECUTOR_POOL_SIZE // 2
+
+# Seconds a platform setup may take, platforms can override it
+# with a SETUP_TIMEOUT module attribute
+PLATFORM_SETUP_TIMEOUT = 60
+
+# Synchronous entities of a platform updated at the same time before they
+# are added. Platforms often share a client that is not thread safe, those
+# that are can opt in with a PARALLEL_UPDATES attribute.
+DEFAULT_PARALLEL_UPDATES = 1
+
+# Threads shared by the parallel updates of all platforms. Waiting for the
+# executor from an executor thread can deadlock, so they are not taken
+# from the executor.
+_UPDATE_POOL = ThreadPoolExecutor(max_workers=EXECUTOR_POOL_SIZE)
+
 
 class EntityComponent(object):
     """Helper class that will help a component manage its entities."""
@@ -73,7 +100,7 @@ class EntityComponent(object):
             tasks.append(self._async_setup_platform(p_type, p_config))
 
         if tasks:
-            yield from asyncio.wait(tasks, loop=self.hass.loop)
+            yield from async_wait_setup_tasks(self.hass, tasks)
 
         # Generic discovery listener for loading platform dynamically
         # Refer to: homeassistant.components.discovery.load_platform()
@@ -135,24 +162,41 @@ class EntityComponent(object):
 
         if key not in self._platforms:
             self._platforms[key] = EntityPlatform(
-                self, platform_type, scan_interval, entity_namespace)
+                self, platform_type, scan_interval, entity_namespace,
+                getattr(platform, 'PARALLEL_UPDATES',
+                        DEFAULT_PARALLEL_UPDATES))
         entity_platform = self._platforms[key]
 
+        platform_path = '{}.{}'.format(self.domain, platform_type)
+        timeout = getattr(platform, 'SETUP_TIMEOUT', PLATFORM_SETUP_TIMEOUT)
+
         try:
-            self.logger.info("Setting up %s.%s", self.domain, platform_type)
+            self.logger.info("Setting up %s", platform_path)
             if getattr(platform, 'async_setup_platform', None):
-                yield from platform.async_setup_platform(
-                    self.hass, platform_config,
-                    entity_platform.async_add_entities, discovery_info
-                )
+                with async_timeout.timeout(timeout, loop=self.hass.loop):
+                    start = timer()
+                    yield from platform.async_setup_platform(
+                        self.hass, platform_config,
+                        entity_platform.async_add_entities, discovery_info
+                    )
+                    startup_timing.async_record(
+                        self.hass, startup_timing.PHASE_PLATFORM,
+                        platform_path, timer() - start)
             else:
-                yield from self.hass.loop.run_in_executor(
-                    None, platform.setup_platform, self.hass, platform_config,
-                    entity_platform.add_entities, discovery_info
-                )
-
-            self.hass.config.components.add(
-                '{}.{}'.format(self.domain, platform_type))
+                with (yield from _async_setup_semaphore(self.hass)):
+                    with async_timeout.timeout(timeout, loop=self.hass.loop):
+                        yield from startup_timing.async_run_timed_job(
+                            self.hass, startup_timing.PHASE_PLATFORM,
+                            platform_path, platform.setup_platform,
+                            self.hass, platform_config,
+                            entity_platform.add_entities, discovery_info
+                        )
+
+            self.hass.config.components.add(platform_path)
+        except asyncio.TimeoutError:
+            self.logger.error(
+                'Setup of platform %s did not finish within %d seconds',
+                platform_path, timeout)
         except Exception:  # pylint: disable=broad-except
             self.logger.exception(
                 'Error while setting up platform %s', platform_type)
@@ -241,7 +285,7 @@ class EntityComponent(object):
                  in self._platforms.values()]
 
         if tasks:
-            yield from asyncio.wait(tasks, loop=self.hass.loop)
+            yield from async_wait_setup_tasks(self.hass, tasks)
 
         self._platforms = {
             'core': self._platforms['core']
@@ -281,30 +325,74 @@ class EntityComponent(object):
         return conf
 
 
+def _async_setup_semaphore(hass):
+    """Return the semaphore limiting synchronous platform setups.
+
+    This method must be run in the event loop.
+    """
+    semaphore = hass.data.get(DATA_SETUP_SEMAPHORE)
+
+    if semaphore is None:
+        semaphore = hass.data[DATA_SETUP_SEMAPHORE] = asyncio.Semaphore(
+            MAX_PLATFORM_SETUPS, loop=hass.loop)
+
+    return semaphore
+
+
 class EntityPlatform(object):
     """Keep track of entities for a single platform and stay in loop."""
 
-    def __init__(self, component, platform, scan_interval, entity_namespace):
+    def __init__(self, component, platform, scan_interval, entity_namespace,
+                 parallel_updates=DEFAULT_PARALLEL_UPDATES):
         """Initalize the entity platform."""
         self.component = component
         self.platform = platform
         self.scan_interval = scan_interval
         self.entity_namespace = entity_namespace
+        self.parallel_updates = parallel_updates
+        self._update_semaphore = threading.Semaphore(parallel_updates)
         self.platform_entities = []
         self._async_unsub_polling = None
         self._process_updates = asyncio.Lock(loop=component.hass.loop)
 
     def add_entities(self, new_entities, update_before_add=False):
         """Add entities for a single platform."""
-        if update_before_add:
+        new_entities = list(new_entities)
+
+        if update_before_add and self.parallel_updates > 1 and \
+                len(new_entities) > 1:
+            futures = []
             for entity in new_entities:
-                entity.update()
+                self._update_semaphore.acquire()
+                future = _UPDATE_POOL.submit(self._update_entity, entity)
+                future.add_done_callback(
+                    lambda _: self._update_semaphore.release())
+                futures.append(future)
+            results = [future.result() for future in futures]
+        elif update_before_add:
+            results = [self._update_entity(entity) for entity in new_entities]
+
+        if update_before_add:
+            new_entities = [entity for entity, result
+                            in zip(new_entities, results) if result]
 
         run_coroutine_threadsafe(
-            self.async_add_entities(list(new_entities), False),
+            self.async_add_entities(new_entities, False),
             self.component.hass.loop
         ).result()
 
+    def _update_entity(self, entity):
+        """Update an entity before it is added. Return boolean if updated."""
+        try:
+            entity.update()
+        except Exception:  # pylint: disable=broad-except
+            self.component.logger.exception(
+                'Error while updating entity from %s in %s',
+                self.platform, self.component.domain)
+            return False
+
+        return True
+
     @asyncio.coroutine
     def async_add_entities(self, new_entities, update_before_add=False):
         """Add entities for a single platform async.
@@ -315,7 +403,11 @@ class EntityPlatform(object):
         if not new_entities:
             return
 
-        tasks = [self._async_process_entity(entity, update_before_add)
+        if update_before_add:
+            new_entities = yield from self._async_update_entities(
+                new_entities)
+
+        tasks = [self._async_process_entity(entity, False)
                  for entity in new_entities]
 
         yield from asyncio.wait(tasks, loop=self.component.hass.loop)
@@ -330,6 +422,42 @@ class EntityPlatform(object):
             self.component.hass, self._update_entity_states, self.scan_interval
         )
 
+    @asyncio.coroutine
+    def _async_update_entities(self, entities):
+        """Update entities before they are added and return the updated.
+
+        Async entities are updated concurrently, others parallel_updates at
+        a time in the executor.
+
+        This method must be run in the event loop.
+        """
+        hass = self.component.hass
+        semaphore = asyncio.Semaphore(self.parallel_updates, loop=hass.loop)
+
+        @asyncio.coroutine
+        def async_update(entity):
+            """Update a single entity."""
+            if hasattr(entity, 'async_update'):
+                yield from entity.async_update()
+            else:
+                with (yield from semaphore):
+                    yield from hass.loop.run_in_executor(None, entity.update)
+
+        results = yield from asyncio.gather(*[
+            async_update(entity) for entity in entities
+        ], loop=hass.loop, return_exceptions=True)
+
+        updated = []
+        for entity, result in zip(entities, results):
+            if isinstance(result, Exception):
+                self.component.logger.error(
+                    'Error while updating entity from %s in %s',
+                    self.platform, self.component.domain, exc_info=result)
+            else:
+                updated.append(entity)
+
+        return updated
+
     @asyncio.coroutine
     def _async_process_entity(self, new_entity, update_before_add):
         """Add entities to StateMachine."""
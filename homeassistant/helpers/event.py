@@ -1,8 +1,9 @@
 """Helpers for listening to events."""
+from calendar import monthrange
 import functools as ft
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from ..core import HomeAssistant, callback
+from ..core import HomeAssistant, callback, split_entity_id
 from ..const import (
     ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
 from ..util import dt as dt_util
@@ -85,6 +86,66 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+def async_track_template_entities(hass, templates, action, variables=None):
+    """Track state changes that can change the result of templates.
+
+    The templates are rendered when tracking starts and again after every
+    change that affects them. Only changes of the entities and domains the
+    last renders read are passed on, or every change while a render failed,
+    iterated all states or did not read any state.
+
+    Returns a function that can be called to remove the listener.
+
+    Must be run within the event loop.
+    """
+    entities = set()
+    domains = set()
+    match_all = False
+
+    @callback
+    def async_render_templates():
+        """Render the templates and track the states they read."""
+        nonlocal match_all
+        entities.clear()
+        domains.clear()
+        match_all = False
+
+        for template in templates:
+            render_info = template.async_render_to_info(variables)
+
+            if render_info is None or render_info.exception is not None or \
+                    None in render_info.domains or \
+                    not (render_info.entities or render_info.domains):
+                match_all = True
+                return
+
+            entities.update(render_info.entities)
+            domains.update(render_info.domains)
+
+    @callback
+    def template_entities_listener(event):
+        """Run action if the change affects one of the templates."""
+        entity_id = event.data.get('entity_id')
+
+        if not match_all and entity_id not in entities and \
+                split_entity_id(entity_id)[0] not in domains:
+            return
+
+        async_render_templates()
+        hass.async_run_job(action, entity_id, event.data.get('old_state'),
+                           event.data.get('new_state'))
+
+    async_render_templates()
+
+    return hass.bus.async_listen(
+        EVENT_STATE_CHANGED, template_entities_listener)
+
+
+track_template_entities = threaded_listener_factory(
+    async_track_template_entities)
+
+
 @callback
 def async_track_template(hass, template, action, variables=None):
     """Add a listener that track state changes with template condition."""
@@ -106,8 +167,8 @@ def async_track_template(hass, template, action, variables=None):
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(), template_condition_listener)
+    return async_track_template_entities(
+        hass, (template,), template_condition_listener, variables)
 
 
 track_template = threaded_listener_factory(async_track_template)
@@ -133,31 +194,8 @@ track_point_in_time = threaded_listener_factory(async_track_point_in_time)
 @callback
 def async_track_point_in_utc_time(hass, action, point_in_time):
     """Add a listener that fires once after a specific point in UTC time."""
-    # Ensure point_in_time is UTC
-    point_in_time = dt_util.as_utc(point_in_time)
-
-    @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
-            return
-
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
-
-        hass.async_run_job(action, now)
-
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
-
-    return async_unsub
+    return hass.scheduler.async_schedule(dt_util.as_utc(point_in_time),
+                                         action)
 
 
 track_point_in_utc_time = threaded_listener_factory(
@@ -168,21 +206,25 @@ track_point_in_utc_time = threaded_listener_factory(
 def async_track_time_interval(hass, action, interval):
     """Add a listener that fires repetitively at every timedelta interval."""
     remove = None
-
-    def next_interval():
-        """Return the next interval."""
-        return dt_util.utcnow() + interval
+    point_in_time = dt_util.utcnow() + interval
 
     @callback
     def interval_listener(now):
         """Called when when the interval has elapsed."""
-        nonlocal remove
+        nonlocal remove, point_in_time
+        # Count from the deadline so the intervals do not drift, unless
+        # the deadline is so late that the next one already passed
+        point_in_time += interval
+        utc_now = dt_util.utcnow()
+        if point_in_time <= utc_now:
+            point_in_time = utc_now + interval
+
         remove = async_track_point_in_utc_time(
-            hass, interval_listener, next_interval())
+            hass, interval_listener, point_in_time)
         hass.async_run_job(action, now)
 
     remove = async_track_point_in_utc_time(
-        hass, interval_listener, next_interval())
+        hass, interval_listener, point_in_time)
 
     def remove_listener():
         """Remove interval listener."""
@@ -283,31 +325,55 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
 
         return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
 
-    pmp = _process_time_match
-    year, month, day = pmp(year), pmp(month), pmp(day)
-    hour, minute, second = pmp(hour), pmp(minute), pmp(second)
+    pattern = TimePattern(year, month, day, hour, minute, second)
+    cancel = None
 
     @callback
-    def pattern_time_change_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
+    def schedule(utc_start):
+        """Schedule the listener at the first match from utc_start on."""
+        nonlocal cancel
         if local:
-            now = dt_util.as_local(now)
-        mat = _matcher
+            point = pattern.next_fire(dt_util.as_local(utc_start))
+        else:
+            point = pattern.next_fire(utc_start)
 
-        # pylint: disable=too-many-boolean-expressions
-        if mat(now.year, year) and \
-           mat(now.month, month) and \
-           mat(now.day, day) and \
-           mat(now.hour, hour) and \
-           mat(now.minute, minute) and \
-           mat(now.second, second):
+        if point is None:
+            cancel = None
+            return
+
+        cancel = hass.scheduler.async_schedule(
+            _local_to_utc(point, utc_start) if local else
+            point.replace(tzinfo=dt_util.UTC),
+            pattern_time_change_listener)
+
+    @callback
+    def pattern_time_change_listener(utc_now):
+        """Run the action if the time matches and schedule the next run."""
+        schedule(utc_now.replace(microsecond=0) + timedelta(seconds=1))
+
+        now = dt_util.as_local(utc_now) if local else utc_now
 
+        # A late or skipped deadline only runs if the time still matches
+        if pattern.matches(now):
             hass.async_run_job(action, now)
 
-    return hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                 pattern_time_change_listener)
+    @callback
+    def time_set_back(utc_now):
+        """Compute the next match again after the clock was set back."""
+        if cancel is not None:
+            cancel()
+        schedule(utc_now)
+
+    schedule(dt_util.utcnow())
+    remove_set_back = hass.scheduler.async_listen_time_set_back(time_set_back)
+
+    def remove_listener():
+        """Remove the time pattern listener."""
+        remove_set_back()
+        if cancel is not None:
+            cancel()
+
+    return remove_listener
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
@@ -324,6 +390,90 @@ def async_track_time_change(hass, action, year=None, month=None, day=None,
 track_time_change = threaded_listener_factory(async_track_time_change)
 
 
+class TimePattern(object):
+    """A precompiled time pattern.
+
+    Every field is year, month, day, hour, minute or second. It is either
+    MATCH_ALL, a value or list of values or a string like '/5' matching
+    the values divisible by 5.
+    """
+
+    # Values of the fields besides the year
+    RANGES = (range(1, 13), range(1, 32), range(24), range(60), range(60))
+
+    # Years searched for the next match of a pattern that never matches
+    YEARS_AHEAD = 100
+
+    def __init__(self, year=None, month=None, day=None, hour=None,
+                 minute=None, second=None):
+        """Compile the pattern."""
+        self._year = _process_time_match(year)
+        self._values = tuple(
+            [value for value in values
+             if _matcher(value, _process_time_match(field))]
+            for field, values in zip((month, day, hour, minute, second),
+                                     self.RANGES))
+        self._sets = tuple(frozenset(values) for values in self._values)
+
+    def matches(self, now):
+        """Return True if the time matches the pattern."""
+        month, day, hour, minute, second = self._sets
+        # pylint: disable=too-many-boolean-expressions
+        return (now.second in second and now.minute in minute and
+                now.hour in hour and now.day in day and
+                now.month in month and _matcher(now.year, self._year))
+
+    def next_fire(self, start):
+        """Return the first matching time at or after start.
+
+        The result is naive and in the time zone of start. Returns None if
+        the pattern does not match within YEARS_AHEAD years.
+        """
+        lower = start.timetuple()[:6]
+        years = [year for year in range(start.year,
+                                        start.year + self.YEARS_AHEAD)
+                 if _matcher(year, self._year)]
+
+        fields = self._search((years,) + self._values, lower, 0, [], True)
+        return None if fields is None else datetime(*fields)
+
+    def _search(self, values, lower, index, prefix, at_lower):
+        """Return the smallest fields from index on, at or after lower."""
+        if index == len(values):
+            return prefix
+
+        minimum = lower[index] if at_lower else 0
+
+        for value in values[index]:
+            if value < minimum:
+                continue
+            if index == 2 and \
+               value > monthrange(prefix[0], prefix[1])[1]:
+                break
+
+            fields = self._search(values, lower, index + 1,
+                                  prefix + [value],
+                                  at_lower and value == minimum)
+            if fields is not None:
+                return fields
+
+        return None
+
+
+def _local_to_utc(local_time, utc_start):
+    """Convert a naive local time at or after utc_start to UTC.
+
+    A local time that occurs twice because of daylight saving time
+    converts to the first occurrence not before utc_start.
+    """
+    candidates = sorted(
+        dt_util.as_utc(dt_util.DEFAULT_TIME_ZONE.localize(local_time, is_dst))
+        for is_dst in (True, False))
+
+    return next((utc_time for utc_time in candidates
+                 if utc_time >= utc_start), candidates[-1])
+
+
 def _process_state_match(parameter):
     """Wrap parameter in a tuple if it is not one and returns it."""
     if parameter is None or parameter == MATCH_ALL:
@@ -354,7 +504,7 @@ def _matcher(subject, pattern):
     if isinstance(pattern, str) and pattern.startswith('/'):
         try:
             return subject % float(pattern.lstrip('/')) == 0
-        except ValueError:
+        except (ValueError, ZeroDivisionError):
             return False
 
     return MATCH_ALL == pattern or subject in pattern
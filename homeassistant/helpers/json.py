@@ -0,0 +1,105 @@
+"""Helpers to serialize Home Assistant objects to JSON.
+
+The stdlib encoder is always available. If python-rapidjson is installed
+it is used instead, falling back to the stdlib encoder for the few inputs
+it refuses (like dictionaries with non-string keys).
+"""
+from collections import OrderedDict
+from datetime import datetime
+import json
+import logging
+
+from typing import Any, Callable, Dict  # NOQA
+
+from homeassistant.core import Event, State
+
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _state_as_dict(state: State) -> Dict[str, Any]:
+    """Return a JSON ready dict of a State without a second default call."""
+    return {'entity_id': state.entity_id,
+            'state': state.state,
+            'attributes': dict(state.attributes),
+            'last_changed': state.last_changed.isoformat(),
+            'last_updated': state.last_updated.isoformat()}
+
+
+def _event_as_dict(event: Event) -> Dict[str, Any]:
+    """Return a JSON ready dict of an Event without a second default call."""
+    return {'event_type': event.event_type,
+            'data': dict(event.data),
+            'origin': str(event.origin),
+            'time_fired': event.time_fired.isoformat()}
+
+
+# Exact type lookups, tried before the isinstance checks in default
+FAST_PATHS = {
+    State: _state_as_dict,
+    Event: _event_as_dict,
+    datetime: datetime.isoformat,
+    set: list,
+}  # type: Dict[type, Callable[[Any], Any]]
+
+
+def default(obj: Any) -> Any:
+    """Convert objects the JSON encoders do not know about."""
+    fast_path = FAST_PATHS.get(type(obj))
+
+    if fast_path is not None:
+        return fast_path(obj)
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, set):
+        return list(obj)
+    elif hasattr(obj, 'as_dict'):
+        return obj.as_dict()
+
+    try:
+        # It might be a generator, convert it to a list
+        return [default(child_obj) for child_obj in obj]
+    except TypeError:
+        raise TypeError(repr(obj) + " is not JSON serializable") from None
+
+
+def json_dumps(obj: Any, sort_keys: bool=False) -> str:
+    """Serialize obj with the stdlib encoder."""
+    return json.dumps(obj, sort_keys=sort_keys, default=default)
+
+
+def rapidjson_dumps(obj: Any, sort_keys: bool=False) -> str:
+    """Serialize obj with python-rapidjson."""
+    try:
+        return rapidjson.dumps(obj, sort_keys=sort_keys, default=default)
+    except TypeError:
+        return json_dumps(obj, sort_keys)
+
+
+SERIALIZERS = OrderedDict()  # type: Dict[str, Callable[..., str]]
+if rapidjson is not None:
+    SERIALIZERS['rapidjson'] = rapidjson_dumps
+SERIALIZERS['json'] = json_dumps
+
+_dumps = next(iter(SERIALIZERS.values()))
+
+
+def set_serializer(name: str) -> None:
+    """Select the serializer used by dumps."""
+    global _dumps  # pylint: disable=global-statement
+
+    if name not in SERIALIZERS:
+        raise ValueError("Unknown JSON serializer {}, available: {}".format(
+            name, ', '.join(SERIALIZERS)))
+
+    _LOGGER.debug("Using JSON serializer %s", name)
+    _dumps = SERIALIZERS[name]
+
+
+def dumps(obj: Any, sort_keys: bool=False) -> str:
+    """Serialize obj, which may contain Home Assistant objects, to JSON."""
+    return _dumps(obj, sort_keys)
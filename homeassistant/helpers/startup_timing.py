@@ -0,0 +1,107 @@
+"""Record how long the phases of starting Home Assistant take.
+
+Every record has a phase, the name of what was timed, the wall-clock time
+as seen from the event loop and the time spent inside the executor. Once
+startup finished, setups done at runtime are no longer recorded.
+"""
+import asyncio
+import logging
+from timeit import default_timer as timer
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STARTUP_TIMINGS = 'startup_timings'
+DATA_STARTUP_FINISHED = 'startup_timings_finished'
+
+PHASE_CONFIG = 'config'
+PHASE_IMPORT = 'import'
+PHASE_PLATFORM = 'platform'
+PHASE_REQUIREMENTS = 'requirements'
+PHASE_SETUP = 'setup'
+
+
+@callback
+def async_record(hass, phase, name, wall, executor=0.0):
+    """Record the duration of a startup phase.
+
+    This method must be run in the event loop.
+    """
+    if hass.data.get(DATA_STARTUP_FINISHED):
+        return
+
+    timings = hass.data.get(DATA_STARTUP_TIMINGS)
+    if timings is None:
+        timings = hass.data[DATA_STARTUP_TIMINGS] = []
+
+    timings.append({
+        'phase': phase,
+        'name': name,
+        'wall': wall,
+        'executor': executor,
+    })
+
+
+@asyncio.coroutine
+def async_run_timed_job(hass, phase, name, target, *args, executor=None):
+    """Run target in the executor and record how long it took.
+
+    This method is a coroutine.
+    """
+    executor_times = []
+
+    def timed_target():
+        """Call target and measure the time spent in the executor."""
+        start = timer()
+        try:
+            return target(*args)
+        finally:
+            executor_times.append(timer() - start)
+
+    start = timer()
+    try:
+        return (yield from hass.loop.run_in_executor(
+            executor, timed_target))
+    finally:
+        async_record(hass, phase, name, timer() - start, sum(executor_times))
+
+
+@callback
+def async_finish(hass):
+    """Stop recording, the report only covers the startup.
+
+    This method must be run in the event loop.
+    """
+    hass.data[DATA_STARTUP_FINISHED] = True
+
+
+@callback
+def async_get_report(hass):
+    """Return the recorded timings, slowest first.
+
+    This method must be run in the event loop.
+    """
+    return sorted(hass.data.get(DATA_STARTUP_TIMINGS, []),
+                  key=lambda timing: timing['wall'], reverse=True)
+
+
+@callback
+def async_log_report(hass, count=10):
+    """Log the time spent per phase and the slowest steps.
+
+    This method must be run in the event loop.
+    """
+    report = async_get_report(hass)
+    phases = {}
+
+    for timing in report:
+        phases[timing['phase']] = \
+            phases.get(timing['phase'], 0) + timing['wall']
+
+    _LOGGER.info('Startup time per phase: %s. Slowest: %s', ', '.join(
+        '{} {:.2f}s'.format(phase, wall) for phase, wall
+        in sorted(phases.items(), key=lambda item: item[1], reverse=True)),
+                 ', '.join('{} {} {:.2f}s'.format(
+                     timing['phase'], timing['name'], timing['wall'])
+                           for timing in report[:count]))
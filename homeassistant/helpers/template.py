@@ -1,15 +1,18 @@
 """Template helper methods for rendering strings with HA data."""
 from datetime import datetime
+from functools import lru_cache, partial, wraps
 import json
 import logging
 import re
+import threading
 
 import jinja2
+from jinja2 import meta
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 
 from homeassistant.const import (
     STATE_UNKNOWN, ATTR_LATITUDE, ATTR_LONGITUDE, MATCH_ALL)
-from homeassistant.core import State
+from homeassistant.core import State, callback, split_entity_id
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import location as loc_helper
 from homeassistant.loader import get_component
@@ -20,6 +23,24 @@ _LOGGER = logging.getLogger(__name__)
 _SENTINEL = object()
 DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+DATA_TEMPLATE_GLOBALS = 'template_globals'
+
+# Number of distinct template sources to keep compiled code for
+COMPILED_CACHE_SIZE = 512
+
+# The RenderInfo of the render running in the current thread
+_RENDER = threading.local()
+
+# Value templates that only read value or value_json and convert the
+# result, like {{ value_json.sensor.temperature | float | round(1) }}
+_RE_SIMPLE_VALUE = re.compile(
+    r"^\s*\{\{\s*(value|value_json)((?:\.[a-zA-Z_]\w*"
+    r"|\[\s*(?:-?\d+|'[^'\\]*'|\"[^\"\\]*\")\s*\])*)"
+    r"\s*((?:\|\s*(?:float|int|round(?:\(\s*\d+\s*\))?)\s*)*)\}\}\s*$")
+_RE_PATH_ITEM = re.compile(
+    r"\.([a-zA-Z_]\w*)|\[\s*(?:(-?\d+)|'([^'\\]*)'|\"([^\"\\]*)\")\s*\]")
+_RE_FILTER = re.compile(r"(float|int|round)(?:\(\s*(\d+)\s*\))?")
+
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
 _RE_GET_ENTITIES = re.compile(
     r"(?:(?:states\.|(?:is_state|is_state_attr|states)\(.)([\w]+\.[\w]+))",
@@ -50,6 +71,189 @@ def extract_entities(template):
     return MATCH_ALL
 
 
+class RenderInfo(object):
+    """Record the states a render of a template read.
+
+    The result of a render stays valid until one of those states changes,
+    unless the render used something else that changes, like the time.
+    """
+
+    def __init__(self, hass):
+        """Initialize the render info."""
+        self.hass = hass
+        self.result = None
+        self.exception = None
+        self.cacheable = True
+        # Entity id to the state read, None if it did not exist
+        self.entities = {}
+        # Domain to the states iterated, None for all domains
+        self.domains = {}
+
+    def is_valid(self, hass):
+        """Return if the states that were read are still current."""
+        if not self.cacheable or hass is not self.hass:
+            return False
+
+        get = hass.states.get
+
+        for entity_id, state in self.entities.items():
+            if get(entity_id) is not state:
+                return False
+
+        for domain, states in self.domains.items():
+            if domain is None:
+                current = hass.states.async_all()
+                if len(current) != len(states) or any(
+                        get(state.entity_id) is not state
+                        for state in states):
+                    return False
+            else:
+                current = hass.states.async_all(domain)
+                if len(current) != len(states) or any(
+                        old is not new for old, new in zip(states, current)):
+                    return False
+
+        return True
+
+    def affected_by(self, entity_id):
+        """Return if a change of entity_id can change the result."""
+        if self.exception is not None or None in self.domains:
+            return True
+
+        return (entity_id in self.entities or
+                split_entity_id(entity_id)[0] in self.domains)
+
+
+def _record_state(entity_id, state):
+    """Record that the running render read the state of an entity."""
+    info = getattr(_RENDER, 'info', None)
+    if info is not None:
+        info.entities[entity_id.lower()] = state
+    return state
+
+
+def _record_domain(domain, states):
+    """Record that the running render iterated the states of a domain."""
+    info = getattr(_RENDER, 'info', None)
+    if info is not None:
+        info.domains[domain] = states
+    return states
+
+
+def _not_cacheable(func):
+    """Wrap a template function whose result is not fixed by the states.
+
+    The markers jinja uses to pass the context or environment to filters
+    and functions are kept.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        """Mark the running render as not cacheable and call func."""
+        info = getattr(_RENDER, 'info', None)
+        if info is not None:
+            info.cacheable = False
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compile(source):
+    """Compile template source, shared by all templates with that source."""
+    return ENV.compile(source)
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _referenced_names(source):
+    """Return the names a template source reads from its context."""
+    return frozenset(meta.find_undeclared_variables(ENV.parse(source)))
+
+
+def _hass_globals(hass):
+    """Return the template globals of a hass instance.
+
+    They hold no render state, so all templates of an instance share them.
+    """
+    global_vars = hass.data.get(DATA_TEMPLATE_GLOBALS)
+
+    if global_vars is None:
+        location_methods = LocationMethods(hass)
+        all_states = AllStates(hass)
+
+        global_vars = hass.data[DATA_TEMPLATE_GLOBALS] = ENV.make_globals({
+            'closest': location_methods.closest,
+            'distance': location_methods.distance,
+            'is_state': all_states.is_state,
+            'is_state_attr': all_states.is_state_attr,
+            'states': all_states,
+        })
+
+    return global_vars
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _value_accessor(source):
+    """Compile a simple value template into a Python function.
+
+    The function returns the same result as rendering the template with
+    jinja, or _SENTINEL when the value does not have the expected shape and
+    the template has to be rendered. Returns None if the template is not
+    simple.
+    """
+    match = _RE_SIMPLE_VALUE.match(source)
+
+    if match is None:
+        return None
+
+    name, path, filters = match.groups()
+    keys = []
+
+    for attr, index, single, double in _RE_PATH_ITEM.findall(path):
+        if attr:
+            # Jinja prefers attributes of the object over its items
+            if hasattr(dict, attr):
+                return None
+            keys.append(attr)
+        elif index:
+            keys.append(int(index))
+        else:
+            keys.append(single or double)
+
+    converters = []
+
+    for filter_name, argument in _RE_FILTER.findall(filters):
+        converter = ENV.filters[filter_name]
+        if argument:
+            converter = partial(converter, precision=int(argument))
+        converters.append(converter)
+
+    use_json = name == 'value_json'
+
+    def accessor(value):
+        """Return the rendered template or _SENTINEL."""
+        if use_json:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return _SENTINEL
+
+        for key in keys:
+            if isinstance(key, str):
+                if type(value) is not dict or key not in value:
+                    return _SENTINEL
+            elif type(value) is not list or \
+                    not -len(value) <= key < len(value):
+                return _SENTINEL
+            value = value[key]
+
+        for converter in converters:
+            value = converter(value)
+
+        return str(value).strip()
+
+    return accessor
+
+
 class Template(object):
     """Class to hold a template and manage caching and rendering."""
 
@@ -61,6 +265,7 @@ class Template(object):
         self.template = template
         self._compiled_code = None
         self._compiled = None
+        self._render_info = None
         self.hass = hass
 
     def ensure_valid(self):
@@ -69,7 +274,7 @@ class Template(object):
             return
 
         try:
-            self._compiled_code = ENV.compile(self.template)
+            self._compiled_code = _compile(self.template)
         except jinja2.exceptions.TemplateSyntaxError as err:
             raise TemplateError(err)
 
@@ -95,10 +300,66 @@ class Template(object):
         if variables is not None:
             kwargs.update(variables)
 
+        # Variables the template does not read do not change the result
+        if kwargs and _referenced_names(self.template).isdisjoint(kwargs):
+            kwargs = {}
+
+        render_info = self._render_info
+        if kwargs or render_info is None or \
+                not render_info.is_valid(self.hass):
+            render_info = self._async_render(kwargs)
+
+        return render_info.result
+
+    @callback
+    def async_render_to_info(self, variables=None):
+        """Render the template and return the states the render read.
+
+        A failed render is returned with its exception set, None if the
+        template could not be compiled.
+
+        This method must be run in the event loop.
+        """
         try:
-            return self._compiled.render(kwargs).strip()
+            self.async_render(variables)
+        except TemplateError:
+            pass
+
+        return self._render_info
+
+    @callback
+    def async_affected_by(self, entity_id):
+        """Return if a change of entity_id can change the last render.
+
+        Until the template rendered without errors every entity is assumed
+        to affect it.
+
+        This method must be run in the event loop.
+        """
+        render_info = self._render_info
+        return render_info is None or render_info.affected_by(entity_id)
+
+    def _async_render(self, variables):
+        """Render the template and record the states it read.
+
+        This method must be run in the event loop.
+        """
+        render_info = self._render_info = RenderInfo(self.hass)
+        # Results that depend on variables can not be reused
+        render_info.cacheable = not variables
+        previous = getattr(_RENDER, 'info', None)
+        _RENDER.info = render_info
+
+        try:
+            render_info.result = self._compiled.render(variables).strip()
         except jinja2.TemplateError as err:
+            render_info.exception = err
+            render_info.cacheable = False
             raise TemplateError(err)
+        finally:
+            _RENDER.info = previous
+
+        return render_info
 
     def render_with_possible_json_value(self, value, error_value=_SENTINEL):
         """Render template with value exposed.
@@ -116,6 +377,20 @@ class Template(object):
 
         If valid JSON will expose value_json too.
 
+        This method must be run in the event loop.
+        """
+        accessor = _value_accessor(self.template)
+
+        if accessor is not None:
+            result = accessor(value)
+            if result is not _SENTINEL:
+                return result
+
+        return self._async_render_json_value(value, error_value)
+
+    def _async_render_json_value(self, value, error_value=_SENTINEL):
+        """Render template with value exposed using jinja.
+
         This method must be run in the event loop.
         """
         self._ensure_compiled()
@@ -144,18 +419,8 @@ class Template(object):
 
         assert self.hass is not None, 'hass variable not set on template'
 
-        location_methods = LocationMethods(self.hass)
-
-        global_vars = ENV.make_globals({
-            'closest': location_methods.closest,
-            'distance': location_methods.distance,
-            'is_state': self.hass.states.is_state,
-            'is_state_attr': self.hass.states.is_state_attr,
-            'states': AllStates(self.hass),
-        })
-
         self._compiled = jinja2.Template.from_code(
-            ENV, self._compiled_code, global_vars, None)
+            ENV, self._compiled_code, _hass_globals(self.hass), None)
 
         return self._compiled
 
@@ -179,14 +444,24 @@ class AllStates(object):
 
     def __iter__(self):
         """Return all states."""
-        return iter(sorted(self._hass.states.async_all(),
+        return iter(sorted(_record_domain(None, self._hass.states.async_all()),
                            key=lambda state: state.entity_id))
 
     def __call__(self, entity_id):
         """Return the states."""
-        state = self._hass.states.get(entity_id)
+        state = _record_state(entity_id, self._hass.states.get(entity_id))
         return STATE_UNKNOWN if state is None else state.state
 
+    def is_state(self, entity_id, state):
+        """Test if entity exists and is specified state."""
+        state_obj = _record_state(entity_id, self._hass.states.get(entity_id))
+        return state_obj and state_obj.state == state
+
+    def is_state_attr(self, entity_id, name, value):
+        """Test if entity exists and has a state attribute set to value."""
+        state_obj = _record_state(entity_id, self._hass.states.get(entity_id))
+        return state_obj and state_obj.attributes.get(name, None) == value
+
 
 class DomainStates(object):
     """Class to expose a specific HA domain as attributes."""
@@ -198,14 +473,13 @@ class DomainStates(object):
 
     def __getattr__(self, name):
         """Return the states."""
-        return self._hass.states.get('{}.{}'.format(self._domain, name))
+        entity_id = '{}.{}'.format(self._domain, name)
+        return _record_state(entity_id, self._hass.states.get(entity_id))
 
     def __iter__(self):
         """Return the iteration over all the states."""
-        return iter(sorted(
-            (state for state in self._hass.states.async_all()
-             if state.domain == self._domain),
-            key=lambda state: state.entity_id))
+        return iter(_record_domain(
+            self._domain, self._hass.states.async_all(self._domain)))
 
 
 class LocationMethods(object):
@@ -215,6 +489,7 @@ class LocationMethods(object):
         """Initialize the distance helpers."""
         self._hass = hass
 
+    @_not_cacheable
     def closest(self, *args):
         """Find closest entity.
 
@@ -273,11 +548,15 @@ class LocationMethods(object):
 
             group = get_component('group')
 
-            states = [self._hass.states.get(entity_id) for entity_id
-                      in group.expand_entity_ids(self._hass, [gr_entity_id])]
+            _record_state(gr_entity_id, self._hass.states.get(gr_entity_id))
+            states = [
+                _record_state(entity_id, self._hass.states.get(entity_id))
+                for entity_id
+                in group.expand_entity_ids(self._hass, [gr_entity_id])]
 
         return loc_helper.closest(latitude, longitude, states)
 
+    @_not_cacheable
     def distance(self, *args):
         """Calculate distance.
 
@@ -331,7 +610,8 @@ class LocationMethods(object):
         if isinstance(entity_id_or_state, State):
             return entity_id_or_state
         elif isinstance(entity_id_or_state, str):
-            return self._hass.states.get(entity_id_or_state)
+            return _record_state(entity_id_or_state,
+                                 self._hass.states.get(entity_id_or_state))
         return None
 
 
@@ -427,9 +707,11 @@ ENV.filters['timestamp_utc'] = timestamp_utc
 ENV.filters['is_defined'] = fail_when_undefined
 ENV.filters['max'] = max
 ENV.filters['min'] = min
+ENV.filters['random'] = _not_cacheable(ENV.filters['random'])
 ENV.globals['float'] = forgiving_float
-ENV.globals['now'] = dt_util.now
-ENV.globals['utcnow'] = dt_util.utcnow
+ENV.globals['lipsum'] = _not_cacheable(ENV.globals['lipsum'])
+ENV.globals['now'] = _not_cacheable(dt_util.now)
+ENV.globals['utcnow'] = _not_cacheable(dt_util.utcnow)
 ENV.globals['as_timestamp'] = dt_util.as_timestamp
-ENV.globals['relative_time'] = dt_util.get_age
+ENV.globals['relative_time'] = _not_cacheable(dt_util.get_age)
 ENV.globals['strptime'] = strptime
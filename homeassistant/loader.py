@@ -9,8 +9,14 @@ If you want to retrieve a platform that is part of a component, you should
 call get_component('switch.your_platform'). In both cases the config directory
 is checked to see if it contains a user provided version. If not available it
 will check the built-in components and platforms.
+
+The dependencies, requirements and platforms of the built-in components are
+read from component_index.json, generated by script/gen_component_index.py.
+This allows resolving the load order without importing any component.
 """
+import asyncio
 import importlib
+import json
 import logging
 import os
 import pkgutil
@@ -18,9 +24,9 @@ import sys
 
 from types import ModuleType
 # pylint: disable=unused-import
-from typing import Optional, Sequence, Set, Dict  # NOQA
+from typing import Any, Optional, Sequence, Set, Dict  # NOQA
 
-from homeassistant.const import PLATFORM_FORMAT
+from homeassistant.const import PLATFORM_FORMAT, __version__
 from homeassistant.util import OrderedSet
 
 # Typing imports
@@ -38,6 +44,12 @@ AVAILABLE_COMPONENTS = []  # type: List[str]
 # Dict of loaded components mapped name => module
 _COMPONENT_CACHE = {}  # type: Dict[str, ModuleType]
 
+# Dict of built-in components and platforms mapped name => manifest
+COMPONENT_INDEX = {}  # type: Dict[str, Dict[str, Any]]
+
+COMPONENT_INDEX_FILE = os.path.join(
+    os.path.dirname(__file__), 'component_index.json')
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -52,10 +64,18 @@ def prepare(hass: 'HomeAssistant'):
     import homeassistant.components as components
 
     AVAILABLE_COMPONENTS.clear()
-
-    AVAILABLE_COMPONENTS.extend(
-        item[1] for item in
-        pkgutil.iter_modules(components.__path__, 'homeassistant.components.'))
+    COMPONENT_INDEX.clear()
+    COMPONENT_INDEX.update(_load_component_index())
+
+    if COMPONENT_INDEX:
+        AVAILABLE_COMPONENTS.extend(
+            'homeassistant.components.{}'.format(comp_name)
+            for comp_name in COMPONENT_INDEX if '.' not in comp_name)
+    else:
+        AVAILABLE_COMPONENTS.extend(
+            item[1] for item in
+            pkgutil.iter_modules(components.__path__,
+                                 'homeassistant.components.'))
 
     # Look for available custom components
     custom_path = hass.config.path("custom_components")
@@ -85,6 +105,26 @@ def prepare(hass: 'HomeAssistant'):
     PREPARED = True
 
 
+def _load_component_index() -> Dict[str, Dict[str, Any]]:
+    """Load the index of built-in components.
+
+    Returns an empty dict if the index is missing or out of date.
+    """
+    try:
+        with open(COMPONENT_INDEX_FILE, encoding='utf-8') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("Unable to load component index: %s", err)
+        return {}
+
+    if index.get('version') != __version__:
+        _LOGGER.warning("Ignoring component index of version %s",
+                        index.get('version'))
+        return {}
+
+    return index['components']
+
+
 def set_component(comp_name: str, component: ModuleType) -> None:
     """Set a component in the cache.
 
@@ -170,6 +210,80 @@ def get_component(comp_name) -> Optional[ModuleType]:
     return None
 
 
+@asyncio.coroutine
+def async_get_component(hass: 'HomeAssistant',
+                        comp_name: str) -> Optional[ModuleType]:
+    """Load specified component, importing it in the executor.
+
+    This method is a coroutine.
+    """
+    if comp_name in _COMPONENT_CACHE:
+        return _COMPONENT_CACHE[comp_name]
+
+    return (yield from hass.loop.run_in_executor(
+        None, get_component, comp_name))
+
+
+@asyncio.coroutine
+def async_get_platform(hass: 'HomeAssistant', domain: str,
+                       platform: str) -> Optional[ModuleType]:
+    """Load specified platform, importing it in the executor.
+
+    This method is a coroutine.
+    """
+    return (yield from async_get_component(
+        hass, PLATFORM_FORMAT.format(domain, platform)))
+
+
+def get_manifest(comp_name: str) -> Optional[Dict[str, Any]]:
+    """Return the dependencies, requirements and platforms of a component.
+
+    Built-in components are looked up in the index, components replaced
+    with set_component or found in custom_components are imported.
+    Returns None if the component does not exist.
+
+    Async friendly if the component is built-in or already loaded.
+    """
+    root_comp = comp_name.split('.', 1)[0]
+
+    if comp_name in COMPONENT_INDEX and \
+            not _is_overridden(comp_name) and \
+            'custom_components.{}'.format(root_comp) \
+            not in AVAILABLE_COMPONENTS:
+        return COMPONENT_INDEX[comp_name]
+
+    component = get_component(comp_name)
+
+    if component is None:
+        return None
+
+    manifest = {
+        'dependencies': list(getattr(component, 'DEPENDENCIES', [])),
+        'requirements': list(getattr(component, 'REQUIREMENTS', [])),
+    }
+
+    if '.' not in comp_name:
+        platforms = set(name.split('.', 1)[1] for name in _COMPONENT_CACHE
+                        if name.startswith(comp_name + '.'))
+        platforms.update(
+            COMPONENT_INDEX.get(comp_name, {}).get('platforms', []))
+        manifest['platforms'] = sorted(platforms)
+
+    return manifest
+
+
+def _is_overridden(comp_name: str) -> bool:
+    """Return if a component was replaced with set_component.
+
+    Async friendly.
+    """
+    if comp_name not in _COMPONENT_CACHE:
+        return False
+
+    return getattr(_COMPONENT_CACHE[comp_name], '__name__', None) != \
+        'homeassistant.components.{}'.format(comp_name)
+
+
 def load_order_components(components: Sequence[str]) -> OrderedSet:
     """Take in a list of components we want to load.
 
@@ -222,15 +336,15 @@ def _load_order_component(comp_name: str, load_order: OrderedSet,
 
     Async friendly.
     """
-    component = get_component(comp_name)
+    manifest = get_manifest(comp_name)
 
     # If None it does not exist, error already thrown by get_component.
-    if component is None:
+    if manifest is None:
         return OrderedSet()
 
     loading.add(comp_name)
 
-    for dependency in getattr(component, 'DEPENDENCIES', []):
+    for dependency in manifest['dependencies']:
         # Check not already loaded
         if dependency in load_order:
             continue
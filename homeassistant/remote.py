@@ -8,32 +8,49 @@ For more details about the Python API, please refer to the documentation at
 https://home-assistant.io/developers/python_api/
 """
 import asyncio
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import enum
 import json
 import logging
 import time
-import threading
 import urllib.parse
 
-from typing import Optional
+from typing import Optional, Union
 
+import aiohttp
+import async_timeout
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 
 import homeassistant.bootstrap as bootstrap
 import homeassistant.core as ha
+import homeassistant.helpers.json as json_helper
 from homeassistant.const import (
-    HTTP_HEADER_HA_AUTH, SERVER_PORT, URL_API, URL_API_EVENT_FORWARD,
+    HTTP_HEADER_HA_AUTH, SERVER_PORT, URL_API, URL_API_BATCH_EVENTS,
+    URL_API_BATCH_SERVICES, URL_API_BATCH_STATES, URL_API_EVENT_FORWARD,
     URL_API_EVENTS, URL_API_EVENTS_EVENT, URL_API_SERVICES, URL_API_CONFIG,
     URL_API_SERVICES_SERVICE, URL_API_STATES, URL_API_STATES_ENTITY,
-    HTTP_HEADER_CONTENT_TYPE, CONTENT_TYPE_JSON)
+    URL_API_STARTUP_TIMINGS, URL_API_WEBSOCKET, HTTP_HEADER_CONTENT_TYPE,
+    CONTENT_TYPE_JSON)
 from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
 
 METHOD_GET = "get"
 METHOD_POST = "post"
 METHOD_DELETE = "delete"
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 0
+
+DEFAULT_FLUSH_WINDOW = 0
+DEFAULT_MAX_QUEUE = 1000
+DEFAULT_RETRY_INTERVAL = 10
+
+WEBSOCKET_RECONNECT_INTERVAL = 10
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -55,11 +72,20 @@ class API(object):
     """Object to pass around Home Assistant API location and credentials."""
 
     def __init__(self, host: str, api_password: Optional[str]=None,
-                 port: Optional[int]=SERVER_PORT, use_ssl: bool=False) -> None:
-        """Initalize the API."""
+                 port: Optional[int]=SERVER_PORT, use_ssl: bool=False,
+                 pool_size: int=DEFAULT_POOL_SIZE,
+                 retries: Union[int, Retry]=DEFAULT_RETRIES) -> None:
+        """Initalize the API.
+
+        Requests share a keep-alive connection pool of pool_size
+        connections. retries is either the number of retries or a urllib3
+        Retry instance describing the retry policy.
+        """
         self.host = host
         self.port = port
         self.api_password = api_password
+        self.pool_size = pool_size
+        self.retries = retries
 
         if host.startswith(("http://", "https://")):
             self.base_url = host
@@ -79,6 +105,15 @@ class API(object):
         if api_password is not None:
             self._headers[HTTP_HEADER_HA_AUTH] = api_password
 
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retries)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        self._async_session = None
+
     def validate_api(self, force_validate: bool=False) -> bool:
         """Test if we can communicate with the API."""
         if self.status is None or force_validate:
@@ -89,18 +124,16 @@ class API(object):
     def __call__(self, method, path, data=None, timeout=5):
         """Make a call to the Home Assistant API."""
         if data is not None:
-            data = json.dumps(data, cls=JSONEncoder)
+            data = json_helper.dumps(data)
 
         url = urllib.parse.urljoin(self.base_url, path)
 
         try:
             if method == METHOD_GET:
-                return requests.get(
-                    url, params=data, timeout=timeout, headers=self._headers)
+                return self._session.get(url, params=data, timeout=timeout)
             else:
-                return requests.request(
-                    method, url, data=data, timeout=timeout,
-                    headers=self._headers)
+                return self._session.request(
+                    method, url, data=data, timeout=timeout)
 
         except requests.exceptions.ConnectionError:
             _LOGGER.exception("Error connecting to server")
@@ -111,6 +144,70 @@ class API(object):
             _LOGGER.exception(error)
             raise HomeAssistantError(error)
 
+    @asyncio.coroutine
+    def async_call(self, method, path, data=None, timeout=5, loop=None):
+        """Make a call to the Home Assistant API from inside the loop.
+
+        Returns the aiohttp response with its body already read, so the
+        connection is back in the pool when this returns.
+
+        This method is a coroutine.
+        """
+        if self._async_session is None:
+            loop = loop or asyncio.get_event_loop()
+            self._async_session = aiohttp.ClientSession(
+                loop=loop, headers=self._headers,
+                connector=aiohttp.TCPConnector(
+                    loop=loop, limit=self.pool_size))
+
+        if method != METHOD_GET and data is not None:
+            data = json_helper.dumps(data)
+
+        url = urllib.parse.urljoin(self.base_url, path)
+        loop = self._async_session.loop
+        retries = self.retries
+        if isinstance(retries, Retry):
+            retries = retries.total or 0
+
+        while True:
+            try:
+                with async_timeout.timeout(timeout, loop=loop):
+                    if method == METHOD_GET:
+                        response = yield from self._async_session.get(
+                            url, params=data)
+                    else:
+                        response = yield from self._async_session.request(
+                            method, url, data=data)
+
+                    yield from response.read()
+                    return response
+
+            except aiohttp.ClientOSError:
+                if retries > 0:
+                    retries -= 1
+                    continue
+                _LOGGER.exception("Error connecting to server")
+                raise HomeAssistantError("Error connecting to server")
+
+            except asyncio.TimeoutError:
+                error = "Timeout when talking to {}".format(self.host)
+                _LOGGER.exception(error)
+                raise HomeAssistantError(error)
+
+    def close(self):
+        """Close the pooled connections of the synchronous session."""
+        self._session.close()
+
+    @asyncio.coroutine
+    def async_close(self):
+        """Close the pooled connections of the asyncio session.
+
+        This method is a coroutine.
+        """
+        if self._async_session is not None:
+            self._async_session.close()
+            self._async_session = None
+
     def __repr__(self) -> str:
         """Return the representation of the API."""
         return "<API({}, password: {})>".format(
@@ -121,8 +218,13 @@ class HomeAssistant(ha.HomeAssistant):
     """Home Assistant that forwards work."""
 
     # pylint: disable=super-init-not-called
-    def __init__(self, remote_api, local_api=None, loop=None):
-        """Initalize the forward instance."""
+    def __init__(self, remote_api, local_api=None, loop=None,
+                 websocket_mirror=False):
+        """Initalize the forward instance.
+
+        With websocket_mirror the states are mirrored over the websocket
+        API of the remote instance instead of forwarded state changes.
+        """
         if not remote_api.validate_api():
             raise HomeAssistantError(
                 "Remote API at {}:{} not valid: {}".format(
@@ -140,12 +242,14 @@ class HomeAssistant(ha.HomeAssistant):
         self.bus = EventBus(remote_api, self)
         self.services = ha.ServiceRegistry(self)
         self.states = StateMachine(self.bus, self.loop, self.remote_api)
+        self.scheduler = ha.Scheduler(self)
         self.config = ha.Config()
         # This is a dictionary that any component can store any data on.
         self.data = {}
         self.state = ha.CoreState.not_running
         self.exit_code = None
         self.config.api = local_api
+        self.websocket_mirror = websocket_mirror
 
     def start(self):
         """Start the instance."""
@@ -175,6 +279,9 @@ class HomeAssistant(ha.HomeAssistant):
                 'Could not setup event forwarding from api {} to '
                 'local api {}').format(self.remote_api, self.config.api))
 
+        if self.websocket_mirror:
+            self.add_job(self.states.async_start_websocket_mirror)
+
     def stop(self):
         """Stop Home Assistant and shuts down all threads."""
         _LOGGER.info("Stopping")
@@ -183,6 +290,9 @@ class HomeAssistant(ha.HomeAssistant):
         self.bus.fire(ha.EVENT_HOMEASSISTANT_STOP,
                       origin=ha.EventOrigin.remote)
 
+        if self.websocket_mirror:
+            self.add_job(self.states.async_stop_websocket_mirror)
+
         # Disconnect master event forwarding
         disconnect_remote_events(self.remote_api, self.config.api)
         self.state = ha.CoreState.not_running
@@ -212,18 +322,37 @@ class EventBus(ha.EventBus):
 
 
 class EventForwarder(object):
-    """Listens for events and forwards to specified APIs."""
+    """Listens for events and forwards them in batches to specified APIs.
+
+    Every target has its own queue. Events queued while a POST to the
+    target is in flight, or within flush_window seconds, are sent together
+    in one request. If a target cannot be reached, the events it did not
+    receive are kept and sending is retried every retry_interval seconds.
+    Until then the queue is compacted to the latest state change per
+    entity and at most max_queue events. A queue never holds more than
+    max_queue events, the oldest are dropped first.
+    """
 
-    def __init__(self, hass, restrict_origin=None):
+    def __init__(self, hass, restrict_origin=None,
+                 flush_window=DEFAULT_FLUSH_WINDOW,
+                 max_queue=DEFAULT_MAX_QUEUE,
+                 retry_interval=DEFAULT_RETRY_INTERVAL):
         """Initalize the event forwarder."""
         self.hass = hass
         self.restrict_origin = restrict_origin
+        self.flush_window = flush_window
+        self.max_queue = max_queue
+        self.retry_interval = retry_interval
 
         # We use a tuple (host, port) as key to ensure
         # that we do not forward to the same host twice
         self._targets = {}
+        self._queues = {}
+        # Targets with a flush scheduled or in flight
+        self._flushing = set()
+        # Targets waiting to retry after a failed flush
+        self._retrying = set()
 
-        self._lock = threading.Lock()
         self._async_unsub_listener = None
 
     @ha.callback
@@ -239,13 +368,20 @@ class EventForwarder(object):
         key = (api.host, api.port)
 
         self._targets[key] = api
+        self._queues.setdefault(key, deque())
 
     @ha.callback
     def async_disconnect(self, api):
         """Remove target from being forwarded to."""
         key = (api.host, api.port)
 
-        did_remove = self._targets.pop(key, None) is None
+        old_api = self._targets.pop(key, None)
+        did_remove = old_api is None
+        self._queues.pop(key, None)
+        self._retrying.discard(key)
+
+        if old_api is not None:
+            self.hass.async_add_job(old_api.async_close())
 
         if len(self._targets) == 0:
             # Remove event listener if no forwarding targets present
@@ -254,25 +390,183 @@ class EventForwarder(object):
 
         return did_remove
 
+    @ha.callback
     def _event_listener(self, event):
-        """Listen and forward all events."""
-        with self._lock:
-            # We don't forward time events or, if enabled, non-local events
-            if event.event_type == ha.EVENT_TIME_CHANGED or \
-               (self.restrict_origin and event.origin != self.restrict_origin):
-                return
+        """Listen and queue all events for the targets."""
+        # We don't forward time events or, if enabled, non-local events
+        if event.event_type == ha.EVENT_TIME_CHANGED or \
+           (self.restrict_origin and event.origin != self.restrict_origin):
+            return
+
+        for key, queue in self._queues.items():
+            queue.append(event)
+
+            if len(queue) > self.max_queue:
+                if key in self._retrying:
+                    self._async_compact(key)
+                else:
+                    # Target is slow but up, only drop the oldest event
+                    queue.popleft()
+                    _LOGGER.warning("Dropped 1 event queued for %s:%s", *key)
+
+            if key not in self._flushing:
+                self._flushing.add(key)
+                self._async_schedule_flush(key, self.flush_window)
 
-            for api in self._targets.values():
-                fire_event(api, event.event_type, event.data)
+    @ha.callback
+    def _async_schedule_flush(self, key, delay):
+        """Flush the queue of a target after delay seconds."""
+        if delay:
+            self.hass.loop.call_later(delay, self._async_start_flush, key)
+        else:
+            self._async_start_flush(key)
+
+    @ha.callback
+    def _async_start_flush(self, key):
+        """Start flushing the queue of a target."""
+        self.hass.async_add_job(self._async_flush(key))
+
+    @ha.callback
+    def _async_compact(self, key):
+        """Keep the latest state change per entity and max_queue events."""
+        queue = self._queues[key]
+        size = len(queue)
+        compacted = deque()
+        entity_ids = set()
+
+        for event in reversed(queue):
+            if event.event_type == ha.EVENT_STATE_CHANGED:
+                entity_id = event.data.get('entity_id')
+                if entity_id in entity_ids:
+                    continue
+                entity_ids.add(entity_id)
+
+            compacted.appendleft(event)
+
+            if len(compacted) == self.max_queue:
+                break
+
+        self._queues[key] = compacted
+        _LOGGER.warning("Dropped %d events queued for %s:%s",
+                        size - len(compacted), *key)
+
+    @asyncio.coroutine
+    def _async_flush(self, key):
+        """Send the queued events of a target in batches."""
+        self._retrying.discard(key)
+        retry = False
+
+        try:
+            while self._queues.get(key):
+                api = self._targets[key]
+                queue = self._queues[key]
+                events = list(queue)
+                queue.clear()
+
+                try:
+                    sent = yield from self._async_post(api, events)
+                except (TypeError, ValueError):
+                    # Drop the events we can not serialize and send the rest
+                    events = self._serializable(events)
+                    sent = yield from self._async_post(api, events)
+
+                if key not in self._queues:
+                    break
+
+                if sent < len(events):
+                    # Target is down, keep the unsent events for next attempt
+                    queue = self._queues[key]
+                    queue.extendleft(reversed(events[sent:]))
+                    if len(queue) > self.max_queue:
+                        self._async_compact(key)
+                    self._retrying.add(key)
+                    self._async_schedule_flush(key, self.retry_interval)
+                    retry = True
+                    return
+        finally:
+            if not retry:
+                self._flushing.discard(key)
+
+    @staticmethod
+    def _serializable(events):
+        """Return the events with data that can be serialized."""
+        result = []
+
+        for event in events:
+            try:
+                json_helper.dumps(event.data)
+            except (TypeError, ValueError):
+                _LOGGER.error("Unable to forward %s event, data can not be "
+                              "serialized: %s", event.event_type, event.data)
+            else:
+                result.append(event)
+
+        return result
+
+    @asyncio.coroutine
+    def _async_post(self, api, events):
+        """Post events in one batch. Return the number of events sent."""
+        batch = [{'event_type': event.event_type, 'event_data': event.data}
+                 for event in events]
+        sent = 0
+
+        try:
+            req = yield from api.async_call(
+                METHOD_POST, URL_API_BATCH_EVENTS, batch, loop=self.hass.loop)
+
+            if req.status == 404:
+                # Target does not support batches, send one by one
+                # and stop at the first event that fails
+                for event in events:
+                    req = yield from api.async_call(
+                        METHOD_POST,
+                        URL_API_EVENTS_EVENT.format(event.event_type),
+                        event.data, loop=self.hass.loop)
+
+                    if req.status != 200:
+                        break
+
+                    sent += 1
+
+            elif req.status == 200:
+                sent = len(events)
+
+            if req.status != 200:
+                _LOGGER.error("Error forwarding events to %s: %d - %s",
+                              api, req.status, (yield from req.text()))
+
+        except HomeAssistantError:
+            pass
+
+        return sent
+
+
+@asyncio.coroutine
+def _async_receive_json(wsock):
+    """Receive a JSON message, raise if the websocket was closed instead."""
+    msg = yield from wsock.receive()
+
+    if msg.type != aiohttp.WSMsgType.TEXT:
+        raise HomeAssistantError(
+            'Websocket closed while waiting for a message')
+
+    return json.loads(msg.data)
 
 
 class StateMachine(ha.StateMachine):
-    """Fire set events to an API. Uses state_change events to track states."""
+    """Fire set events to an API. Uses state_change events to track states.
+
+    In websocket mirror mode the states are kept up to date by a
+    subscription to the websocket API of the remote instance instead.
+    """
 
     def __init__(self, bus, loop, api):
         """Initalize the statemachine."""
         super().__init__(bus, loop)
         self._api = api
+        self._mirror_task = None
+        self._mirror_epoch = None
+        self._mirror_version = 0
         self.mirror()
 
         bus.listen(ha.EVENT_STATE_CHANGED, self._state_changed_listener)
@@ -290,15 +584,139 @@ class StateMachine(ha.StateMachine):
 
     def mirror(self):
         """Discard current data and mirrors the remote state machine."""
-        self._states = {state.entity_id: state for state
-                        in get_states(self._api)}
+        self._reset_states(get_states(self._api))
+
+    @ha.callback
+    def async_start_websocket_mirror(self):
+        """Start mirroring the remote states over the websocket API.
+
+        This method must be run in the event loop.
+        """
+        if self._mirror_task is None:
+            self._mirror_task = self._loop.create_task(
+                self._async_websocket_mirror())
+
+    @ha.callback
+    def async_stop_websocket_mirror(self):
+        """Stop mirroring the remote states over the websocket API.
+
+        This method must be run in the event loop.
+        """
+        if self._mirror_task is not None:
+            self._mirror_task.cancel()
+            self._mirror_task = None
+
+    @asyncio.coroutine
+    def _async_websocket_mirror(self):
+        """Keep a websocket subscription to the remote states open."""
+        session = aiohttp.ClientSession(loop=self._loop)
+        url = urllib.parse.urljoin(
+            self._api.base_url.replace('http', 'ws', 1), URL_API_WEBSOCKET)
+
+        try:
+            while True:
+                try:
+                    wsock = yield from session.ws_connect(url)
+                    try:
+                        yield from self._async_websocket_subscribe(wsock)
+                    finally:
+                        yield from wsock.close()
+
+                except (aiohttp.ClientError, HomeAssistantError,
+                        KeyError, TypeError, ValueError) as err:
+                    _LOGGER.warning("Lost websocket connection to %s: %s",
+                                    self._api, err)
+
+                yield from asyncio.sleep(
+                    WEBSOCKET_RECONNECT_INTERVAL, loop=self._loop)
+        finally:
+            session.close()
+
+    @asyncio.coroutine
+    def _async_websocket_subscribe(self, wsock):
+        """Subscribe to the remote states and apply the diffs."""
+        msg = yield from _async_receive_json(wsock)
+
+        if msg['type'] == 'auth_required':
+            wsock.send_json(
+                {'type': 'auth', 'api_password': self._api.api_password})
+            msg = yield from _async_receive_json(wsock)
+
+        if msg['type'] != 'auth_ok':
+            raise HomeAssistantError(msg.get('message', 'Invalid password'))
+
+        wsock.send_json({
+            'id': 1,
+            'type': 'subscribe_states',
+            'since': {'epoch': self._mirror_epoch,
+                      'version': self._mirror_version},
+        })
+
+        msg = yield from _async_receive_json(wsock)
+        result = msg['result']
+
+        if result['full']:
+            self._reset_states([])
+
+        for state in result['states']:
+            state = ha.State.from_dict(state)
+            self._store_state(state.entity_id, state)
+
+        for entity_id in result['removed']:
+            self._discard_state(entity_id)
+
+        self._mirror_epoch = result['epoch']
+        self._mirror_version = result['version']
+
+        while True:
+            msg = yield from wsock.receive()
+
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                return
+
+            self._async_apply_state_diff(json.loads(msg.data))
+
+    @ha.callback
+    def _async_apply_state_diff(self, diff):
+        """Apply a state diff received from the websocket API."""
+        entity_id = diff['entity_id']
+        old_state = self._states.get(entity_id)
+        self._mirror_version = diff['version']
+
+        if diff.get('removed'):
+            self._discard_state(entity_id)
+            return
+
+        if old_state is None:
+            state = ha.State.from_dict(diff)
+            if state is not None:
+                self._store_state(entity_id, state)
+            return
+
+        attributes = dict(old_state.attributes)
+        attributes.update(diff.get('attributes', {}))
+        for key in diff.get('attributes_removed', []):
+            attributes.pop(key, None)
+
+        last_changed = diff.get('last_changed')
+        if last_changed is not None:
+            last_changed = dt_util.parse_datetime(last_changed)
+
+        self._store_state(entity_id, ha.State(
+            entity_id, diff.get('state', old_state.state), attributes,
+            last_changed or old_state.last_changed,
+            dt_util.parse_datetime(diff['last_updated'])))
 
     def _state_changed_listener(self, event):
         """Listen for state changed events and applies them."""
+        if self._mirror_task is not None:
+            return
+
         if event.data['new_state'] is None:
-            self._states.pop(event.data['entity_id'], None)
+            self._discard_state(event.data['entity_id'])
         else:
-            self._states[event.data['entity_id']] = event.data['new_state']
+            self._store_state(event.data['entity_id'],
+                              event.data['new_state'])
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -424,6 +842,31 @@ def fire_event(api, event_type, data=None):
         _LOGGER.exception("Error firing event")
 
 
+def fire_events(api, events):
+    """Fire many events at remote API in a single request.
+
+    events is an iterable of (event_type, data) tuples.
+    Return True if the request succeeded.
+    """
+    data = [{'event_type': event_type, 'event_data': event_data}
+            for event_type, event_data in events]
+
+    try:
+        req = api(METHOD_POST, URL_API_BATCH_EVENTS, data)
+
+        if req.status_code != 200:
+            _LOGGER.error("Error firing events: %d - %s",
+                          req.status_code, req.text)
+            return False
+
+        return True
+
+    except HomeAssistantError:
+        _LOGGER.exception("Error firing events")
+
+        return False
+
+
 def get_state(api, entity_id):
     """Query given API for state of entity_id."""
     try:
@@ -457,6 +900,25 @@ def get_states(api):
         return []
 
 
+def get_states_by_id(api, entity_ids):
+    """Query given API for the states of a list of entity ids.
+
+    Return a list with a State, or None if not found, per entity id.
+    """
+    try:
+        req = api(METHOD_POST, URL_API_BATCH_STATES,
+                  {'entity_id': list(entity_ids)})
+
+        return [ha.State.from_dict(item) for item in req.json()] \
+            if req.status_code == 200 else []
+
+    except (HomeAssistantError, ValueError, AttributeError):
+        # ValueError if req.json() can't parse the json
+        _LOGGER.exception("Error fetching states")
+
+        return []
+
+
 def remove_state(api, entity_id):
     """Call API to remove state for entity_id.
 
@@ -545,6 +1007,42 @@ def call_service(api, domain, service, service_data=None, timeout=5):
         _LOGGER.exception("Error calling service")
 
 
+def call_services(api, calls, timeout=30):
+    """Call many services at the remote API in a single request.
+
+    calls is an iterable of (domain, service, service_data) tuples. The
+    services are called in order. Return a list with per call a dict
+    containing success and either changed_states or an error message.
+    """
+    data = [{'domain': domain, 'service': service,
+             'service_data': service_data}
+            for domain, service, service_data in calls]
+
+    try:
+        req = api(METHOD_POST, URL_API_BATCH_SERVICES, data, timeout=timeout)
+
+        if req.status_code != 200:
+            _LOGGER.error("Error calling services: %d - %s",
+                          req.status_code, req.text)
+            return []
+
+        results = req.json()
+
+        for result in results:
+            if 'changed_states' in result:
+                result['changed_states'] = [
+                    ha.State.from_dict(item)
+                    for item in result['changed_states']]
+
+        return results
+
+    except (HomeAssistantError, ValueError):
+        # ValueError if req.json() can't parse the json
+        _LOGGER.exception("Error calling services")
+
+        return []
+
+
 def get_config(api):
     """Return configuration."""
     try:
@@ -563,3 +1061,17 @@ def get_config(api):
         _LOGGER.exception("Got unexpected configuration results")
 
         return {}
+
+
+def get_startup_timings(api):
+    """Return how long the startup phases took, slowest first."""
+    try:
+        req = api(METHOD_GET, URL_API_STARTUP_TIMINGS)
+
+        return req.json() if req.status_code == 200 else []
+
+    except (HomeAssistantError, ValueError):
+        # ValueError if req.json() can't parse the JSON
+        _LOGGER.exception("Got unexpected startup timing results")
+
+        return []
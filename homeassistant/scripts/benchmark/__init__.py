@@ -0,0 +1,346 @@
+"""Script to run benchmarks."""
+import argparse
+from functools import partial
+import json
+import logging
+from time import process_time
+from timeit import default_timer as timer
+
+from typing import Callable, Dict, List  # NOQA
+
+import homeassistant.core as ha
+import homeassistant.remote as rem
+from homeassistant.const import EVENT_STATE_CHANGED
+
+BENCHMARKS = {}  # type: Dict[str, Callable]
+
+
+def run(script_args: List) -> int:
+    """Run a Home Assistant benchmark."""
+    logging.getLogger('homeassistant.core').setLevel(logging.CRITICAL)
+
+    parser = argparse.ArgumentParser(
+        description="Run a Home Assistant benchmark.")
+    parser.add_argument(
+        'name', choices=sorted(BENCHMARKS))
+    parser.add_argument(
+        '-n', '--count', type=int, default=10000,
+        help="Number of iterations per measurement")
+
+    args = parser.parse_args(script_args)
+
+    for line in BENCHMARKS[args.name](args.count):
+        print(line)
+
+    return 0
+
+
+def benchmark(func):
+    """Decorator to register a benchmark.
+
+    A benchmark is called with the number of iterations and returns the
+    lines of its report.
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(func, count):
+    """Call func count times and return the average duration in seconds."""
+    start = timer()
+
+    for _ in range(count):
+        func()
+
+    return (timer() - start) / count
+
+
+def sample_state(index=0):
+    """Return a state resembling a light with a typical set of attributes."""
+    return ha.State('light.living_room_{}'.format(index), 'on', {
+        'brightness': 180,
+        'color_temp': 366,
+        'rgb_color': [255, 178, 102],
+        'xy_color': [0.52, 0.413],
+        'min_mireds': 153,
+        'max_mireds': 500,
+        'effect_list': ['colorloop', 'random'],
+        'friendly_name': 'Living Room {}'.format(index),
+        'supported_features': 63,
+    })
+
+
+def sample_state_changed_event(index=0):
+    """Return a state_changed event for sample_state."""
+    old_state = sample_state(index)
+    new_attr = dict(old_state.attributes, brightness=index % 255)
+    new_state = ha.State(old_state.entity_id, 'on', new_attr,
+                         old_state.last_changed)
+    return ha.Event(EVENT_STATE_CHANGED, {
+        'entity_id': old_state.entity_id,
+        'old_state': old_state,
+        'new_state': new_state,
+    })
+
+
+@benchmark
+def event_stream_compression(count):
+    """Measure bytes and CPU per event written to /api/stream."""
+    from homeassistant.components.api import compress_chunk, stream_compressor
+
+    messages = [
+        'data: {}\n\n'.format(json.dumps(
+            sample_state_changed_event(index), cls=rem.JSONEncoder)
+        ).encode('UTF-8') for index in range(count)]
+
+    yield '{:>8} {:>12} {:>10}'.format('level', 'bytes/event', 'cpu us')
+
+    raw = sum(len(message) for message in messages) / count
+    yield '{:>8} {:>12.1f} {:>10}'.format('none', raw, '-')
+
+    for level in (1, 6, 9):
+        compressor = stream_compressor(level)
+        written = 0
+        start_cpu = process_time()
+
+        for message in messages:
+            written += len(compress_chunk(compressor, message))
+
+        cpu = (process_time() - start_cpu) / count
+        yield '{:>8} {:>12.1f} {:>10.1f}'.format(
+            level, written / count, cpu * 1e6)
+
+
+@benchmark
+def json_serialization(count):
+    """Compare JSON serializers on a 10k states snapshot and an event."""
+    import homeassistant.helpers.json as json_helper
+
+    states = [sample_state(index) for index in range(10000)]
+    event = sample_state_changed_event()
+
+    candidates = [('remote.JSONEncoder',
+                   lambda obj: json.dumps(obj, cls=rem.JSONEncoder))]
+    candidates.extend(json_helper.SERIALIZERS.items())
+
+    yield '{:<20} {:>14} {:>14}'.format(
+        'serializer', 'snapshot ms', 'event us')
+
+    for name, dumps in candidates:
+        snapshot = measure(partial(dumps, states), max(1, count // 1000))
+        state_changed = measure(partial(dumps, event), count)
+        yield '{:<20} {:>14.2f} {:>14.1f}'.format(
+            name, snapshot * 1e3, state_changed * 1e6)
+
+
+@benchmark
+def remote_api_requests(count):
+    """Compare request rates of remote.API with and without pooling."""
+    import asyncio
+    import threading
+
+    from aiohttp import web
+    import requests
+
+    from homeassistant.const import URL_API
+
+    logging.getLogger('aiohttp.access').setLevel(logging.WARNING)
+    server_loop = asyncio.new_event_loop()
+    app = web.Application(loop=server_loop)
+    app.router.add_get(URL_API, lambda request: web.json_response(
+        {'message': 'API running.'}))
+    handler = app.make_handler()
+    server = server_loop.run_until_complete(
+        server_loop.create_server(handler, '127.0.0.1', 0))
+    port = server.sockets[0].getsockname()[1]
+    threading.Thread(target=server_loop.run_forever, daemon=True).start()
+
+    api = rem.API('127.0.0.1', port=port)
+    url = '{}{}'.format(api.base_url, URL_API)
+    client_loop = asyncio.new_event_loop()
+
+    @asyncio.coroutine
+    def async_requests():
+        """Call the API count times from inside the loop."""
+        for _ in range(count):
+            yield from api.async_call(rem.METHOD_GET, URL_API,
+                                      loop=client_loop)
+
+    yield '{:<24} {:>12}'.format('client', 'requests/s')
+
+    for name, func in (
+            ('requests.get', partial(requests.get, url)),
+            ('API (pooled session)', partial(api, rem.METHOD_GET, URL_API))):
+        yield '{:<24} {:>12.0f}'.format(name, 1 / measure(func, count))
+
+    start = timer()
+    client_loop.run_until_complete(async_requests())
+    yield '{:<24} {:>12.0f}'.format(
+        'API.async_call', count / (timer() - start))
+
+    client_loop.run_until_complete(api.async_close())
+    client_loop.close()
+    api.close()
+
+    server.close()
+    server_loop.call_soon_threadsafe(server_loop.stop)
+
+
+@benchmark
+def value_templates(count):
+    """Compare rendering value templates with and without the fast path.
+
+    Every template renders count messages, like the payloads of MQTT and
+    REST sensors.
+    """
+    import asyncio
+
+    from homeassistant.helpers.template import Template
+
+    hass = ha.HomeAssistant(asyncio.new_event_loop())
+    numbers = ['{:.2f}'.format(20 + index % 1000 / 100)
+               for index in range(count)]
+    payloads = [json.dumps({'sensor': {'temperature': number}})
+                for number in numbers]
+
+    yield '{:<48} {:>10} {:>10}'.format('template', 'jinja us', 'fast us')
+
+    for source, messages in (
+            ('{{ value }}', numbers),
+            ('{{ value | float | round(1) }}', numbers),
+            ('{{ value_json.sensor.temperature }}', payloads),
+            ('{{ value_json.sensor.temperature | float }}', payloads)):
+        tpl = Template(source, hass)
+        timings = []
+
+        # pylint: disable=protected-access
+        for render in (tpl._async_render_json_value,
+                       tpl.async_render_with_possible_json_value):
+            start = timer()
+
+            for message in messages:
+                render(message)
+
+            timings.append((timer() - start) / count)
+
+        yield '{:<48} {:>10.1f} {:>10.1f}'.format(
+            source, timings[0] * 1e6, timings[1] * 1e6)
+
+    hass.executor.shutdown()
+    hass.loop.close()
+
+
+AUTOMATION_CONDITIONS_YAML = """
+- alias: Hallway light on motion at night
+  condition:
+    - condition: template
+      value_template: "{{ states('sensor.hallway_lux') | float < 20 }}"
+    - condition: sun
+      after: sunset
+    - condition: state
+      entity_id: input_boolean.guest_mode
+      state: 'off'
+- alias: Heat the living room when someone is home
+  condition:
+    - condition: numeric_state
+      entity_id: sensor.living_room_temperature
+      below: 19
+    - condition: or
+      conditions:
+        - condition: zone
+          entity_id: device_tracker.paulus
+          zone: zone.home
+        - condition: state
+          entity_id: device_tracker.anne
+          state: home
+    - condition: time
+      after: '06:30:00'
+      before: '23:00:00'
+- alias: Notify when the garage stays open
+  condition:
+    - condition: template
+      value_template: "{{ trigger.to_state.state == 'open' }}"
+    - condition: state
+      entity_id: cover.garage
+      state: open
+      for:
+        minutes: 10
+- alias: Weekday morning routine
+  condition:
+    - condition: time
+      after: '07:00:00'
+      before: '09:00:00'
+      weekday: [mon, tue, wed, thu, fri]
+    - condition: state
+      entity_id: group.family
+      state: home
+    - condition: template
+      value_template: >
+        {{ states.sensor | selectattr('state', 'equalto', 'unknown')
+           | list | count == 0 }}
+"""
+
+
+@benchmark
+def automation_conditions(count):
+    """Compare testing automation conditions in config order and ordered.
+
+    The conditions come from a typical automations.yaml, every automation
+    is tested count times.
+    """
+    import asyncio
+    from datetime import timedelta
+
+    import yaml
+
+    from homeassistant.helpers import condition
+    import homeassistant.helpers.config_validation as cv
+    from homeassistant.util import dt as dt_util
+
+    hass = ha.HomeAssistant(asyncio.new_event_loop())
+    now = dt_util.utcnow()
+    states = {
+        'sensor.hallway_lux': ('12', {}),
+        'input_boolean.guest_mode': ('on', {}),
+        'sun.sun': ('below_horizon', {
+            'next_rising': (now + timedelta(hours=8)).isoformat(),
+            'next_setting': (now + timedelta(hours=20)).isoformat()}),
+        'sensor.living_room_temperature': ('18.5', {}),
+        'zone.home': ('zoning', {
+            'latitude': 32.87, 'longitude': -117.22, 'radius': 100}),
+        'device_tracker.paulus': ('not_home', {
+            'latitude': 32.9, 'longitude': -117.3}),
+        'device_tracker.anne': ('home', {}),
+        'cover.garage': ('closed', {}),
+        'group.family': ('home', {}),
+    }
+    for index in range(20):
+        states['sensor.temperature_{}'.format(index)] = ('21', {})
+    for entity_id, (state, attributes) in states.items():
+        hass.states.async_set(entity_id, state, attributes)
+
+    trigger = {'trigger': {
+        'platform': 'state',
+        'to_state': hass.states.get('cover.garage'),
+    }}
+
+    yield '{:<44} {:>12} {:>12}'.format(
+        'automation', 'in order us', 'ordered us')
+
+    for automation in yaml.safe_load(AUTOMATION_CONDITIONS_YAML):
+        configs = [cv.CONDITION_SCHEMA(config)
+                   for config in automation['condition']]
+        checks = [condition.async_from_config(config, False)
+                  for config in configs]
+        ordered = condition.async_and_from_config(
+            {'condition': 'and', 'conditions': configs}, False)
+
+        in_order = measure(lambda: all(
+            check(hass, trigger) for check in checks), count)
+        compiled = measure(partial(ordered, hass, trigger), count)
+
+        yield '{:<44} {:>12.1f} {:>12.1f}'.format(
+            automation['alias'], in_order * 1e6, compiled * 1e6)
+
+    hass.executor.shutdown()
+    hass.loop.close()
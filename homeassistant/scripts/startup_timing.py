@@ -0,0 +1,67 @@
+"""Script to show how long the startup of Home Assistant took."""
+import argparse
+
+from typing import List
+
+import homeassistant.remote as rem
+from homeassistant.const import SERVER_PORT
+
+
+def run(script_args: List) -> int:
+    """Print the startup timings of a running Home Assistant instance."""
+    parser = argparse.ArgumentParser(
+        description="Show where the startup of Home Assistant spent time.")
+    parser.add_argument(
+        '-H', '--host',
+        metavar='host',
+        default='127.0.0.1',
+        help="Home Assistant host address")
+    parser.add_argument(
+        '-P', '--port',
+        metavar='port',
+        type=int,
+        default=SERVER_PORT,
+        help="Home Assistant port")
+    parser.add_argument(
+        '-p', '--password',
+        metavar='password',
+        default=None,
+        help="Home Assistant API password")
+    parser.add_argument(
+        '-n', '--count',
+        metavar='count',
+        type=int,
+        default=25,
+        help="Number of slowest steps to show")
+    parser.add_argument(
+        '--script',
+        choices=['startup_timing'])
+
+    args = parser.parse_args(script_args)
+
+    api = rem.API(args.host, args.password, args.port)
+    timings = rem.get_startup_timings(api)
+
+    if not timings:
+        print("No startup timings available from {}".format(api.base_url))
+        return 1
+
+    phases = {}
+    for timing in timings:
+        phases[timing['phase']] = \
+            phases.get(timing['phase'], 0) + timing['wall']
+
+    print('{:<14} {:>10}'.format('phase', 'wall s'))
+    for phase, wall in sorted(phases.items(), key=lambda item: item[1],
+                              reverse=True):
+        print('{:<14} {:>10.2f}'.format(phase, wall))
+
+    print()
+    print('{:<14} {:<40} {:>10} {:>10}'.format(
+        'phase', 'name', 'wall s', 'executor s'))
+    for timing in timings[:args.count]:
+        print('{:<14} {:<40} {:>10.2f} {:>10.2f}'.format(
+            timing['phase'], timing['name'], timing['wall'],
+            timing['executor']))
+
+    return 0
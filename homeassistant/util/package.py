@@ -1,14 +1,16 @@
 """Helpers to install PyPi packages."""
+import hashlib
+import json
 import logging
 import os
+import site
 import subprocess
 import sys
+import sysconfig
 import threading
 from urllib.parse import urlparse
 
-from typing import Optional
-
-import pkg_resources
+from typing import Iterable, List, Optional, Set
 
 _LOGGER = logging.getLogger(__name__)
 INSTALL_LOCK = threading.Lock()
@@ -39,24 +41,134 @@ def install_package(package: str, upgrade: bool=True,
             return False
 
 
+def install_packages(packages: List[str], upgrade: bool=True,
+                     target: Optional[str]=None) -> bool:
+    """Install the missing packages with a single pip invocation.
+
+    Return boolean if install successful.
+    """
+    with INSTALL_LOCK:
+        missing = missing_packages(packages, target)
+        if not missing:
+            return True
+
+        _LOGGER.info('Attempting install of %s', ', '.join(missing))
+        args = [sys.executable, '-m', 'pip', 'install', '--quiet'] + missing
+        if upgrade:
+            args.append('--upgrade')
+        if target:
+            args += ['--target', os.path.abspath(target)]
+
+        try:
+            return subprocess.call(args) == 0
+        except subprocess.SubprocessError:
+            _LOGGER.exception('Unable to install packages %s',
+                              ', '.join(missing))
+            return False
+
+
 def check_package_exists(package: str, lib_dir: str) -> bool:
     """Check if a package is installed globally or in lib_dir.
 
     Returns True when the requirement is met.
     Returns False when the package is not installed or doesn't meet req.
     """
-    try:
-        req = pkg_resources.Requirement.parse(package)
-    except ValueError:
-        # This is a zip file
-        req = pkg_resources.Requirement.parse(urlparse(package).fragment)
+    return not missing_packages([package], lib_dir)
 
-    # Check packages from lib dir
-    if lib_dir is not None:
-        if any(dist in req for dist in
-               pkg_resources.find_distributions(lib_dir)):
-            return True
 
-    # Check packages from global + virtual environment
+def missing_packages(packages: Iterable[str],
+                     lib_dir: Optional[str]) -> List[str]:
+    """Return the packages not installed globally or in lib_dir.
+
+    The installed distributions are only scanned once for all packages.
+    """
+    # Importing pkg_resources scans sys.path, only pay for it when needed
+    import pkg_resources
+
+    def parse(package):
+        """Parse a requirement, which may be a zip file URL."""
+        try:
+            return pkg_resources.Requirement.parse(package)
+        except ValueError:
+            # This is a zip file
+            return pkg_resources.Requirement.parse(urlparse(package).fragment)
+
+    # Packages from lib dir and from global + virtual environment
+    dists = []
+    if lib_dir is not None:
+        dists.extend(pkg_resources.find_distributions(lib_dir))
     # pylint: disable=not-an-iterable
-    return any(dist in req for dist in pkg_resources.working_set)
+    dists.extend(pkg_resources.working_set)
+
+    dists_by_key = {}
+    for dist in dists:
+        dists_by_key.setdefault(dist.key, []).append(dist)
+
+    missing = []
+    for package in packages:
+        req = parse(package)
+        if not any(dist in req for dist in dists_by_key.get(req.key, ())):
+            missing.append(package)
+
+    return missing
+
+
+def environment_fingerprint(target: Optional[str]) -> str:
+    """Return a fingerprint of the directories packages are installed in.
+
+    Installing or removing a package changes the modification time of the
+    site-packages or target directory and with it the fingerprint.
+    """
+    paths = [sysconfig.get_path('purelib'), sysconfig.get_path('platlib')]
+    if site.ENABLE_USER_SITE:
+        paths.append(site.USER_SITE)
+    if target is not None:
+        paths.append(os.path.abspath(target))
+
+    fingerprint = hashlib.sha1(
+        '{} {}'.format(sys.executable, sys.version).encode('utf-8'))
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        fingerprint.update('{} {}'.format(path, mtime).encode('utf-8'))
+
+    return fingerprint.hexdigest()
+
+
+def load_requirements_cache(path: str, target: Optional[str]) -> Set[str]:
+    """Return the requirements known to be satisfied.
+
+    The cache is discarded if the installed packages may have changed
+    since it was written.
+    """
+    try:
+        with open(path, encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+    except FileNotFoundError:
+        return set()
+    except (OSError, ValueError) as err:
+        _LOGGER.warning('Unable to read requirements cache %s: %s',
+                        path, err)
+        return set()
+
+    if not isinstance(cache, dict) or \
+            cache.get('fingerprint') != environment_fingerprint(target):
+        return set()
+
+    return set(cache.get('requirements', []))
+
+
+def save_requirements_cache(path: str, target: Optional[str],
+                            requirements: Iterable[str]) -> None:
+    """Store the requirements known to be satisfied."""
+    try:
+        with open(path, 'w', encoding='utf-8') as cache_file:
+            json.dump({
+                'fingerprint': environment_fingerprint(target),
+                'requirements': sorted(requirements),
+            }, cache_file)
+    except OSError as err:
+        _LOGGER.warning('Unable to write requirements cache %s: %s',
+                        path, err)
@@ -1,10 +1,12 @@
 """YAML utility functions."""
 import logging
 import os
+import pickle
 import sys
+import threading
 import fnmatch
 from collections import OrderedDict
-from typing import Union, List, Dict
+from typing import Any, Union, List, Dict, Optional, Tuple  # NOQA
 
 import yaml
 try:
@@ -12,6 +14,7 @@ try:
 except ImportError:
     keyring = None
 
+from homeassistant.const import __version__
 from homeassistant.exceptions import HomeAssistantError
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,19 +22,24 @@ _SECRET_NAMESPACE = 'homeassistant'
 _SECRET_YAML = 'secrets.yaml'
 __SECRET_CACHE = {}  # type: Dict
 
+# Files, directories and environment variables read by the current load
+_DEPENDENCIES = threading.local()
 
-def _add_reference(obj, loader, node):
-    """Add file reference information to an object."""
-    class NodeListClass(list):
-        """Wrapper class to be able to add attributes on a list."""
 
-        pass
+class NodeListClass(list):
+    """Wrapper class to be able to add attributes on a list."""
+
+    pass
 
-    class NodeStrClass(str):
-        """Wrapper class to be able to add attributes on a string."""
 
-        pass
+class NodeStrClass(str):
+    """Wrapper class to be able to add attributes on a string."""
 
+    pass
+
+
+def _add_reference(obj, loader, node):
+    """Add file reference information to an object."""
     if isinstance(obj, list):
         obj = NodeListClass(obj)
     if isinstance(obj, str):
@@ -54,10 +62,38 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+if hasattr(yaml, 'CSafeLoader'):
+    # pylint: disable=no-member
+    class FastSafeLoader(yaml.CSafeLoader):
+        """Loader class backed by libyaml.
+
+        The start marks of the nodes provide the same file and line
+        references as SafeLineLoader.
+        """
+
+        def __init__(self, stream) -> None:
+            """Initialize the loader with the attributes of a Reader."""
+            super().__init__(stream)
+            self.name = getattr(stream, 'name', '<file>')
+            self.stream = stream
+else:
+    FastSafeLoader = None
+
+
 def load_yaml(fname: str) -> Union[List, Dict]:
     """Load a YAML file."""
+    _add_dependency('file', fname)
+
     try:
         with open(fname, encoding='utf-8') as conf_file:
+            if FastSafeLoader is not None:
+                try:
+                    return yaml.load(conf_file, Loader=FastSafeLoader) or \
+                        OrderedDict()
+                except yaml.YAMLError:
+                    # Parse again to report the error like SafeLineLoader
+                    conf_file.seek(0)
+
             # If configuration file is empty YAML returns None
             # We convert that to an empty dict
             return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
@@ -69,6 +105,93 @@ def load_yaml(fname: str) -> Union[List, Dict]:
         raise HomeAssistantError(exc)
 
 
+def load_yaml_cached(fname: str, cache_path: str) -> Union[List, Dict]:
+    """Load a YAML file, reusing the result of an earlier load.
+
+    The result is pickled to cache_path together with the state of every
+    file, directory and environment variable the load read. It is reused
+    as long as none of them changed.
+    """
+    cache = _read_cache(cache_path)
+
+    if cache is not None and cache['fname'] == fname and all(
+            _dependency_state(kind, name) == state
+            for (kind, name), state in cache['dependencies'].items()):
+        _LOGGER.debug('Loaded %s from %s', fname, cache_path)
+        return cache['data']
+
+    _DEPENDENCIES.current = dependencies = {}
+    try:
+        data = load_yaml(fname)
+    finally:
+        _DEPENDENCIES.current = None
+
+    # Secrets from the keyring can change without us noticing
+    if not any(kind == 'keyring' for kind, _ in dependencies):
+        _write_cache(cache_path, {
+            'version': __version__,
+            'fname': fname,
+            'dependencies': dependencies,
+            'data': data,
+        })
+
+    return data
+
+
+def _add_dependency(kind: str, name: str) -> None:
+    """Record that the current load read a file, dir or variable."""
+    dependencies = getattr(_DEPENDENCIES, 'current', None)
+
+    if dependencies is not None and (kind, name) not in dependencies:
+        dependencies[(kind, name)] = _dependency_state(kind, name)
+
+
+def _dependency_state(kind: str, name: str) -> Any:
+    """Return the current state of a file, dir or variable."""
+    if kind == 'env':
+        return os.environ.get(name)
+    elif kind == 'keyring':
+        return None
+
+    try:
+        stat = os.stat(name)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_cache(cache_path: str) -> Optional[Dict]:
+    """Read a pickled YAML load."""
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+    # Unpickling raises about any exception on corrupt files
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.warning('Unable to read config cache %s: %s', cache_path, err)
+        return None
+
+    if not isinstance(cache, dict) or cache.get('version') != __version__:
+        return None
+
+    return cache
+
+
+def _write_cache(cache_path: str, cache: Dict) -> None:
+    """Pickle a YAML load."""
+    temp_path = '{}.tmp'.format(cache_path)
+
+    try:
+        with open(temp_path, 'wb') as cache_file:
+            pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except (OSError, pickle.PicklingError) as err:
+        _LOGGER.warning('Unable to write config cache %s: %s',
+                        cache_path, err)
+
+
 def dump(_dict: dict) -> str:
     """Dump yaml to a string and remove null."""
     return yaml.safe_dump(_dict, default_flow_style=False) \
@@ -101,7 +224,10 @@ def _is_file_valid(name: str) -> bool:
 
 def _find_files(directory: str, pattern: str):
     """Recursively load files in a directory."""
+    _add_dependency('file', directory)
+
     for root, dirs, files in os.walk(directory, topdown=True):
+        _add_dependency('file', root)
         dirs[:] = [d for d in dirs if _is_file_valid(d)]
         for basename in files:
             if _is_file_valid(basename) and fnmatch.fnmatch(basename, pattern):
@@ -198,6 +324,8 @@ def _construct_seq(loader: SafeLineLoader, node: yaml.nodes.Node):
 def _env_var_yaml(loader: SafeLineLoader,
                   node: yaml.nodes.Node):
     """Load environment variables and embed it into the configuration YAML."""
+    _add_dependency('env', node.value)
+
     if node.value in os.environ:
         return os.environ[node.value]
     else:
@@ -208,6 +336,8 @@ def _env_var_yaml(loader: SafeLineLoader,
 def _load_secret_yaml(secret_path: str) -> Dict:
     """Load the secrets yaml from path."""
     secret_path = os.path.join(secret_path, _SECRET_YAML)
+    _add_dependency('file', secret_path)
+
     if secret_path in __SECRET_CACHE:
         return __SECRET_CACHE[secret_path]
 
@@ -249,6 +379,8 @@ def _secret_yaml(loader: SafeLineLoader,
             break  # Somehow we got past the .homeassistant config folder
 
     if keyring:
+        _add_dependency('keyring', node.value)
+
         # do some keyring stuff
         pwd = keyring.get_password(_SECRET_NAMESPACE, node.value)
         if pwd:
@@ -273,6 +405,10 @@ yaml.SafeLoader.add_constructor('!include_dir_named', _include_dir_named_yaml)
 yaml.SafeLoader.add_constructor('!include_dir_merge_named',
                                 _include_dir_merge_named_yaml)
 
+if FastSafeLoader is not None:
+    # Share the constructors, tags added to SafeLoader later apply to both
+    FastSafeLoader.yaml_constructors = yaml.SafeLoader.yaml_constructors
+
 
 # From: https://gist.github.com/miracle2k/3184458
 # pylint: disable=redefined-outer-name
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Generate an updated homeassistant/component_index.json."""
+import importlib
+import json
+import os
+import pkgutil
+import sys
+
+INDEX_FILE = os.path.join('homeassistant', 'component_index.json')
+
+
+def explore_module(package, explore_children):
+    """Explore the modules."""
+    module = importlib.import_module(package)
+
+    found = []
+
+    if not hasattr(module, '__path__'):
+        return found
+
+    for _, name, _ in pkgutil.iter_modules(module.__path__, package + '.'):
+        found.append(name)
+
+        if explore_children:
+            found.extend(explore_module(name, False))
+
+    return found
+
+
+def gather_components():
+    """Collect the dependencies, requirements and platforms."""
+    from homeassistant.const import __version__
+
+    components = {}
+    errors = []
+
+    for package in sorted(explore_module('homeassistant.components', True)):
+        try:
+            module = importlib.import_module(package)
+        except ImportError:
+            errors.append(package)
+            continue
+
+        comp_name = package[len('homeassistant.components.'):]
+        entry = components[comp_name] = {
+            'dependencies': list(getattr(module, 'DEPENDENCIES', [])),
+            'requirements': list(getattr(module, 'REQUIREMENTS', [])),
+        }
+
+        if '.' not in comp_name:
+            entry['platforms'] = []
+        else:
+            domain, platform = comp_name.split('.', 1)
+            components[domain]['platforms'].append(platform)
+
+    if errors:
+        print("******* ERROR")
+        print("Errors while importing: ", ', '.join(errors))
+        print("Make sure you import 3rd party libraries inside methods.")
+        return None
+
+    return json.dumps({
+        'version': __version__,
+        'components': components,
+    }, indent=1, sort_keys=True) + '\n'
+
+
+def write_file(data):
+    """Write the index to homeassistant/component_index.json."""
+    with open(INDEX_FILE, 'w+') as index_file:
+        index_file.write(data)
+
+
+def validate_file(data):
+    """Validate if homeassistant/component_index.json is up to date."""
+    with open(INDEX_FILE, 'r') as index_file:
+        return data == ''.join(index_file)
+
+
+def main():
+    """Main section of the script."""
+    if not os.path.isfile('requirements_all.txt'):
+        print('Run this from HA root dir')
+        return
+
+    data = gather_components()
+
+    if data is None:
+        sys.exit(1)
+
+    if sys.argv[-1] == 'validate':
+        if validate_file(data):
+            sys.exit(0)
+        print("******* ERROR")
+        print("{} is not up to date".format(INDEX_FILE))
+        print("Please run script/gen_component_index.py")
+        sys.exit(1)
+
+    write_file(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,19 @@
 """The tests for the automation component."""
+import asyncio
 import unittest
 from datetime import timedelta
 from unittest.mock import patch
 
 from homeassistant.core import callback
-from homeassistant.bootstrap import setup_component
+from homeassistant.bootstrap import async_setup_component, setup_component
 import homeassistant.components.automation as automation
 from homeassistant.const import ATTR_ENTITY_ID
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.util.dt as dt_util
+from homeassistant.util.async import run_callback_threadsafe
 
 from tests.common import get_test_home_assistant, assert_setup_component, \
-    fire_time_changed
+    fire_time_changed, mock_http_component_app
 
 
 # pylint: disable=invalid-name
@@ -572,3 +574,128 @@ class TestAutomation(unittest.TestCase):
         self.hass.bus.fire('test_event')
         self.hass.block_till_done()
         assert len(self.calls) == 2
+
+    def test_statistics_attributes(self):
+        """Test the trigger, condition and action statistics."""
+        assert setup_component(self.hass, automation.DOMAIN, {
+            automation.DOMAIN: {
+                'alias': 'hello',
+                'trigger': {
+                    'platform': 'event',
+                    'event_type': 'test_event',
+                },
+                'condition': {
+                    'condition': 'template',
+                    'value_template': '{{ trigger.event.data.run }}',
+                },
+                'action': {
+                    'service': 'test.automation',
+                }
+            }
+        })
+
+        for run in (False, True, False, True):
+            self.hass.bus.fire('test_event', {'run': run})
+            self.hass.block_till_done()
+
+        assert len(self.calls) == 2
+        attributes = self.hass.states.get('automation.hello').attributes
+        assert attributes[automation.ATTR_TRIGGER_COUNT] == 4
+        assert attributes[automation.ATTR_CONDITION_PASS_COUNT] == 2
+        assert attributes[automation.ATTR_LAST_ACTION_DURATION] >= 0
+        assert attributes[automation.ATTR_TOTAL_ACTION_DURATION] >= \
+            attributes[automation.ATTR_LAST_ACTION_DURATION]
+
+    def test_trigger_index_dispatches_by_entity(self):
+        """Test that the trigger index only runs listeners of the entity."""
+        index = automation.async_get_trigger_index(self.hass)
+        listeners = self.hass.bus.listeners.get('state_changed', 0)
+        calls = []
+
+        @callback
+        def record(entity_id, from_s, to_s):
+            """Record a state change."""
+            calls.append((entity_id, from_s and from_s.state, to_s.state))
+
+        removes = [
+            run_callback_threadsafe(
+                self.hass.loop, index.async_listen_state,
+                ['light.Kitchen', 'light.hall'], record).result(),
+            run_callback_threadsafe(
+                self.hass.loop, index.async_listen_state,
+                'switch.pump', record, 'off', 'on').result(),
+        ]
+        assert self.hass.bus.listeners['state_changed'] == listeners + 1
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.states.set('light.garden', 'on')
+        self.hass.states.set('switch.pump', 'on')
+        self.hass.states.set('switch.pump', 'off')
+        self.hass.states.set('switch.pump', 'on')
+        self.hass.block_till_done()
+
+        assert calls == [('light.kitchen', None, 'on'),
+                         ('switch.pump', 'off', 'on')]
+
+        for remove in removes:
+            run_callback_threadsafe(self.hass.loop, remove).result()
+        assert self.hass.bus.listeners.get('state_changed', 0) == listeners
+
+
+@asyncio.coroutine
+def test_statistics_view(hass, test_client):
+    """Test the automation statistics API."""
+    app = mock_http_component_app(hass)
+    hass.config.components.add('group')
+    hass.services.async_register('test', 'automation', lambda service: None)
+    yield from async_setup_component(hass, automation.DOMAIN, {
+        automation.DOMAIN: {
+            'alias': 'hello',
+            'trigger': {
+                'platform': 'event',
+                'event_type': 'test_event',
+            },
+            'action': {
+                'service': 'test.automation',
+            }
+        }
+    })
+
+    hass.bus.async_fire('test_event')
+    yield from hass.async_block_till_done()
+
+    hass.http.views['api:automation:statistics'].register(app.router)
+    client = yield from test_client(app)
+    resp = yield from client.get(automation.URL_API_AUTOMATION_STATISTICS)
+
+    assert resp.status == 200
+    result = yield from resp.json()
+    assert result['automation.hello'][automation.ATTR_TRIGGER_COUNT] == 1
+
+
+@asyncio.coroutine
+def test_trigger_index_subscribe_failure(hass):
+    """Test a failed MQTT subscription fails every listener waiting on it."""
+    index = automation.async_get_trigger_index(hass)
+    subscribed = asyncio.Event(loop=hass.loop)
+
+    @asyncio.coroutine
+    def mock_subscribe(hass, topic, msg_callback):
+        """Fail to subscribe once every listener joined."""
+        yield from subscribed.wait()
+        raise HomeAssistantError('Not connected')
+
+    with patch('homeassistant.components.mqtt.async_subscribe',
+               mock_subscribe):
+        first = hass.loop.create_task(
+            index.async_listen_topic('test-topic', lambda *args: None))
+        second = hass.loop.create_task(
+            index.async_listen_topic('test-topic', lambda *args: None))
+        yield from asyncio.sleep(0, loop=hass.loop)
+        subscribed.set()
+
+        results = yield from asyncio.gather(
+            first, second, loop=hass.loop, return_exceptions=True)
+
+    assert all(isinstance(result, HomeAssistantError) for result in results)
+    assert not index._topics
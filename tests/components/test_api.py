@@ -11,7 +11,10 @@ import requests
 
 from homeassistant import bootstrap, const
 import homeassistant.core as ha
+import homeassistant.remote as remote
+import homeassistant.components.api as api
 import homeassistant.components.http as http
+from homeassistant.components.http.const import KEY_COMPRESSION_LEVEL
 
 from tests.common import get_test_instance_port, get_test_home_assistant
 
@@ -73,6 +76,113 @@ class TestAPI(unittest.TestCase):
 
         self.assertEqual(hass.states.all(), remote_data)
 
+    def test_api_list_state_entities_etag(self):
+        """Test that the states list supports conditional requests."""
+        req = requests.get(_url(const.URL_API_STATES),
+                           headers=HA_HEADERS)
+        etag = req.headers['ETag']
+
+        headers = dict(HA_HEADERS)
+        headers['If-None-Match'] = etag
+        req = requests.get(_url(const.URL_API_STATES), headers=headers)
+
+        self.assertEqual(304, req.status_code)
+        self.assertEqual(etag, req.headers['ETag'])
+        self.assertEqual(b'', req.content)
+
+        hass.states.set('test.etag', 'changed')
+        hass.block_till_done()
+
+        req = requests.get(_url(const.URL_API_STATES), headers=headers)
+
+        self.assertEqual(200, req.status_code)
+        self.assertNotEqual(etag, req.headers['ETag'])
+        self.assertIn('test.etag',
+                      [state['entity_id'] for state in req.json()])
+
+        hass.states.remove('test.etag')
+
+    def test_api_batch_states_invalid(self):
+        """Test that the batch states endpoint validates its input."""
+        req = requests.post(_url(const.URL_API_BATCH_STATES),
+                            data=json.dumps({'entity_id': 'test.test'}),
+                            headers=HA_HEADERS)
+
+        self.assertEqual(400, req.status_code)
+
+    def test_api_batch_states_invalid_items(self):
+        """Test that invalid entity ids in a batch return null."""
+        req = requests.post(_url(const.URL_API_BATCH_STATES),
+                            data=json.dumps({'entity_id': [
+                                'test.test', 5, ['test.test'], None]}),
+                            headers=HA_HEADERS)
+
+        self.assertEqual(200, req.status_code)
+        data = req.json()
+        self.assertEqual('test.test', data[0]['entity_id'])
+        self.assertEqual([None, None, None], data[1:])
+
+    def test_api_batch_services_invalid_items(self):
+        """Test that invalid service calls in a batch are reported per item."""
+        test_value = []
+
+        @ha.callback
+        def listener(service_call):
+            """Record the service call."""
+            test_value.append(1)
+
+        hass.services.register('test_domain', 'batch_invalid', listener)
+
+        req = requests.post(_url(const.URL_API_BATCH_SERVICES),
+                            data=json.dumps([
+                                {'domain': 'test_domain',
+                                 'service': 'batch_invalid'},
+                                {'domain': ['test_domain'],
+                                 'service': 'batch_invalid'},
+                                {'domain': 'test_domain', 'service': 5},
+                                {'domain': 'test_domain',
+                                 'service': 'batch_invalid',
+                                 'service_data': [1]},
+                            ]),
+                            headers=HA_HEADERS)
+        hass.block_till_done()
+
+        self.assertEqual(200, req.status_code)
+        self.assertEqual([True, False, False, False],
+                         [item['success'] for item in req.json()])
+        self.assertEqual(1, len(test_value))
+
+    def test_api_batch_events_invalid_items(self):
+        """Test that invalid events in a batch are reported per item."""
+        test_value = []
+
+        def listener(event):
+            """Record the fired event."""
+            test_value.append(1)
+
+        hass.bus.listen('test_batch_invalid', listener)
+
+        req = requests.post(_url(const.URL_API_BATCH_EVENTS),
+                            data=json.dumps([
+                                {'event_type': 'test_batch_invalid'},
+                                {'event_data': {}},
+                                {'event_type': 'test_batch_invalid',
+                                 'event_data': [1]},
+                            ]),
+                            headers=HA_HEADERS)
+        hass.block_till_done()
+
+        self.assertEqual(200, req.status_code)
+        self.assertEqual([True, False, False],
+                         [item['success'] for item in req.json()])
+        self.assertEqual(1, len(test_value))
+
+        req = requests.post(_url(const.URL_API_BATCH_SERVICES),
+                            data=json.dumps({'domain': 'test'}),
+                            headers=HA_HEADERS)
+
+        self.assertEqual(400, req.status_code)
+
     def test_api_get_state(self):
         """Test if the debug interface allows us to get a state."""
         req = requests.get(
@@ -247,6 +357,20 @@ class TestAPI(unittest.TestCase):
                            headers=HA_HEADERS)
         self.assertEqual(hass.config.components, set(req.json()))
 
+    def test_api_get_startup_timings(self):
+        """Test the return of the startup timings."""
+        req = requests.get(_url(const.URL_API_STARTUP_TIMINGS),
+                           headers=HA_HEADERS)
+        timings = req.json()
+
+        self.assertIn('api', [timing['name'] for timing in timings
+                              if timing['phase'] == 'setup'])
+        self.assertEqual(
+            sorted(timings, key=lambda timing: timing['wall'], reverse=True),
+            timings)
+        self.assertEqual(timings, remote.get_startup_timings(
+            remote.API('127.0.0.1', API_PASSWORD, SERVER_PORT)))
+
     def test_api_get_error_log(self):
         """Test the return of the error log."""
         test_string = 'Test String°'
@@ -288,6 +412,26 @@ class TestAPI(unittest.TestCase):
 
             self.assertEqual(local, serv_domain["services"])
 
+    def test_api_get_services_etag(self):
+        """Test that the services list is rebuilt on registration."""
+        req = requests.get(_url(const.URL_API_SERVICES),
+                           headers=HA_HEADERS)
+
+        headers = dict(HA_HEADERS)
+        headers['If-None-Match'] = 'W/"other", {}'.format(req.headers['ETag'])
+        req = requests.get(_url(const.URL_API_SERVICES), headers=headers)
+
+        self.assertEqual(304, req.status_code)
+
+        hass.services.register('test_domain', 'etag_service', lambda _: _)
+        hass.block_till_done()
+
+        req = requests.get(_url(const.URL_API_SERVICES), headers=headers)
+
+        self.assertEqual(200, req.status_code)
+        domains = {serv['domain']: serv['services'] for serv in req.json()}
+        self.assertIn('etag_service', domains['test_domain'])
+
     def test_api_call_service_no_data(self):
         """Test if the API allows us to call a service."""
         test_value = []
@@ -465,6 +609,40 @@ class TestAPI(unittest.TestCase):
             data = self._stream_next_event(stream)
             self.assertEqual('test_event3', data['event_type'])
 
+    def test_stream_compressed(self):
+        """Test the stream with gzip compression enabled."""
+        hass.http.app[KEY_COMPRESSION_LEVEL] = 6
+        try:
+            with closing(requests.get(_url(const.URL_API_STREAM), timeout=3,
+                                      stream=True,
+                                      headers=HA_HEADERS)) as req:
+                self.assertEqual('gzip', req.headers['Content-Encoding'])
+                # Decompressed data arrives in blocks instead of bytes
+                lines = (line for line in req.iter_lines(1)
+                         if line and line != b'data: ping')
+
+                hass.bus.fire('test_event', {'hello': 'world'})
+                data = json.loads(next(lines).decode('utf-8')[6:])
+                self.assertEqual('test_event', data['event_type'])
+
+                hass.bus.fire('test_event', {'hello': 'again'})
+                data = json.loads(next(lines).decode('utf-8')[6:])
+                self.assertEqual({'hello': 'again'}, data['data'])
+        finally:
+            hass.http.app[KEY_COMPRESSION_LEVEL] = 0
+
+    def test_stream_gzip_refused(self):
+        """Test the stream is not compressed if the client refuses gzip."""
+        hass.http.app[KEY_COMPRESSION_LEVEL] = 6
+        headers = dict(HA_HEADERS)
+        headers['Accept-Encoding'] = 'gzip;q=0, identity'
+        try:
+            with closing(requests.get(_url(const.URL_API_STREAM), timeout=3,
+                                      stream=True, headers=headers)) as req:
+                self.assertNotIn('Content-Encoding', req.headers)
+        finally:
+            hass.http.app[KEY_COMPRESSION_LEVEL] = 0
+
     def _stream_next_event(self, stream):
         """Read the stream for next event while ignoring ping."""
         while True:
@@ -486,3 +664,15 @@ class TestAPI(unittest.TestCase):
     def _listen_count(self):
         """Return number of event listeners."""
         return sum(hass.bus.listeners.values())
+
+
+def test_accepts_encoding():
+    """Test parsing of the Accept-Encoding header."""
+    assert api.accepts_encoding('gzip, deflate', 'gzip')
+    assert api.accepts_encoding('deflate, GZIP;q=0.5', 'gzip')
+    assert api.accepts_encoding('*', 'gzip')
+    assert not api.accepts_encoding('', 'gzip')
+    assert not api.accepts_encoding('gzip;q=0', 'gzip')
+    assert not api.accepts_encoding('gzip; q=0.0, *', 'gzip')
+    assert not api.accepts_encoding('*;q=0', 'gzip')
+    assert not api.accepts_encoding('x-gzip', 'gzip')
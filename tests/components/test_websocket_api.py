@@ -19,6 +19,7 @@ def websocket_client(loop, hass, test_client):
     """Websocket client fixture connected to websocket server."""
     websocket_app = mock_http_component_app(hass)
     wapi.WebsocketAPIView().register(websocket_app.router)
+    hass.data[wapi.DATA_STATE_JOURNAL] = wapi.StateJournal(hass)
 
     client = loop.run_until_complete(test_client(websocket_app))
     ws = loop.run_until_complete(client.ws_connect(wapi.URL))
@@ -212,6 +213,148 @@ def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+@asyncio.coroutine
+def test_subscribe_states(hass, websocket_client):
+    """Test subscribe states command with filters and diffs."""
+    hass.states.async_set('light.kitchen', 'on', {'brightness': 100})
+    hass.states.async_set('sensor.temperature', '21')
+    hass.states.async_set('switch.heater', 'off')
+
+    init_count = sum(hass.bus.async_listeners().values())
+
+    websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+        'entity_id': 'sensor.temperature',
+        'domain': 'light',
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_RESULT
+    assert msg['success']
+    assert sorted(state['entity_id'] for state in msg['result']) == \
+        ['light.kitchen', 'sensor.temperature']
+
+    assert sum(hass.bus.async_listeners().values()) == init_count + 1
+
+    hass.states.async_set('switch.heater', 'on')
+    hass.states.async_set('light.kitchen', 'on',
+                          {'brightness': 50, 'color_temp': 300})
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_STATE_DIFF
+    assert msg['entity_id'] == 'light.kitchen'
+    assert 'state' not in msg
+    assert 'old_state' not in msg
+    assert msg['attributes'] == {'brightness': 50, 'color_temp': 300}
+
+    hass.states.async_set('light.kitchen', 'off', {'brightness': 50})
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['state'] == 'off'
+    assert 'attributes' not in msg
+    assert msg['attributes_removed'] == ['color_temp']
+
+    hass.states.async_set('light.hallway', 'on')
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['entity_id'] == 'light.hallway'
+    assert msg['state'] == 'on'
+    assert msg['attributes'] == {}
+
+    hass.states.async_remove('sensor.temperature')
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['entity_id'] == 'sensor.temperature'
+    assert msg['removed']
+
+    websocket_client.send_json({
+        'id': 6,
+        'type': wapi.TYPE_UNSUBSCRIBE_EVENTS,
+        'subscription': 5
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['id'] == 6
+    assert msg['success']
+
+    assert sum(hass.bus.async_listeners().values()) == init_count
+
+
+@asyncio.coroutine
+def test_subscribe_states_since(hass, websocket_client):
+    """Test resuming a states subscription from a known version."""
+    hass.states.async_set('light.kitchen', 'on')
+    hass.states.async_set('light.hallway', 'on')
+
+    websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+        'since': {'epoch': None, 'version': 0},
+    })
+
+    msg = yield from websocket_client.receive_json()
+    result = msg['result']
+    assert result['full']
+    assert sorted(state['entity_id'] for state in result['states']) == \
+        ['light.hallway', 'light.kitchen']
+
+    hass.states.async_set('light.kitchen', 'off')
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    assert msg['type'] == wapi.TYPE_STATE_DIFF
+    assert msg['version'] == result['version'] + 1
+    since = {'epoch': result['epoch'], 'version': msg['version']}
+
+    hass.states.async_set('light.hallway', 'off')
+    hass.states.async_remove('light.kitchen')
+    hass.states.async_set('light.porch', 'on')
+    yield from hass.async_block_till_done()
+
+    websocket_client.send_json({
+        'id': 6,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+        'since': since,
+    })
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+        while msg['id'] != 6:
+            msg = yield from websocket_client.receive_json()
+
+    result = msg['result']
+    assert not result['full']
+    assert result['version'] == since['version'] + 3
+    assert sorted(state['entity_id'] for state in result['states']) == \
+        ['light.hallway', 'light.porch']
+    assert result['removed'] == ['light.kitchen']
+
+    websocket_client.send_json({
+        'id': 7,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+        'since': {'epoch': 'unknown', 'version': 1},
+    })
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+        while msg['id'] != 7:
+            msg = yield from websocket_client.receive_json()
+
+    assert msg['result']['full']
+
+
 @asyncio.coroutine
 def test_get_states(hass, websocket_client):
     """Test get_states command."""
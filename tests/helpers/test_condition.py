@@ -146,3 +146,73 @@ class TestConditionHelper:
                    return_value=dt.now().replace(hour=21)):
             assert not condition.time(after=sixam, before=sixpm)
             assert condition.time(after=sixpm, before=sixam)
+
+    def test_cost(self):
+        """Test the relative cost of conditions."""
+        assert condition.cost({
+            'condition': 'state', 'entity_id': 'light.kitchen',
+            'state': 'on'}) == 1
+        assert condition.cost({
+            'condition': 'template', 'value_template': '{{ true }}'}) == 5
+        assert condition.cost({
+            'condition': 'numeric_state', 'entity_id': 'sensor.temperature',
+            'below': 10, 'value_template': '{{ state.state }}'}) == 7
+        assert condition.cost({'condition': 'or', 'conditions': [
+            {'condition': 'time', 'after': '06:00'},
+            {'condition': 'zone', 'entity_id': 'device_tracker.paulus',
+             'zone': 'zone.home'}]}) == 5
+
+    def test_and_condition_tests_cheap_conditions_first(self):
+        """Test that nested conditions are flattened and ordered."""
+        test = condition.from_config({
+            'condition': 'and',
+            'conditions': [
+                {
+                    'condition': 'template',
+                    'value_template':
+                    '{{ states.sensor.temperature.state == "100" }}',
+                }, {
+                    'condition': 'and',
+                    'conditions': [{
+                        'condition': 'state',
+                        'entity_id': 'sensor.temperature',
+                        'state': '100',
+                    }]
+                }
+            ]
+        })
+
+        with patch('homeassistant.helpers.condition.async_template',
+                   return_value=True) as mock_template:
+            self.hass.states.set('sensor.temperature', 120)
+            assert not test(self.hass)
+            assert mock_template.call_count == 0
+
+            self.hass.states.set('sensor.temperature', 100)
+            assert test(self.hass)
+            assert mock_template.call_count == 1
+
+    def test_or_condition_looks_up_states_once(self):
+        """Test that conditions share the state lookups of an evaluation."""
+        test = condition.from_config({
+            'condition': 'or',
+            'conditions': [
+                {
+                    'condition': 'state',
+                    'entity_id': 'sensor.temperature',
+                    'state': '100',
+                }, {
+                    'condition': 'numeric_state',
+                    'entity_id': 'sensor.temperature',
+                    'above': 110,
+                }
+            ]
+        })
+        self.hass.states.set('sensor.temperature', 120)
+
+        with patch.object(self.hass.states, 'get',
+                          wraps=self.hass.states.get) as mock_get:
+            assert test(self.hass)
+            assert mock_get.call_count == 1
+            assert test(self.hass)
+            assert mock_get.call_count == 2
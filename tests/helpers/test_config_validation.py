@@ -242,7 +242,7 @@ def test_time_period():
     schema = vol.Schema(cv.time_period)
 
     options = (
-        None, '', 'hello:world', '12:', '12:34:56:78',
+        None, '', 'hello:world', '12:', '12:34:56:78', '12.5:30',
         {}, {'wrong_key': -10}
     )
     for value in options:
@@ -259,6 +259,9 @@ def test_time_period():
     assert timedelta(seconds=180) == schema('180')
     assert timedelta(hours=23, minutes=59) == schema('23:59')
     assert -1 * timedelta(hours=1, minutes=15) == schema('-1:15')
+    assert timedelta(milliseconds=300) == schema('00:00:00.3')
+    assert timedelta(milliseconds=250) == schema('0.25')
+    assert timedelta(milliseconds=250) == schema({'seconds': 0.25})
 
 
 def test_service():
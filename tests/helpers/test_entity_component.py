@@ -3,16 +3,19 @@
 import asyncio
 from collections import OrderedDict
 import logging
+import threading
+import time
 import unittest
 from unittest.mock import patch, Mock
 from datetime import timedelta
 
 import homeassistant.core as ha
 import homeassistant.loader as loader
+from homeassistant.bootstrap import DATA_DEFERRED_SETUP
 from homeassistant.components import group
 from homeassistant.helpers.entity import Entity, generate_entity_id
 from homeassistant.helpers.entity_component import (
-    EntityComponent, DEFAULT_SCAN_INTERVAL)
+    EntityComponent, EntityPlatform, DEFAULT_SCAN_INTERVAL)
 
 from homeassistant.helpers import discovery
 import homeassistant.util.dt as dt_util
@@ -404,3 +407,216 @@ class TestHelpersEntityComponent(unittest.TestCase):
             return entity
 
         component.add_entities(create_entity(i) for i in range(2))
+
+
+@asyncio.coroutine
+def test_update_before_add_async_entities_in_parallel(hass):
+    """Test async entities are updated concurrently before being added."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+    calls = []
+
+    def mock_entity(name):
+        """Return an entity recording its update."""
+        entity = EntityTest(name=name)
+
+        @asyncio.coroutine
+        def async_update():
+            """Record start and end of the update."""
+            calls.append(('start', name))
+            yield from asyncio.sleep(0.01, loop=hass.loop)
+            calls.append(('end', name))
+
+        entity.async_update = async_update
+        return entity
+
+    yield from component.async_add_entities(
+        [mock_entity('one'), mock_entity('two')], True)
+
+    assert calls.index(('start', 'two')) < calls.index(('end', 'one'))
+    assert sorted(hass.states.async_entity_ids()) == \
+        ['test_domain.one', 'test_domain.two']
+
+
+@asyncio.coroutine
+def test_update_before_add_sync_entities_in_parallel(hass):
+    """Test platforms can update sync entities in parallel."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+    platform = EntityPlatform(component, 'platform', DEFAULT_SCAN_INTERVAL,
+                              None, parallel_updates=2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    entities = [EntityTest(name='one'), EntityTest(name='two')]
+    for entity in entities:
+        entity.update = barrier.wait
+
+    yield from hass.loop.run_in_executor(
+        None, platform.add_entities, entities, True)
+
+    assert not barrier.broken
+    assert len(hass.states.async_entity_ids()) == 2
+
+
+@asyncio.coroutine
+def test_update_before_add_error(hass):
+    """Test an entity failing its first update is not added."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    broken = EntityTest(name='broken')
+    broken.update = Mock(side_effect=Exception('Broken'))
+    working = EntityTest(name='working')
+    working.update = Mock()
+
+    with patch.object(_LOGGER, 'error') as mock_error:
+        yield from component.async_add_entities([broken, working], True)
+
+    assert mock_error.called
+    assert working.update.called
+    assert hass.states.async_entity_ids() == ['test_domain.working']
+
+
+@asyncio.coroutine
+def test_update_before_add_sync_entities_bounded(hass):
+    """Test sync entities are updated one at a time unless opted in."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def update():
+        """Record how many updates run at the same time."""
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+
+    for parallel_updates in (1, 2):
+        platform = EntityPlatform(
+            component, 'platform_{}'.format(parallel_updates),
+            DEFAULT_SCAN_INTERVAL, None, parallel_updates)
+        entities = [EntityTest(name='{}_{}'.format(parallel_updates, idx))
+                    for idx in range(4)]
+        for entity in entities:
+            entity.update = update
+
+        del peak[:]
+        yield from hass.loop.run_in_executor(
+            None, platform.add_entities, entities, True)
+
+        assert max(peak) == parallel_updates
+
+    assert len(hass.states.async_entity_ids()) == 8
+
+
+@asyncio.coroutine
+def test_update_before_add_sync_error(hass):
+    """Test a failing sync update only drops the failing entity."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    entities = [EntityTest(name='one'), EntityTest(name='broken'),
+                EntityTest(name='two')]
+    entities[1].update = Mock(side_effect=Exception('Broken'))
+
+    with patch.object(_LOGGER, 'exception') as mock_exception:
+        yield from hass.loop.run_in_executor(
+            None, component.add_entities, entities, True)
+
+    assert mock_exception.called
+    assert sorted(hass.states.async_entity_ids()) == \
+        ['test_domain.one', 'test_domain.two']
+
+
+@asyncio.coroutine
+def test_platform_setup_timeout(hass):
+    """Test a platform not finishing setup in time does not block others."""
+    @asyncio.coroutine
+    def async_setup_platform(hass, config, add_devices, discovery_info=None):
+        """Setup that never finishes in time."""
+        yield from asyncio.sleep(1, loop=hass.loop)
+
+    slow = MockPlatform()
+    slow.async_setup_platform = async_setup_platform
+    slow.SETUP_TIMEOUT = 0.01
+    loader.set_component('test_domain.slow', slow)
+    loader.set_component('test_domain.fast', MockPlatform())
+
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    with patch.object(_LOGGER, 'error') as mock_error:
+        yield from component.async_setup(OrderedDict([
+            (DOMAIN, {'platform': 'slow'}),
+            ('{} 2'.format(DOMAIN), {'platform': 'fast'}),
+        ]))
+
+    assert mock_error.called
+    assert 'test_domain.fast' in hass.config.components
+    assert 'test_domain.slow' not in hass.config.components
+
+
+@asyncio.coroutine
+def test_sync_platform_setups_bounded(hass):
+    """Test the number of sync platform setups running is limited."""
+    running = []
+    concurrency = []
+
+    def setup_platform(hass, config, add_devices, discovery_info=None):
+        """Record how many setups run at the same time."""
+        running.append(None)
+        concurrency.append(len(running))
+        threading.Event().wait(0.01)
+        running.pop()
+
+    for name in ('one', 'two', 'three'):
+        loader.set_component('test_domain.{}'.format(name),
+                             MockPlatform(setup_platform))
+
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    with patch('homeassistant.helpers.entity_component.MAX_PLATFORM_SETUPS',
+               1):
+        yield from component.async_setup(OrderedDict([
+            (DOMAIN, {'platform': 'one'}),
+            ('{} 2'.format(DOMAIN), {'platform': 'two'}),
+            ('{} 3'.format(DOMAIN), {'platform': 'three'}),
+        ]))
+
+    assert concurrency == [1, 1, 1]
+
+
+@asyncio.coroutine
+def test_slow_platform_setup_deferred(hass):
+    """Test slow platforms finish in the background during deferred startup."""
+    release = asyncio.Event(loop=hass.loop)
+
+    @asyncio.coroutine
+    def async_setup_platform(hass, config, async_add_devices,
+                             discovery_info=None):
+        """Add an entity once released."""
+        yield from release.wait()
+        yield from async_add_devices([EntityTest(name='slow')])
+
+    slow = MockPlatform()
+    slow.async_setup_platform = async_setup_platform
+    loader.set_component('test_domain.slow', slow)
+    loader.set_component('test_domain.fast', MockPlatform())
+
+    hass.data[DATA_DEFERRED_SETUP] = deferred = set()
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    with patch('homeassistant.bootstrap.DEFERRED_SETUP_WAIT', 0.01):
+        yield from component.async_setup(OrderedDict([
+            (DOMAIN, {'platform': 'slow'}),
+            ('{} 2'.format(DOMAIN), {'platform': 'fast'}),
+        ]))
+
+    assert 'test_domain.fast' in hass.config.components
+    assert 'test_domain.slow' not in hass.config.components
+    assert len(deferred) == 1
+
+    release.set()
+    yield from asyncio.wait(list(deferred), loop=hass.loop)
+
+    assert 'test_domain.slow' in hass.config.components
+    assert hass.states.get('test_domain.slow') is not None
+    assert not deferred
@@ -10,6 +10,10 @@ from homeassistant.bootstrap import setup_component
 import homeassistant.core as ha
 from homeassistant.const import MATCH_ALL
 from homeassistant.helpers.event import (
+    TimePattern,
+    async_track_point_in_utc_time,
+    async_track_utc_time_change,
+    async_track_time_interval,
     track_point_in_utc_time,
     track_point_in_time,
     track_utc_time_change,
@@ -17,6 +21,7 @@ from homeassistant.helpers.event import (
     track_state_change,
     track_time_interval,
     track_template,
+    track_template_entities,
     track_sunrise,
     track_sunset,
 )
@@ -190,6 +195,70 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(5, len(wildcard_runs))
         self.assertEqual(6, len(wildercard_runs))
 
+    def test_track_template_entities(self):
+        """Test tracking the entities a template read in its last render."""
+        runs = []
+        tpl = Template(
+            "{% if is_state('input_boolean.use_sensors', 'on') %}"
+            "{{ states.sensor | map(attribute='state') | join }}"
+            "{% else %}{{ states('switch.test') }}{% endif %}", self.hass)
+
+        self.hass.states.set('input_boolean.use_sensors', 'off')
+        self.hass.states.set('switch.test', 'off')
+        self.hass.block_till_done()
+
+        track_template_entities(
+            self.hass, (tpl,),
+            lambda entity_id, old_state, new_state: runs.append(entity_id))
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.states.set('sensor.temperature', 20)
+        self.hass.states.set('switch.test', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['switch.test'], runs)
+
+        # The template now iterates the sensor domain instead
+        self.hass.states.set('input_boolean.use_sensors', 'on')
+        self.hass.states.set('switch.test', 'off')
+        self.hass.states.set('sensor.humidity', 50)
+        self.hass.block_till_done()
+        self.assertEqual(['switch.test', 'input_boolean.use_sensors',
+                          'sensor.humidity'], runs)
+        self.assertEqual('5020', tpl.render())
+
+    def test_track_template_entities_all_states_or_failure(self):
+        """Test every change is tracked while needed."""
+        runs = []
+        tpl = Template(
+            "{% if is_state('input_boolean.all', 'on') %}"
+            "{{ states | list | count }}"
+            "{% else %}{{ states.switch.test.state.upper() }}{% endif %}",
+            self.hass)
+
+        self.hass.states.set('input_boolean.all', 'on')
+        self.hass.block_till_done()
+
+        track_template_entities(
+            self.hass, (tpl,),
+            lambda entity_id, old_state, new_state: runs.append(entity_id))
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['light.kitchen'], runs)
+
+        # The render fails as switch.test does not exist
+        self.hass.states.set('input_boolean.all', 'off')
+        self.hass.states.set('light.kitchen', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(['light.kitchen', 'input_boolean.all',
+                          'light.kitchen'], runs)
+
+        self.hass.states.set('switch.test', 'on')
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['light.kitchen', 'input_boolean.all',
+                          'light.kitchen', 'switch.test'], runs)
+
     def test_track_template(self):
         """Test tracking template."""
         specific_runs = []
@@ -522,3 +591,136 @@ class TestEventHelpers(unittest.TestCase):
         self._send_time_changed(datetime(2014, 5, 2, 0, 0, 0))
         self.hass.block_till_done()
         self.assertEqual(0, len(specific_runs))
+
+
+@asyncio.coroutine
+def test_point_in_time_jitter(hass):
+    """Test timers fire at their deadline instead of the next second."""
+    hass.scheduler.async_start()
+    done = asyncio.Event(loop=hass.loop)
+    lateness = []
+    start = dt_util.utcnow()
+    deadlines = [start + timedelta(milliseconds=10 * index)
+                 for index in range(1, 21)]
+
+    def record(deadline):
+        """Return a listener that records how late it was called."""
+        @ha.callback
+        def listener(now):
+            """Record the delay between the deadline and the call."""
+            lateness.append((dt_util.utcnow() - deadline).total_seconds())
+            if len(lateness) == len(deadlines):
+                done.set()
+        return listener
+
+    for deadline in deadlines:
+        async_track_point_in_utc_time(hass, record(deadline), deadline)
+
+    try:
+        yield from asyncio.wait_for(done.wait(), 2, loop=hass.loop)
+    finally:
+        hass.scheduler.async_stop()
+
+    # The 1Hz time_changed event would make them up to a second late
+    assert min(lateness) >= 0
+    assert max(lateness) < 0.1
+
+
+@asyncio.coroutine
+def test_time_interval_does_not_drift(hass):
+    """Test sub-second intervals fire counted from their deadlines."""
+    hass.scheduler.async_start()
+    done = asyncio.Event(loop=hass.loop)
+    runs = []
+
+    @ha.callback
+    def action(now):
+        """Record the time of the run."""
+        runs.append(dt_util.utcnow())
+        if len(runs) == 5:
+            done.set()
+
+    start = dt_util.utcnow()
+    unsub = async_track_time_interval(
+        hass, action, timedelta(milliseconds=50))
+
+    try:
+        yield from asyncio.wait_for(done.wait(), 2, loop=hass.loop)
+    finally:
+        unsub()
+        hass.scheduler.async_stop()
+
+    for index, run in enumerate(runs, 1):
+        lateness = (run - start).total_seconds() - index * 0.05
+        assert 0 <= lateness < 0.1
+
+
+def test_time_pattern_next_fire():
+    """Test computing the next time matching a pattern."""
+    start = datetime(2014, 5, 24, 12, 0, 15)
+
+    assert TimePattern(second=[0, 30]).next_fire(start) == \
+        datetime(2014, 5, 24, 12, 0, 30)
+    assert TimePattern(second=15).next_fire(start) == start
+    assert TimePattern(minute='/5', second=0).next_fire(start) == \
+        datetime(2014, 5, 24, 12, 5, 0)
+    assert TimePattern(hour=3, minute=0, second=0).next_fire(start) == \
+        datetime(2014, 5, 25, 3, 0, 0)
+    assert TimePattern(day=31, hour=0, minute=0, second=0).next_fire(
+        start) == datetime(2014, 5, 31, 0, 0, 0)
+    assert TimePattern(month=2, day=29, hour=0, minute=0,
+                       second=0).next_fire(start) == datetime(2016, 2, 29)
+    assert TimePattern(year='/2', second=0).next_fire(start) == \
+        datetime(2014, 5, 24, 12, 1, 0)
+    assert TimePattern(month=2, day=30).next_fire(start) is None
+    assert TimePattern(minute='/two').next_fire(start) is None
+
+
+@asyncio.coroutine
+def test_time_patterns_share_the_scheduler(hass):
+    """Test idle time patterns wait in the scheduler, not on every tick."""
+    runs = []
+    start = datetime(2014, 5, 24, 12, 0, 0, tzinfo=dt_util.UTC)
+
+    for minute in range(10):
+        async_track_utc_time_change(
+            hass, lambda now: runs.append(now), minute=minute, second=0)
+
+    assert hass.scheduler.jobs == 10
+    assert hass.bus.async_listeners()[ha.EVENT_TIME_CHANGED] == 1
+
+    for seconds in range(0, 600, 30):
+        hass.bus.async_fire(ha.EVENT_TIME_CHANGED, {
+            ha.ATTR_NOW: start + timedelta(seconds=seconds)})
+        yield from hass.async_block_till_done()
+
+    assert [now.minute for now in runs] == list(range(10))
+    assert all(now.second == 0 for now in runs)
+    assert hass.scheduler.jobs == 10
+
+
+@asyncio.coroutine
+def test_time_pattern_fires_at_deadline(hass):
+    """Test a running scheduler fires a time pattern at its deadline."""
+    hass.scheduler.async_start()
+    done = asyncio.Event(loop=hass.loop)
+    runs = []
+
+    @ha.callback
+    def action(now):
+        """Record the run."""
+        runs.append(dt_util.utcnow())
+        if len(runs) == 2:
+            done.set()
+
+    unsub = async_track_utc_time_change(hass, action, second='/1')
+
+    try:
+        yield from asyncio.wait_for(done.wait(), 2, loop=hass.loop)
+    finally:
+        unsub()
+        hass.scheduler.async_stop()
+
+    # The first run may be in the second the listener was added
+    assert runs[1].microsecond < 100000
+    assert hass.scheduler.jobs == 0
@@ -0,0 +1,67 @@
+"""Test Home Assistant JSON helpers."""
+from datetime import datetime
+import json
+import unittest
+from unittest.mock import patch
+
+import homeassistant.core as ha
+import homeassistant.helpers.json as json_helper
+from homeassistant import remote
+import homeassistant.util.dt as dt_util
+
+
+class TestJSONHelper(unittest.TestCase):
+    """Test the JSON helper."""
+
+    def setUp(self):
+        """Create a state and an event to serialize."""
+        self.state = ha.State('light.kitchen', 'on', {
+            'brightness': 100,
+            'features': {'dim', },
+            'since': datetime(2017, 2, 1, 12, tzinfo=dt_util.UTC),
+        })
+        self.event = ha.Event(ha.EVENT_STATE_CHANGED, {
+            'entity_id': 'light.kitchen',
+            'old_state': None,
+            'new_state': self.state,
+        })
+
+    def assert_same_as_encoder(self, dumps, obj):
+        """Assert that dumps gives the same result as remote.JSONEncoder."""
+        self.assertEqual(
+            json.loads(json.dumps(obj, cls=remote.JSONEncoder)),
+            json.loads(dumps(obj)))
+
+    def test_serializers_match_json_encoder(self):
+        """Test that every serializer matches remote.JSONEncoder."""
+        for name, dumps in json_helper.SERIALIZERS.items():
+            with self.subTest(serializer=name):
+                self.assert_same_as_encoder(dumps, [self.state])
+                self.assert_same_as_encoder(dumps, self.event)
+                self.assert_same_as_encoder(dumps, {'when': dt_util.utcnow()})
+                self.assertEqual(
+                    [self.state.as_dict()['entity_id']],
+                    [item['entity_id'] for item in json.loads(dumps(
+                        state for state in [self.state]))])
+
+    def test_dumps_sort_keys(self):
+        """Test sort_keys is passed on."""
+        self.assertEqual('{"a": 1, "b": 2}',
+                         json_helper.json_dumps({'b': 2, 'a': 1}, True))
+
+    def test_default_raises_on_unknown(self):
+        """Test that unknown objects raise TypeError."""
+        with self.assertRaises(TypeError):
+            json_helper.default(1)
+
+        with self.assertRaises(TypeError):
+            json_helper.dumps({'obj': object()})
+
+    def test_set_serializer(self):
+        """Test selecting a serializer."""
+        with patch.object(json_helper, '_dumps'):
+            json_helper.set_serializer('json')
+            self.assertEqual('{"a": [1]}', json_helper.dumps({'a': {1}}))
+
+            with self.assertRaises(ValueError):
+                json_helper.set_serializer('does_not_exist')
@@ -1,5 +1,6 @@
 """The tests for the Script component."""
 # pylint: disable=protected-access
+import asyncio
 from datetime import timedelta
 from unittest import mock
 import unittest
@@ -503,3 +504,26 @@ class TestScriptHelper(unittest.TestCase):
             self.hass.block_till_done()
 
         assert script_obj.last_triggered == time
+
+
+@asyncio.coroutine
+def test_sub_second_delay(hass):
+    """Test a sub-second delay continues at its deadline."""
+    hass.scheduler.async_start()
+    done = asyncio.Event(loop=hass.loop)
+    hass.bus.async_listen('test_event', lambda event: done.set())
+
+    script_obj = script.Script(hass, cv.SCRIPT_SCHEMA([
+        {'delay': '00:00:00.05'},
+        {'event': 'test_event'}]))
+
+    start = dt_util.utcnow()
+
+    try:
+        yield from script_obj.async_run()
+        assert script_obj.is_running
+        yield from asyncio.wait_for(done.wait(), 1, loop=hass.loop)
+    finally:
+        hass.scheduler.async_stop()
+
+    assert 0.05 <= (dt_util.utcnow() - start).total_seconds() < 0.5
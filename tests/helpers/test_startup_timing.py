@@ -0,0 +1,50 @@
+"""Test the startup timing helpers."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.helpers import startup_timing
+
+
+@asyncio.coroutine
+def test_report_sorted_slowest_first(hass):
+    """Test that the report lists the slowest steps first."""
+    startup_timing.async_record(hass, startup_timing.PHASE_SETUP, 'fast', 0.1)
+    startup_timing.async_record(
+        hass, startup_timing.PHASE_PLATFORM, 'sensor.slow', 2.0, 1.5)
+
+    assert startup_timing.async_get_report(hass) == [
+        {'phase': 'platform', 'name': 'sensor.slow', 'wall': 2.0,
+         'executor': 1.5},
+        {'phase': 'setup', 'name': 'fast', 'wall': 0.1, 'executor': 0.0},
+    ]
+
+    with patch.object(startup_timing._LOGGER, 'info') as mock_info:
+        startup_timing.async_log_report(hass, count=1)
+
+    assert 'platform 2.00s, setup 0.10s' in mock_info.call_args[0]
+    assert 'platform sensor.slow 2.00s' in mock_info.call_args[0]
+
+
+@asyncio.coroutine
+def test_run_timed_job(hass):
+    """Test that executor jobs are timed and their result returned."""
+    result = yield from startup_timing.async_run_timed_job(
+        hass, startup_timing.PHASE_REQUIREMENTS, 'comp', lambda x: x * 2, 21)
+
+    assert result == 42
+    timing, = startup_timing.async_get_report(hass)
+    assert timing['phase'] == startup_timing.PHASE_REQUIREMENTS
+    assert timing['name'] == 'comp'
+    assert timing['wall'] >= timing['executor'] >= 0
+
+
+@asyncio.coroutine
+def test_not_recorded_after_startup(hass):
+    """Test that setups at runtime are not added to the report."""
+    startup_timing.async_record(hass, startup_timing.PHASE_SETUP, 'comp', 0.1)
+    startup_timing.async_finish(hass)
+    startup_timing.async_record(
+        hass, startup_timing.PHASE_IMPORT, 'notify.later', 0.1)
+
+    assert [timing['name'] for timing
+            in startup_timing.async_get_report(hass)] == ['comp']
@@ -276,6 +276,49 @@ class TestHelpersTemplate(unittest.TestCase):
             '',
             tpl.render_with_possible_json_value('{"hello": "world"}', ''))
 
+    def test_render_with_possible_json_value_simple_templates(self):
+        """Test that simple value templates render like jinja does."""
+        values = ['21.456', 'on', '{"hello": "world"}', '[1, 2]',
+                  '{"sensor": {"temperature": "21.456", "items": [3, 4]}}',
+                  '{"sensor": null}', '{"a-b": [{"c": 1.25}]}']
+        sources = [
+            '{{ value }}',
+            '{{ value | float }}',
+            '{{ value|int }}',
+            '{{ value | float | round(1) }}',
+            '{{ value_json }}',
+            '{{ value_json.hello }}',
+            '{{ value_json[1] }}',
+            '{{ value_json[-3] }}',
+            '{{ value_json.sensor.temperature | float | round }}',
+            '{{ value_json.sensor["items"][0] | float }}',
+            "  {{ value_json['a-b'][0].c | round(1) }}  ",
+        ]
+
+        for source in sources:
+            tpl = template.Template(source, self.hass)
+            for value in values:
+                self.assertEqual(
+                    tpl._async_render_json_value(value, '-'),
+                    tpl.render_with_possible_json_value(value, '-'),
+                    (source, value))
+
+    def test_render_with_possible_json_value_skips_jinja(self):
+        """Test that simple value templates are not rendered by jinja."""
+        self.assertIsNone(
+            template._value_accessor('{{ value_json.sensor.items }}'))
+        self.assertIsNone(template._value_accessor('{{ value_json.x + 1 }}'))
+
+        tpl = template.Template('{{ value_json.hello | float }}', self.hass)
+
+        with patch.object(tpl, '_async_render_json_value') as mock_render:
+            self.assertEqual(
+                '1.5', tpl.render_with_possible_json_value('{"hello": 1.5}'))
+            self.assertEqual(0, mock_render.call_count)
+
+            tpl.render_with_possible_json_value('{"bye": 1.5}')
+            self.assertEqual(1, mock_render.call_count)
+
     def test_raise_exception_on_error(self):
         """Test raising an exception on error."""
         with self.assertRaises(TemplateError):
@@ -713,3 +756,142 @@ is_state_attr('device_tracker.phone_2', 'battery', 40)
                 " > (states('input_slider.luftfeuchtigkeit') | int +1.5)"
                 " %}true{% endif %}"
             )))
+
+    def test_render_cached_until_read_state_changes(self):
+        """Test that a render is reused until a state it read changes."""
+        self.hass.states.set('sensor.temperature', 20)
+        self.hass.states.set('sensor.humidity', 50)
+        tpl = template.Template(
+            '{{ states.sensor.temperature.state }}', self.hass)
+
+        self.assertEqual('20', tpl.render())
+
+        with patch.object(tpl, '_async_render',
+                          wraps=tpl._async_render) as mock_render:
+            self.assertEqual('20', tpl.render())
+            self.hass.states.set('sensor.humidity', 60)
+            self.assertEqual('20', tpl.render())
+            self.assertEqual(0, mock_render.call_count)
+
+            self.hass.states.set('sensor.temperature', 21)
+            self.assertEqual('21', tpl.render())
+            self.assertEqual(1, mock_render.call_count)
+
+    def test_render_cached_until_domain_changes(self):
+        """Test that iterating a domain invalidates on added states."""
+        self.hass.states.set('sensor.temperature', 20)
+        self.hass.states.set('light.kitchen', 'on')
+        tpl = template.Template(
+            '{{ states.sensor | map(attribute="state") | join(",") }}',
+            self.hass)
+
+        self.assertEqual('20', tpl.render())
+        self.hass.states.set('light.kitchen', 'off')
+        self.assertEqual('20', tpl.render())
+        self.hass.states.set('sensor.humidity', 50)
+        self.assertEqual('50,20', tpl.render())
+
+    def test_render_not_cached_with_time(self):
+        """Test that templates using the time are always rendered."""
+        tpl = template.Template('{{ now().year }}', self.hass)
+
+        self.assertEqual(str(dt_util.now().year), tpl.render())
+
+        with patch.object(tpl, '_async_render',
+                          wraps=tpl._async_render) as mock_render:
+            tpl.render()
+            self.assertEqual(1, mock_render.call_count)
+
+    def test_render_random_not_cached(self):
+        """Test the random filter renders and is not cached."""
+        tpl = template.Template('{{ [1, 2, 3] | random }}', self.hass)
+
+        self.assertIn(tpl.render(), ('1', '2', '3'))
+
+        with patch.object(tpl, '_async_render',
+                          wraps=tpl._async_render) as mock_render:
+            tpl.render()
+            self.assertEqual(1, mock_render.call_count)
+
+    def test_affected_by(self):
+        """Test which entities can change the result of the last render."""
+        self.hass.states.set('sensor.temperature', 20)
+        tpl = template.Template(
+            '{{ states.sensor.temperature.state }}'
+            '{{ states.light | list | count }}'
+            '{{ is_state("switch.missing", "on") }}', self.hass)
+
+        self.assertTrue(tpl.async_affected_by('sensor.humidity'))
+
+        tpl.render()
+        self.assertTrue(tpl.async_affected_by('sensor.temperature'))
+        self.assertTrue(tpl.async_affected_by('light.kitchen'))
+        self.assertTrue(tpl.async_affected_by('switch.missing'))
+        self.assertFalse(tpl.async_affected_by('sensor.humidity'))
+        self.assertFalse(tpl.async_affected_by('switch.other'))
+
+    def test_affected_by_all_states_or_failure(self):
+        """Test that iterating all states or failing tracks every entity."""
+        tpl = template.Template('{{ states | list | count }}', self.hass)
+        tpl.render()
+        self.assertTrue(tpl.async_affected_by('sensor.humidity'))
+
+        tpl = template.Template(
+            '{{ states.sensor.temperature.state | is_defined }}', self.hass)
+        with self.assertRaises(TemplateError):
+            tpl.render()
+        self.assertTrue(tpl.async_affected_by('sensor.humidity'))
+        with self.assertRaises(TemplateError):
+            tpl.render()
+
+    def test_identical_templates_share_compiled_code(self):
+        """Test that templates with the same source compile once."""
+        source = '{{ value_json.temperature + 1 }}'
+        first = template.Template(source, self.hass)
+        second = template.Template(source, self.hass)
+
+        first.ensure_valid()
+        second.ensure_valid()
+        self.assertIs(first._compiled_code, second._compiled_code)
+
+        self.assertEqual('22', first.render_with_possible_json_value(
+            '{"temperature": 21}'))
+        self.assertEqual('23', second.render_with_possible_json_value(
+            '{"temperature": 22}'))
+        self.assertIs(first._compiled.globals, second._compiled.globals)
+
+    def test_templates_of_other_hass_have_own_globals(self):
+        """Test that the shared globals are bound to their hass."""
+        other_hass = get_test_home_assistant()
+
+        try:
+            self.hass.states.set('sensor.temperature', 20)
+            other_hass.states.set('sensor.temperature', 30)
+            source = '{{ states.sensor.temperature.state }}'
+
+            self.assertEqual(
+                '20', template.Template(source, self.hass).render())
+            self.assertEqual(
+                '30', template.Template(source, other_hass).render())
+        finally:
+            other_hass.stop()
+
+    def test_render_cached_with_unused_variables(self):
+        """Test that variables the template does not read keep the cache."""
+        self.hass.states.set('sensor.temperature', 20)
+        tpl = template.Template(
+            '{{ states.sensor.temperature.state }}', self.hass)
+        trigger_tpl = template.Template('{{ trigger.to_state }}', self.hass)
+
+        self.assertEqual('20', tpl.render({'trigger': {'to_state': 'on'}}))
+        self.assertEqual('on', trigger_tpl.render(
+            {'trigger': {'to_state': 'on'}}))
+
+        with patch.object(tpl, '_async_render',
+                          wraps=tpl._async_render) as mock_render:
+            self.assertEqual(
+                '20', tpl.render({'trigger': {'to_state': 'off'}}))
+            self.assertEqual(0, mock_render.call_count)
+
+        self.assertEqual('off', trigger_tpl.render(
+            {'trigger': {'to_state': 'off'}}))
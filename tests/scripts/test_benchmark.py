@@ -0,0 +1,24 @@
+"""Test benchmark script."""
+from unittest.mock import patch
+
+from homeassistant.scripts import benchmark
+
+
+def test_registered_benchmarks():
+    """Test that benchmarks are registered under their function name."""
+    assert 'event_stream_compression' in benchmark.BENCHMARKS
+    assert 'json_serialization' in benchmark.BENCHMARKS
+    assert 'remote_api_requests' in benchmark.BENCHMARKS
+
+
+@patch('builtins.print')
+def test_run_event_stream_compression(mock_print):
+    """Test running the event stream compression benchmark."""
+    assert benchmark.run(['event_stream_compression', '-n', '10']) == 0
+
+    lines = [call[0][0] for call in mock_print.call_args_list]
+    assert len(lines) == 5
+    assert lines[0].split() == ['level', 'bytes/event', 'cpu', 'us']
+    raw = float(lines[1].split()[1])
+    compressed = float(lines[2].split()[1])
+    assert compressed < raw
@@ -171,6 +171,7 @@ class TestCheckConfig(unittest.TestCase):
 
             self.assertDictEqual({
                 'components': {'http': {'api_password': 'abc123',
+                                        'compression_level': 0,
                                         'cors_allowed_origins': [],
                                         'development': '0',
                                         'ip_ban_enabled': True,
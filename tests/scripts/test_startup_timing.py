@@ -0,0 +1,28 @@
+"""Test the startup timing script."""
+from unittest.mock import patch
+
+from homeassistant.scripts import startup_timing
+
+
+@patch('builtins.print')
+@patch('homeassistant.remote.get_startup_timings', return_value=[
+    {'phase': 'setup', 'name': 'zwave', 'wall': 12.5, 'executor': 12.0},
+    {'phase': 'import', 'name': 'zwave', 'wall': 0.5, 'executor': 0.0},
+])
+def test_print_timings(mock_timings, mock_print):
+    """Test printing the timings of a running instance."""
+    assert startup_timing.run(['-p', 'secret', '-n', '1']) == 0
+
+    api = mock_timings.call_args[0][0]
+    assert api.api_password == 'secret'
+
+    lines = [call[0][0] for call in mock_print.call_args_list if call[0]]
+    assert lines[1].split() == ['setup', '12.50']
+    assert lines[-1].split() == ['setup', 'zwave', '12.50', '12.00']
+
+
+@patch('builtins.print')
+@patch('homeassistant.remote.get_startup_timings', return_value=[])
+def test_no_timings(mock_timings, mock_print):
+    """Test the script fails if no timings are available."""
+    assert startup_timing.run([]) == 1
@@ -9,14 +9,15 @@ import logging
 import voluptuous as vol
 import pytest
 
-from homeassistant.core import callback
-from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.core import EXECUTOR_POOL_SIZE, callback
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STARTED)
 import homeassistant.config as config_util
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant import bootstrap, loader
 import homeassistant.util.dt as dt_util
 from homeassistant.helpers.config_validation import PLATFORM_SCHEMA
-from homeassistant.helpers import discovery
+from homeassistant.helpers import discovery, startup_timing
 
 from tests.common import \
     get_test_home_assistant, MockModule, MockPlatform, \
@@ -242,6 +243,24 @@ class TestBootstrap:
         assert not bootstrap.setup_component(self.hass, 'comp')
         assert 'comp' not in self.hass.config.components
 
+    @mock.patch('homeassistant.util.package.save_requirements_cache')
+    @mock.patch('homeassistant.util.package.load_requirements_cache',
+                return_value={'package==0.0.1'})
+    @mock.patch('homeassistant.util.package.install_package',
+                return_value=True)
+    def test_component_requirement_cached(self, mock_install, mock_load,
+                                          mock_save):
+        """Test requirements known to be satisfied are not checked again."""
+        self.hass.config.skip_pip = False
+        loader.set_component(
+            'comp', MockModule('comp', requirements=['package==0.0.1',
+                                                     'other==0.0.1']))
+
+        assert bootstrap.setup_component(self.hass, 'comp')
+        assert mock_install.call_args_list == [
+            mock.call('other==0.0.1', target=self.hass.config.path('deps'))]
+        assert mock_save.call_args[0][2] == {'package==0.0.1', 'other==0.0.1'}
+
     def test_component_not_setup_twice_if_loaded_during_other_setup(self):
         """Test component setup while waiting for lock is not setup twice."""
         loader.set_component('comp', MockModule('comp'))
@@ -467,3 +486,206 @@ def test_platform_cannot_depend_config():
     with pytest.raises(HomeAssistantError):
         yield from bootstrap.async_prepare_setup_platform(
             mock.MagicMock(), {}, 'test_component1', 'test')
+
+
+@asyncio.coroutine
+def test_components_setup_in_parallel(hass):
+    """Test independent components are set up concurrently."""
+    calls = []
+
+    def mock_async_setup(domain):
+        """Return an async_setup that records when it runs."""
+        @asyncio.coroutine
+        def async_setup(hass, config):
+            """Record start and end of setup."""
+            calls.append(('start', domain))
+            yield from asyncio.sleep(0.05, loop=hass.loop)
+            calls.append(('end', domain))
+            return True
+        return async_setup
+
+    loader.set_component('comp_a', MockModule(
+        'comp_a', async_setup=mock_async_setup('comp_a')))
+    loader.set_component('comp_b', MockModule(
+        'comp_b', async_setup=mock_async_setup('comp_b')))
+    loader.set_component('comp_c', MockModule(
+        'comp_c', ['comp_a'], async_setup=mock_async_setup('comp_c')))
+
+    with mock.patch('homeassistant.bootstrap.'
+                    'async_register_signal_handling'), \
+            mock.patch('homeassistant.bootstrap.conf_util.'
+                       'process_ha_config_upgrade'):
+        yield from bootstrap.async_from_config_dict(
+            {'comp_c': None, 'comp_a': None, 'comp_b': None}, hass,
+            enable_log=False, skip_pip=True)
+
+    assert {'comp_a', 'comp_b', 'comp_c'} <= hass.config.components
+    # comp_a and comp_b ran at the same time, comp_c after comp_a
+    assert calls.index(('start', 'comp_b')) < calls.index(('end', 'comp_a'))
+    assert calls.index(('end', 'comp_a')) < calls.index(('start', 'comp_c'))
+    assert {'comp_a', 'comp_b', 'comp_c'} <= set(
+        timing['name'] for timing in startup_timing.async_get_report(hass)
+        if timing['phase'] == startup_timing.PHASE_SETUP)
+
+
+@asyncio.coroutine
+def test_deferred_startup(hass):
+    """Test slow components finish after startup in deferred mode."""
+    release = asyncio.Event(loop=hass.loop)
+    started = asyncio.Event(loop=hass.loop)
+
+    @asyncio.coroutine
+    def async_setup_slow(hass, config):
+        """Finish setup once released."""
+        yield from release.wait()
+        return True
+
+    loader.set_component('comp_fast', MockModule('comp_fast'))
+    loader.set_component('comp_slow', MockModule(
+        'comp_slow', async_setup=async_setup_slow))
+    hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STARTED, lambda event: started.set())
+
+    with mock.patch('homeassistant.bootstrap.'
+                    'async_register_signal_handling'), \
+            mock.patch('homeassistant.bootstrap.conf_util.'
+                       'process_ha_config_upgrade'), \
+            mock.patch('homeassistant.bootstrap.DEFERRED_SETUP_WAIT', 0.01):
+        yield from bootstrap.async_from_config_dict(
+            {'homeassistant': {'deferred_startup': True},
+             'comp_fast': None, 'comp_slow': None}, hass,
+            enable_log=False, skip_pip=True)
+
+    assert 'comp_fast' in hass.config.components
+    assert 'comp_slow' not in hass.config.components
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from hass.async_block_till_done()
+    assert not started.is_set()
+
+    release.set()
+    yield from asyncio.wait_for(started.wait(), 1, loop=hass.loop)
+
+    assert 'comp_slow' in hass.config.components
+    assert bootstrap.DATA_DEFERRED_SETUP not in hass.data
+
+
+@asyncio.coroutine
+def test_started_fired_without_deferred_startup(hass):
+    """Test the started event follows the start event by default."""
+    started = asyncio.Event(loop=hass.loop)
+    hass.bus.async_listen_once(
+        EVENT_HOMEASSISTANT_STARTED, lambda event: started.set())
+
+    with mock.patch('homeassistant.bootstrap.'
+                    'async_register_signal_handling'), \
+            mock.patch('homeassistant.bootstrap.conf_util.'
+                       'process_ha_config_upgrade'):
+        yield from bootstrap.async_from_config_dict(
+            {}, hass, enable_log=False, skip_pip=True)
+
+    assert bootstrap.DATA_DEFERRED_SETUP not in hass.data
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from asyncio.wait_for(started.wait(), 1, loop=hass.loop)
+
+
+@asyncio.coroutine
+def test_requirements_installed_at_once(hass):
+    """Test missing requirements are installed with a single call."""
+    loader.set_component('comp_a', MockModule(
+        'comp_a', requirements=['cached==1.0', 'a==1.0']))
+    loader.set_component('comp_b', MockModule(
+        'comp_b', platform_schema=PLATFORM_SCHEMA))
+    platform = MockPlatform()
+    platform.REQUIREMENTS = ['b==1.0', 'a==1.0']
+    loader.set_component('comp_b.plat', platform)
+
+    with mock.patch('homeassistant.bootstrap.'
+                    'async_register_signal_handling'), \
+            mock.patch('homeassistant.bootstrap.conf_util.'
+                       'process_ha_config_upgrade'), \
+            mock.patch('homeassistant.util.package.load_requirements_cache',
+                       return_value={'cached==1.0'}), \
+            mock.patch('homeassistant.util.package.'
+                       'save_requirements_cache') as mock_save, \
+            mock.patch('homeassistant.util.package.'
+                       'install_package') as mock_install, \
+            mock.patch('homeassistant.util.package.install_packages',
+                       return_value=True) as mock_install_all:
+        yield from bootstrap.async_from_config_dict(
+            {'comp_a': None, 'comp_b': {'platform': 'plat'}}, hass,
+            enable_log=False)
+
+    assert {'comp_a', 'comp_b'} <= hass.config.components
+    assert mock_install_all.call_count == 1
+    assert sorted(mock_install_all.call_args[0][0]) == ['a==1.0', 'b==1.0']
+    assert not mock_install.called
+    assert mock_save.call_args[0][2] == {'cached==1.0', 'a==1.0', 'b==1.0'}
+
+
+@asyncio.coroutine
+def test_component_setup_timeout(hass):
+    """Test a component that does not finish setup in time fails."""
+    @asyncio.coroutine
+    def async_setup(hass, config):
+        """Setup that never finishes in time."""
+        yield from asyncio.sleep(1, loop=hass.loop)
+        return True
+
+    comp = MockModule('comp', async_setup=async_setup)
+    comp.SETUP_TIMEOUT = 0.01
+    loader.set_component('comp', comp)
+
+    assert not (yield from bootstrap.async_setup_component(hass, 'comp'))
+    assert 'comp' not in hass.config.components
+
+
+@asyncio.coroutine
+def test_setup_waiting_on_dependent_does_not_hang(hass):
+    """Test a setup that waits on a component depending on it."""
+    loader.set_component('comp_b', MockModule('comp_b', ['comp_a']))
+
+    def setup_a(hass, config):
+        """Setup the component depending on this one."""
+        bootstrap.setup_component(hass, 'comp_b')
+        return True
+
+    loader.set_component('comp_a', MockModule('comp_a', setup=setup_a))
+
+    with mock.patch('homeassistant.bootstrap.'
+                    'async_register_signal_handling'), \
+            mock.patch('homeassistant.bootstrap.conf_util.'
+                       'process_ha_config_upgrade'):
+        yield from asyncio.wait_for(bootstrap.async_from_config_dict(
+            {'comp_a': None, 'comp_b': None}, hass,
+            enable_log=False, skip_pip=True), 5, loop=hass.loop)
+
+    assert {'comp_a', 'comp_b'} <= hass.config.components
+
+
+@asyncio.coroutine
+def test_nested_sync_setups_do_not_exhaust_executor(hass):
+    """Test more sync setups than executor threads setting up a dependency."""
+    count = EXECUTOR_POOL_SIZE + 2
+    domains = ['comp_{}'.format(idx) for idx in range(count)]
+
+    def mock_setup(dep):
+        """Return a setup that sets up dep from the executor."""
+        def setup(hass, config):
+            """Setup the dependency."""
+            return bootstrap.setup_component(hass, dep)
+        return setup
+
+    for idx, domain in enumerate(domains):
+        dep = 'dep_{}'.format(idx)
+        loader.set_component(dep, MockModule(dep))
+        loader.set_component(domain, MockModule(domain, setup=mock_setup(dep)))
+
+    with mock.patch('homeassistant.bootstrap.SETUP_TIMEOUT', 5):
+        results = yield from asyncio.gather(*[
+            bootstrap.async_setup_component(hass, domain)
+            for domain in domains], loop=hass.loop)
+
+    assert all(results)
+    assert set(domains) <= hass.config.components
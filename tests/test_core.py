@@ -10,7 +10,8 @@ import pytest
 
 import homeassistant.core as ha
 from homeassistant.exceptions import InvalidEntityFormatError
-from homeassistant.util.async import run_coroutine_threadsafe
+from homeassistant.util.async import (
+    run_callback_threadsafe, run_coroutine_threadsafe)
 import homeassistant.util.dt as dt_util
 from homeassistant.util.unit_system import (METRIC_SYSTEM)
 from homeassistant.const import (
@@ -515,6 +516,30 @@ class TestStateMachine(unittest.TestCase):
         states = sorted(state.entity_id for state in self.states.all())
         self.assertEqual(['light.bowl', 'switch.ac'], states)
 
+    def test_domain_index(self):
+        """Test the states of a domain are indexed and sorted."""
+        self.states.set('light.kitchen', 'off')
+        self.states.set('light.attic', 'on')
+        self.states.set('light.kitchen', 'on')
+
+        self.assertEqual(['light.attic', 'light.bowl', 'light.kitchen'],
+                         self.states.entity_ids('LIGHT'))
+        self.assertEqual(
+            ['light.attic', 'light.bowl', 'light.kitchen'],
+            [state.entity_id for state in run_callback_threadsafe(
+                self.hass.loop, self.states.async_all, 'light').result()])
+        self.assertEqual('on', run_callback_threadsafe(
+            self.hass.loop, self.states.async_all,
+            'light').result()[2].state)
+
+        self.states.remove('light.bowl')
+        self.states.remove('switch.ac')
+
+        self.assertEqual(['light.attic', 'light.kitchen'],
+                         self.states.entity_ids('light'))
+        self.assertEqual([], self.states.entity_ids('switch'))
+        self.assertEqual([], self.states.entity_ids('sensor'))
+
     def test_remove(self):
         """Test remove method."""
         events = []
@@ -813,3 +838,79 @@ def test_timer_out_of_sync(mock_monotonic, loop):
     assert slp_seconds == 1
     assert callback is fire_time_event
     assert abs(nxt - 12.3) < 0.001
+
+
+@asyncio.coroutine
+def test_scheduler_runs_due_jobs_once(hass):
+    """Test the scheduler runs jobs in order once they are due."""
+    calls = []
+    now = dt_util.utcnow()
+    hass.scheduler.async_schedule(
+        now + timedelta(seconds=2), lambda time: calls.append(('b', time)))
+    hass.scheduler.async_schedule(
+        now + timedelta(seconds=1), lambda time: calls.append(('a', time)))
+    cancel = hass.scheduler.async_schedule(
+        now + timedelta(seconds=1), lambda time: calls.append(('c', time)))
+    cancel()
+
+    assert hass.scheduler.jobs == 2
+    assert hass.bus.async_listeners()[EVENT_TIME_CHANGED] == 1
+
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: now})
+    yield from hass.async_block_till_done()
+    assert calls == []
+
+    later = now + timedelta(seconds=2)
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: later})
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: later})
+    yield from hass.async_block_till_done()
+
+    assert calls == [('a', later), ('b', later)]
+    assert hass.scheduler.jobs == 0
+    assert EVENT_TIME_CHANGED not in hass.bus.async_listeners()
+
+
+@asyncio.coroutine
+def test_scheduler_wakes_up_at_deadline(hass):
+    """Test the started scheduler runs jobs without time changed events."""
+    called = asyncio.Event(loop=hass.loop)
+    hass.scheduler.async_start()
+    hass.scheduler.async_schedule(
+        dt_util.utcnow() + timedelta(seconds=5), lambda time: None)
+    hass.scheduler.async_schedule(
+        dt_util.utcnow() + timedelta(milliseconds=10),
+        lambda time: called.set())
+
+    try:
+        yield from asyncio.wait_for(called.wait(), 1, loop=hass.loop)
+    finally:
+        hass.scheduler.async_stop()
+
+    assert hass.scheduler.jobs == 1
+
+
+@asyncio.coroutine
+def test_scheduler_runs_due_jobs_after_clock_jump(hass):
+    """Test the started scheduler catches up when the clock jumps forward."""
+    calls = []
+    hass.scheduler.async_start()
+    now = dt_util.utcnow()
+    hass.scheduler.async_schedule(
+        now + timedelta(hours=1), lambda time: calls.append(time))
+    hass.scheduler.async_schedule(
+        now + timedelta(hours=3), lambda time: calls.append(time))
+
+    try:
+        hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: now})
+        yield from hass.async_block_till_done()
+        assert calls == []
+
+        later = now + timedelta(hours=2)
+        with patch('homeassistant.core.dt_util.utcnow', return_value=later):
+            hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: later})
+            yield from hass.async_block_till_done()
+
+        assert calls == [later]
+        assert hass.scheduler.jobs == 1
+    finally:
+        hass.scheduler.async_stop()
@@ -1,8 +1,12 @@
 """Test to verify that we can load components."""
 # pylint: disable=protected-access
+import asyncio
+import threading
 import unittest
+from unittest.mock import patch
 
 import homeassistant.loader as loader
+import homeassistant.components.api as api
 import homeassistant.components.http as http
 
 from tests.common import get_test_home_assistant, MockModule
@@ -84,3 +88,76 @@ class TestLoader(unittest.TestCase):
         self.assertEqual(
             ['group', 'mod2'],
             loader.load_order_components(['mod2', 'mod1']))
+
+    def test_component_index(self):
+        """Test the component index matches the built-in components."""
+        self.assertIn('homeassistant.components.light',
+                      loader.AVAILABLE_COMPONENTS)
+        self.assertEqual(api.DEPENDENCIES,
+                         loader.COMPONENT_INDEX['api']['dependencies'])
+        self.assertIn('demo', loader.COMPONENT_INDEX['light']['platforms'])
+        self.assertEqual(
+            [], loader.COMPONENT_INDEX['light.demo']['requirements'])
+
+    def test_load_order_from_index(self):
+        """Test the load order is resolved without imports."""
+        with patch.dict(loader.COMPONENT_INDEX, {
+                'index_a': {'dependencies': ['index_b'], 'requirements': [],
+                            'platforms': []},
+                'index_b': {'dependencies': [], 'requirements': [],
+                            'platforms': []}}), \
+                patch('homeassistant.loader.get_component') as mock_get:
+            self.assertEqual(
+                ['index_b', 'index_a'], loader.load_order_component('index_a'))
+
+        self.assertFalse(mock_get.called)
+
+    def test_get_manifest_of_loaded_component(self):
+        """Test manifests of loaded components are read from the module."""
+        loader.set_component('mod1', MockModule(
+            'mod1', ['group'], requirements=['req==1.0']))
+        loader.set_component('mod1.plat', MockModule())
+
+        self.assertEqual({
+            'dependencies': ['group'],
+            'requirements': ['req==1.0'],
+            'platforms': ['plat'],
+        }, loader.get_manifest('mod1'))
+        self.assertIsNone(loader.get_manifest('nonexisting'))
+
+    def test_get_manifest_of_imported_builtin_component(self):
+        """Test imported built-in components are still read from the index."""
+        loader.get_component('sensor')
+
+        with patch('homeassistant.loader.get_component') as mock_get:
+            self.assertIs(loader.COMPONENT_INDEX['sensor'],
+                          loader.get_manifest('sensor'))
+
+        self.assertFalse(mock_get.called)
+
+    def test_outdated_index_ignored(self):
+        """Test an index generated for another version is not used."""
+        with patch('homeassistant.loader.__version__', '0.0.1'):
+            self.assertEqual({}, loader._load_component_index())
+
+
+@asyncio.coroutine
+def test_async_get_component(hass):
+    """Test components are imported in the executor."""
+    threads = []
+
+    def mock_get_component(comp_name):
+        """Record the thread the import runs in."""
+        threads.append(threading.current_thread())
+        return http
+
+    with patch('homeassistant.loader.get_component',
+               side_effect=mock_get_component):
+        component = yield from loader.async_get_component(hass, 'not_loaded')
+
+    assert component is http
+    assert threads and threads[0] is not threading.current_thread()
+
+    loader.set_component('light.loaded', http)
+    platform = yield from loader.async_get_platform(hass, 'light', 'loaded')
+    assert platform is http
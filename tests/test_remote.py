@@ -2,16 +2,24 @@
 # pylint: disable=protected-access
 import asyncio
 import threading
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+
+import aiohttp
 
 import homeassistant.core as ha
 import homeassistant.bootstrap as bootstrap
 import homeassistant.remote as remote
 import homeassistant.components.http as http
-from homeassistant.const import HTTP_HEADER_HA_AUTH, EVENT_STATE_CHANGED
+from homeassistant.const import (
+    HTTP_HEADER_HA_AUTH, EVENT_STATE_CHANGED, URL_API)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.json as json_helper
 import homeassistant.util.dt as dt_util
 
+from homeassistant.util.async import run_callback_threadsafe
+
 from tests.common import (
     get_test_instance_port, get_test_home_assistant, get_test_config_dir)
 
@@ -48,6 +56,7 @@ def setUpModule():
                        http.CONF_SERVER_PORT: MASTER_PORT}})
 
     bootstrap.setup_component(hass, 'api')
+    bootstrap.setup_component(hass, 'websocket_api')
 
     hass.start()
 
@@ -100,6 +109,52 @@ class TestRemoteMethods(unittest.TestCase):
         self.assertEqual(
             remote.APIStatus.CANNOT_CONNECT, remote.validate_api(broken_api))
 
+    def test_api_connection_pool(self):
+        """Test that API reuses pooled keep-alive connections."""
+        api = remote.API('127.0.0.1', API_PASSWORD, MASTER_PORT,
+                         pool_size=2, retries=3)
+        adapter = api._session.get_adapter(api.base_url)
+
+        self.assertEqual(2, adapter._pool_maxsize)
+        self.assertEqual(3, adapter.max_retries.total)
+
+        for _ in range(3):
+            self.assertEqual(200, api(remote.METHOD_GET, URL_API).status_code)
+
+        pool = adapter.poolmanager.connection_from_url(api.base_url)
+        self.assertEqual(1, pool.num_connections)
+        self.assertEqual(2, pool.num_requests - 1)
+
+        api.close()
+
+    def test_api_async_call(self):
+        """Test calling the API from inside an event loop."""
+        loop = asyncio.new_event_loop()
+        api = remote.API('127.0.0.1', API_PASSWORD, MASTER_PORT)
+
+        @asyncio.coroutine
+        def call_api():
+            """Call the API twice over the same session."""
+            first = yield from api.async_call(
+                remote.METHOD_GET, URL_API, loop=loop)
+            second = yield from api.async_call(
+                remote.METHOD_GET, URL_API, loop=loop)
+            data = yield from second.json()
+            yield from api.async_close()
+            return first.status, data
+
+        status, data = loop.run_until_complete(call_api())
+
+        self.assertEqual(200, status)
+        self.assertEqual({'message': 'API running.'}, data)
+
+        with self.assertRaises(HomeAssistantError):
+            loop.run_until_complete(
+                broken_api.async_call(remote.METHOD_GET, URL_API, loop=loop))
+        loop.run_until_complete(broken_api.async_close())
+
+        loop.close()
+
     def test_get_event_listeners(self):
         """Test Python API get_event_listeners."""
         local_data = hass.bus.listeners
@@ -130,6 +185,26 @@ class TestRemoteMethods(unittest.TestCase):
         # Should not trigger any exception
         remote.fire_event(broken_api, "test.event_no_data")
 
+    def test_fire_events(self):
+        """Test Python API fire_events."""
+        test_value = []
+
+        @ha.callback
+        def listener(event):
+            """Helper method that will verify our events got called."""
+            test_value.append(event.data)
+
+        hass.bus.listen("test.batch_event", listener)
+        self.assertTrue(remote.fire_events(master_api, [
+            ("test.batch_event", None),
+            ("test.batch_event", {"hello": "world"}),
+        ]))
+        hass.block_till_done()
+        self.assertEqual([{}, {"hello": "world"}], test_value)
+
+        self.assertFalse(
+            remote.fire_events(broken_api, [("test.batch_event", None)]))
+
     def test_get_state(self):
         """Test Python API get_state."""
         self.assertEqual(
@@ -143,6 +218,15 @@ class TestRemoteMethods(unittest.TestCase):
         self.assertEqual(hass.states.all(), remote.get_states(master_api))
         self.assertEqual([], remote.get_states(broken_api))
 
+    def test_get_states_by_id(self):
+        """Test Python API get_states_by_id."""
+        expected = [hass.states.get('test.test'), None]
+
+        self.assertEqual(expected, remote.get_states_by_id(
+            master_api, ['test.test', 'test.missing']))
+        self.assertEqual(
+            [], remote.get_states_by_id(broken_api, ['test.test']))
+
     def test_remove_state(self):
         """Test Python API set_state."""
         hass.states.set('test.remove_state', 'set_test')
@@ -218,6 +302,36 @@ class TestRemoteMethods(unittest.TestCase):
         # Should not raise an exception
         remote.call_service(broken_api, "test_domain", "test_service")
 
+    def test_call_services(self):
+        """Test Python API call_services."""
+        test_value = []
+
+        @ha.callback
+        def listener(service_call):
+            """Helper method that will verify that our service got called."""
+            test_value.append(service_call.data)
+            hass.states.async_set('test.test', service_call.data['n'])
+
+        hass.services.register("test_domain", "batch_service", listener)
+
+        results = remote.call_services(master_api, [
+            ("test_domain", "batch_service", {"n": 1}),
+            ("test_domain", "missing_service", None),
+            ("test_domain", "batch_service", {"n": 2}),
+        ])
+
+        self.assertEqual([{"n": 1}, {"n": 2}], test_value)
+        self.assertEqual(3, len(results))
+        self.assertTrue(results[0]['success'])
+        self.assertEqual('1', results[0]['changed_states'][0].state)
+        self.assertFalse(results[1]['success'])
+        self.assertIn('not found', results[1]['message'])
+        self.assertEqual(hass.states.get('test.test'),
+                         results[2]['changed_states'][0])
+
+        self.assertEqual([], remote.call_services(
+            broken_api, [("test_domain", "batch_service", {"n": 3})]))
+
     def test_json_encoder(self):
         """Test the JSON Encoder."""
         ha_json_enc = remote.JSONEncoder()
@@ -257,6 +371,98 @@ class TestRemoteClasses(unittest.TestCase):
         self.assertEqual(sorted(hass.states.all()),
                          sorted(slave.states.all()))
 
+    def wait_for(self, condition):
+        """Wait up to five seconds for condition to become true."""
+        for _ in range(500):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail("Condition not met in time")
+
+    def test_statemachine_websocket_mirror(self):
+        """Test mirroring states over the websocket API with resync."""
+        journal = hass.data['websocket_api_state_journal']
+        states = remote.StateMachine(slave.bus, slave.loop, master_api)
+        run_callback_threadsafe(
+            slave.loop, states.async_start_websocket_mirror).result()
+
+        hass.states.set('test.ws_mirror', 'on', {'brightness': 100})
+        hass.block_till_done()
+        self.wait_for(lambda: states._mirror_version == journal.version)
+        self.assertEqual(hass.states.get('test.ws_mirror'),
+                         states.get('test.ws_mirror'))
+
+        hass.states.set('test.ws_mirror', 'off', {'color_temp': 300})
+        hass.block_till_done()
+        self.wait_for(lambda: states._mirror_version == journal.version)
+        self.assertEqual(hass.states.get('test.ws_mirror'),
+                         states.get('test.ws_mirror'))
+
+        run_callback_threadsafe(
+            slave.loop, states.async_stop_websocket_mirror).result()
+        states._states['test.sentinel'] = ha.State('test.sentinel', 'on')
+
+        hass.states.remove('test.ws_mirror')
+        hass.states.set('test.ws_other', 'on')
+        hass.block_till_done()
+
+        run_callback_threadsafe(
+            slave.loop, states.async_start_websocket_mirror).result()
+        self.wait_for(lambda: states._mirror_version == journal.version)
+
+        self.assertIsNone(states.get('test.ws_mirror'))
+        self.assertEqual(hass.states.get('test.ws_other'),
+                         states.get('test.ws_other'))
+        # Only the changes were sent, not a full reload
+        self.assertIsNotNone(states.get('test.sentinel'))
+
+        run_callback_threadsafe(
+            slave.loop, states.async_stop_websocket_mirror).result()
+        hass.states.remove('test.ws_other')
+        hass.block_till_done()
+        slave.block_till_done()
+
+    def test_statemachine_websocket_mirror_reconnects(self):
+        """Test the mirror reconnects when closed during auth or subscribe."""
+        text = aiohttp.WSMsgType.TEXT
+        close = Mock(type=aiohttp.WSMsgType.CLOSE)
+        messages = [
+            # Closed while authenticating
+            Mock(type=text, data='{"type": "auth_required"}'), close,
+            # Closed while subscribing
+            Mock(type=text, data='{"type": "auth_ok"}'), close,
+        ]
+        connects = []
+
+        @asyncio.coroutine
+        def mock_receive():
+            """Return the next message, then keep the socket idle."""
+            if messages:
+                return messages.pop(0)
+            yield from asyncio.sleep(60, loop=slave.loop)
+
+        @asyncio.coroutine
+        def mock_close():
+            """Close the websocket."""
+
+        @asyncio.coroutine
+        def mock_ws_connect(session, url):
+            """Return a mock websocket."""
+            connects.append(url)
+            return Mock(receive=mock_receive, close=mock_close)
+
+        states = remote.StateMachine(slave.bus, slave.loop, master_api)
+
+        with patch('aiohttp.ClientSession.ws_connect', mock_ws_connect), \
+                patch('homeassistant.remote.WEBSOCKET_RECONNECT_INTERVAL', 0):
+            run_callback_threadsafe(
+                slave.loop, states.async_start_websocket_mirror).result()
+            self.wait_for(lambda: len(connects) == 3)
+
+            self.assertFalse(states._mirror_task.done())
+            run_callback_threadsafe(
+                slave.loop, states.async_stop_websocket_mirror).result()
+
     def test_statemachine_set(self):
         """Test if setting the state on a slave is recorded."""
         slave.states.set("remote.test", "remote.statemachine test")
@@ -316,3 +522,123 @@ class TestRemoteClasses(unittest.TestCase):
     def test_get_config(self):
         """Test the return of the configuration."""
         self.assertEqual(hass.config.as_dict(), remote.get_config(master_api))
+
+
+class TestEventForwarder(unittest.TestCase):
+    """Test the batching EventForwarder."""
+
+    def setUp(self):
+        """Setup things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        self.api = remote.API('127.0.0.1', port=BROKEN_PORT)
+        self.batches = []
+        self.down = False
+        self.statuses = []
+
+        @asyncio.coroutine
+        def mock_text():
+            """Return the body of a failed request."""
+            return 'error'
+
+        @asyncio.coroutine
+        def mock_async_call(method, path, data=None, **kwargs):
+            """Record the posted batch."""
+            if self.down:
+                raise HomeAssistantError("Error connecting to server")
+            json_helper.dumps(data)
+            self.batches.append((path, data))
+            status = self.statuses.pop(0) if self.statuses else 200
+            return Mock(status=status, text=mock_text)
+
+        self.api.async_call = mock_async_call
+        self.forwarder = remote.EventForwarder(self.hass, max_queue=2)
+        run_callback_threadsafe(
+            self.hass.loop, self.forwarder.async_connect, self.api).result()
+
+    def tearDown(self):
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def fire_events(self, *events):
+        """Fire events in one go from inside the loop."""
+        def fire():
+            """Fire the events."""
+            for event_type, event_data in events:
+                self.hass.bus.async_fire(event_type, event_data)
+
+        run_callback_threadsafe(self.hass.loop, fire).result()
+        self.hass.block_till_done()
+
+    def test_events_are_batched(self):
+        """Test that events queued together are posted in one request."""
+        self.fire_events(('test_event', {'n': 1}), ('test_event', {'n': 2}))
+
+        self.assertEqual(1, len(self.batches))
+        path, batch = self.batches[0]
+        self.assertEqual(remote.URL_API_BATCH_EVENTS, path)
+        self.assertEqual(
+            [{'event_type': 'test_event', 'event_data': {'n': 1}},
+             {'event_type': 'test_event', 'event_data': {'n': 2}}], batch)
+
+    def test_target_down_compacts_queue(self):
+        """Test that a target that is down does not grow the queue."""
+        self.down = True
+        self.fire_events(
+            (EVENT_STATE_CHANGED, {'entity_id': 'light.a', 'n': 1}))
+        self.fire_events(
+            (EVENT_STATE_CHANGED, {'entity_id': 'light.a', 'n': 2}),
+            (EVENT_STATE_CHANGED, {'entity_id': 'light.a', 'n': 3}))
+
+        key = (self.api.host, self.api.port)
+        queue = self.forwarder._queues[key]
+        self.assertEqual([{'entity_id': 'light.a', 'n': 3}],
+                         [event.data for event in queue])
+        self.assertIn(key, self.forwarder._flushing)
+
+        self.down = False
+        self.hass.add_job(self.forwarder._async_flush(key))
+        self.hass.block_till_done()
+
+        self.assertEqual(1, len(self.batches))
+        self.assertEqual(3, self.batches[0][1][0]['event_data']['n'])
+        self.assertNotIn(key, self.forwarder._flushing)
+
+    def test_queue_bounded_while_sending(self):
+        """Test that a live target drops the oldest events, not compacts."""
+        self.fire_events(
+            (EVENT_STATE_CHANGED, {'entity_id': 'light.a', 'n': 1}),
+            (EVENT_STATE_CHANGED, {'entity_id': 'light.a', 'n': 2}),
+            (EVENT_STATE_CHANGED, {'entity_id': 'light.a', 'n': 3}))
+
+        self.assertEqual(1, len(self.batches))
+        self.assertEqual([2, 3], [item['event_data']['n']
+                                  for item in self.batches[0][1]])
+
+    def test_unserializable_event_dropped(self):
+        """Test that an event that can not be serialized is dropped."""
+        self.fire_events(('test_event', {'n': 1}),
+                         ('test_event', {'n': object()}))
+
+        key = (self.api.host, self.api.port)
+        self.assertEqual(
+            [[{'event_type': 'test_event', 'event_data': {'n': 1}}]],
+            [batch for _, batch in self.batches])
+        self.assertNotIn(key, self.forwarder._flushing)
+        self.assertNotIn(key, self.forwarder._retrying)
+
+    def test_fallback_requeues_unsent_events(self):
+        """Test that only events that were not sent are queued again."""
+        self.forwarder.max_queue = 3
+        self.statuses = [404, 200, 500]
+        self.fire_events(('test_event', {'n': 1}), ('test_event', {'n': 2}),
+                         ('test_event', {'n': 3}))
+
+        key = (self.api.host, self.api.port)
+        self.assertEqual(
+            [remote.URL_API_BATCH_EVENTS,
+             remote.URL_API_EVENTS_EVENT.format('test_event'),
+             remote.URL_API_EVENTS_EVENT.format('test_event')],
+            [path for path, _ in self.batches])
+        self.assertEqual([{'n': 2}, {'n': 3}],
+                         [event.data for event in self.forwarder._queues[key]])
+        self.assertIn(key, self.forwarder._retrying)
@@ -128,3 +128,81 @@ class TestPackageUtilCheckPackageExists(unittest.TestCase):
     def test_check_package_zip(self):
         """Test for an installed zip package."""
         self.assertFalse(package.check_package_exists(TEST_ZIP_REQ, None))
+
+
+@patch('homeassistant.util.package.subprocess.call', return_value=0)
+@patch('homeassistant.util.package.sys')
+def test_install_packages_batched(mock_sys, mock_subprocess):
+    """Test missing packages are installed with one pip invocation."""
+    with patch('homeassistant.util.package.missing_packages',
+               return_value=[TEST_NEW_REQ, 'other==1.0']) as mock_missing:
+        assert package.install_packages(
+            [TEST_EXIST_REQ, TEST_NEW_REQ, 'other==1.0'], target='deps')
+
+    assert mock_missing.call_args == \
+        call([TEST_EXIST_REQ, TEST_NEW_REQ, 'other==1.0'], 'deps')
+    assert mock_subprocess.call_args_list == [call([
+        mock_sys.executable, '-m', 'pip', 'install', '--quiet',
+        TEST_NEW_REQ, 'other==1.0', '--upgrade',
+        '--target', os.path.abspath('deps')])]
+
+
+@patch('homeassistant.util.package.subprocess.call')
+def test_install_packages_all_installed(mock_subprocess):
+    """Test pip is not invoked if all packages are installed."""
+    installed_package = list(pkg_resources.working_set)[0].project_name
+
+    assert package.install_packages([installed_package])
+    assert not mock_subprocess.called
+
+
+def test_missing_packages():
+    """Test only packages not installed are returned."""
+    installed_package = list(pkg_resources.working_set)[0].project_name
+
+    assert package.missing_packages(
+        [installed_package, TEST_ZIP_REQ, TEST_NEW_REQ], None) == \
+        [TEST_ZIP_REQ, TEST_NEW_REQ]
+
+
+def test_missing_packages_parsed_once():
+    """Test every requirement is parsed once, not once per distribution."""
+    installed_package = list(pkg_resources.working_set)[0].project_name
+
+    with patch.object(pkg_resources.Requirement, 'parse',
+                      wraps=pkg_resources.Requirement.parse) as mock_parse:
+        assert package.missing_packages(
+            [installed_package, TEST_NEW_REQ], None) == [TEST_NEW_REQ]
+
+    assert mock_parse.call_count == 2
+
+
+def test_requirements_cache(tmpdir):
+    """Test the requirements cache is invalidated by installs."""
+    cache_path = str(tmpdir.join('cache'))
+    target = tmpdir.mkdir('deps')
+
+    assert package.load_requirements_cache(cache_path, str(target)) == set()
+
+    package.save_requirements_cache(
+        cache_path, str(target), {TEST_EXIST_REQ, TEST_NEW_REQ})
+
+    assert package.load_requirements_cache(cache_path, str(target)) == \
+        {TEST_EXIST_REQ, TEST_NEW_REQ}
+
+    mtime = target.stat().mtime
+    target.mkdir('pyhelloworld3')
+    target.setmtime(mtime + 10)
+
+    assert package.load_requirements_cache(cache_path, str(target)) == set()
+
+
+def test_requirements_cache_invalid(tmpdir):
+    """Test a corrupt requirements cache is ignored."""
+    cache_file = tmpdir.join('cache')
+    cache_file.write('not json')
+
+    with patch('homeassistant.util.package._LOGGER.warning') as mock_warning:
+        assert package.load_requirements_cache(str(cache_file), None) == set()
+
+    assert mock_warning.called
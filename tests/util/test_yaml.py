@@ -1,6 +1,7 @@
 """Test Home Assistant yaml loader."""
 import io
 import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -385,3 +386,100 @@ class TestSecrets(unittest.TestCase):
         load_yaml(self._yaml_path, 'api_password: !secret pw')
         assert mock_error.call_count == 1, \
             "Expected an error about logger: value"
+
+
+class TestYamlCache(unittest.TestCase):
+    """Test the cache of parsed YAML files."""
+
+    # pylint: disable=invalid-name
+
+    def setUp(self):
+        """Create a configuration in a temporary directory."""
+        yaml.clear_secret_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self._yaml_path = self._write(
+            YAML_CONFIG_FILE,
+            'http:\n'
+            '  api_password: !secret http_pw\n'
+            'sensor: !include_dir_list sensors\n'
+            'name: !env_var HA_CACHE_TEST_NAME\n')
+        self._write(yaml._SECRET_YAML, 'http_pw: pwhttp\n')
+        self._write(os.path.join('sensors', 'one.yaml'), 'platform: one\n')
+        self._cache_path = os.path.join(self._tmp.name, 'cache')
+        os.environ['HA_CACHE_TEST_NAME'] = 'Home'
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        del os.environ['HA_CACHE_TEST_NAME']
+        yaml.clear_secret_cache()
+        self._tmp.cleanup()
+
+    def _write(self, fname, string):
+        """Write a file in the temporary directory and return its path."""
+        path = os.path.join(self._tmp.name, fname)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as yaml_file:
+            yaml_file.write(string)
+        return path
+
+    def _load(self):
+        """Load the configuration, return it and if it was parsed."""
+        yaml.clear_secret_cache()
+        with patch('homeassistant.util.yaml.load_yaml',
+                   side_effect=yaml.load_yaml) as mock_load:
+            conf = yaml.load_yaml_cached(self._yaml_path, self._cache_path)
+        return conf, mock_load.called
+
+    def test_cache_reused(self):
+        """Test an unchanged configuration is not parsed again."""
+        conf, parsed = self._load()
+        self.assertTrue(parsed)
+
+        cached, parsed = self._load()
+        self.assertFalse(parsed)
+        self.assertEqual(conf, cached)
+        self.assertEqual({'api_password': 'pwhttp'}, cached['http'])
+        self.assertEqual([{'platform': 'one'}], cached['sensor'])
+        self.assertEqual(self._yaml_path, cached['http'].__config_file__)
+        self.assertEqual(1, cached['http'].__line__)
+
+    def test_cache_invalidated(self):
+        """Test the configuration is parsed again after changes."""
+        self._load()
+
+        self._write(yaml._SECRET_YAML, 'http_pw: changed\n')
+        conf, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertEqual({'api_password': 'changed'}, conf['http'])
+
+        self._write(os.path.join('sensors', 'two.yaml'), 'platform: two\n')
+        conf, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertEqual(2, len(conf['sensor']))
+
+        os.environ['HA_CACHE_TEST_NAME'] = 'Away'
+        conf, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertEqual('Away', conf['name'])
+
+    def test_corrupt_cache_ignored(self):
+        """Test a corrupt cache file is ignored and replaced."""
+        self._write('cache', 'not a pickle')
+
+        with patch('homeassistant.util.yaml._LOGGER.warning') as mock_warn:
+            conf, parsed = self._load()
+
+        self.assertTrue(parsed)
+        self.assertTrue(mock_warn.called)
+        self.assertEqual('Home', conf['name'])
+        self.assertFalse(self._load()[1])
+
+    def test_keyring_not_cached(self):
+        """Test configurations using the keyring are not cached."""
+        self._write(YAML_CONFIG_FILE, 'pw: !secret keyring_pw\n')
+
+        with patch.object(yaml, 'keyring', FakeKeyring({'keyring_pw': 'a'})):
+            self.assertEqual({'pw': 'a'}, self._load()[0])
+            self.assertTrue(self._load()[1])
+
+        self.assertFalse(os.path.exists(self._cache_path))